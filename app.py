@@ -8,25 +8,48 @@ Version: 1.0.0
 Lizenz: Proprietär (für Studienzwecke)
 
 Kurzbeschreibung des Moduls:
-    Dieses Modul bildet den Einstiegspunkt der Webanwendung. Es initialisiert die Flask-App,
-    verwaltet alle HTTP-Routen und verbindet die Präsentationsschicht (Templates) mit der
-    Persistenzschicht (SQLite-Datenbank) sowie dem Aldi-Süd-Crawler.
+    Dieses Modul bildet den Einstiegspunkt der Webanwendung. Es stellt die App-Factory
+    create_app() bereit, verwaltet alle HTTP-Routen und verbindet die Präsentationsschicht
+    (Templates) mit der Persistenzschicht (SQLite-Datenbank) sowie dem Aldi-Süd-Crawler.
 
     Kernfunktionen:
         - Produktsuche mit kombinierten Ergebnissen aus Datenbank und Live-Crawler
-        - Merkliste für Produkte des aktuellen Users
+        - Anmeldung/Registrierung (Session) und Merkliste für Produkte des angemeldeten Users
         - Erfassung neuer Produkte und Bestellungen
         - KPI-Dashboard (Ausgabenanalyse)
         - Ersparnis-Rechner („Was wäre wenn alles in einem Markt gekauft worden wäre?“)
 """
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import gzip
+import json
 import os
-
-from flask import Flask, render_template, request, redirect, url_for
-
+import sqlite3
+
+from flask import (
+    Flask, Response, jsonify, render_template, request, redirect, session, stream_template,
+    url_for,
+)
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from database.catalog import get_catalog
+from database.ids import new_id
+from database.lookups import lookup_id
 from database.my_helpers import get_connection
-from scrapers.aldi_crawler import scrape_aldi_sued_top
+from database.prefix_index import get_prefix_index
+from database.price_watch import best_prices, mark_seen, unseen_drops, watch_product
+from database.read_mirror import get_read_connection
+from database.rows import Offer, SavedItem, SavingsLine, fetch_as
+from database.sharding import get_user_connection, get_user_writer, is_sharded
+from database.trigram_index import get_trigram_index
+from database.writer import get_writer
+from profiling import install as install_profiler, token_matches
+
+try:
+    import orjson  # optional: schnellerer JSON-Serializer für die API
+except ImportError:
+    orjson = None
 
 # DB_PATH = "grocery.db"  # nicht mehr benötigt, Pfad wird zentral in my_helpers.py verwaltet
 
@@ -35,19 +58,189 @@ from scrapers.aldi_crawler import scrape_aldi_sued_top
 # Flask-Konfiguration
 # =======================
 
-app = Flask(__name__)
-app.secret_key = "dev-secret"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Kompilierte Templates (Bytecode) werden hier abgelegt; "off" deaktiviert den Cache
+DEFAULT_JINJA_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "jinja")
+
+# Beim Streaming werden Template-Fragmente bis zu dieser Größe gesammelt, bevor sie
+# gesendet werden (sonst entstünde für jede Tabellenzeile ein eigener Chunk)
+STREAM_CHUNK_CHARS = 8 * 1024
+
+# Routen werden zunächst nur registriert und erst in create_app() an eine
+# Flask-Instanz gebunden. So kann jeder Worker-Prozess seine eigene App erzeugen.
+_ROUTES = []
+
+
+def route(rule: str, **options):
+    """
+    Label: Routen-Decorator (Ersatz für @app.route)
+    Kurzbeschreibung:
+        Merkt eine View-Funktion samt URL-Regel vor. Die eigentliche Registrierung
+        erfolgt in create_app(), damit es keine modulweite App-Instanz mehr braucht.
+
+    Parameter:
+        rule (str): URL-Regel, z. B. "/search".
+        **options: Weitere Optionen für Flask.add_url_rule (z. B. methods).
+
+    Return:
+        callable: Decorator, der die View-Funktion unverändert zurückgibt.
+    """
+    def decorator(view_func):
+        _ROUTES.append((rule, view_func, options))
+        return view_func
+    return decorator
+
 
-# Aktuell wird mit einem statischen User gearbeitet.
-# Für mehrere Nutzer wäre Session-/Auth-Management notwendig.
-CURRENT_USER_ID = "u1"
+def create_app(config: dict | None = None, warm: bool = False) -> Flask:
+    """
+    Label: App-Factory
+    Kurzbeschreibung:
+        Erzeugt eine neue, vollständig konfigurierte Flask-Instanz mit allen Routen.
+        Wird vom Entwicklungsserver (python app.py), von `flask --app app run` sowie vom
+        Produktions-Launcher (gunicorn, siehe gunicorn.conf.py) verwendet.
+
+    Parameter:
+        config (dict, optional): Zusätzliche Flask-Konfiguration (z. B. TESTING=True).
+        warm (bool): Wenn True, werden Templates und Caches sofort vorgeladen (warm_up).
+
+    Return:
+        flask.Flask: Die konfigurierte Anwendung.
+
+    Tests:
+        1. Zwei Aufrufe liefern zwei unabhängige App-Instanzen mit denselben Routen.
+        2. create_app({"TESTING": True}).test_client().get("/") liefert einen Redirect.
+    """
+    app = Flask(__name__)
+    app.secret_key = os.getenv("GROCERY_SECRET_KEY", "dev-secret")
+    if config:
+        app.config.update(config)
+
+    cache_dir = os.getenv("GROCERY_JINJA_CACHE_DIR", DEFAULT_JINJA_CACHE_DIR)
+    if cache_dir.lower() != "off":
+        # Kompilierte Templates überdauern Neustarts: Worker übersetzen sie nicht erneut
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    for rule, view_func, options in _ROUTES:
+        app.add_url_rule(rule, view_func=view_func, **options)
+    app.before_request(require_login)
+    app.context_processor(lambda: {"current_username": session.get("username")})
+    # Profiling einzelner Requests nur mit GROCERY_PROFILE_TOKEN (siehe profiling.py)
+    install_profiler(app)
+
+    if warm:
+        warm_up(app)
+    return app
+
+
+def warm_up(app: Flask):
+    """
+    Label: Templates und Caches vorwärmen
+    Kurzbeschreibung:
+        Kompiliert alle Jinja-Templates einmalig, lädt den Katalog-Snapshot und den
+        (sonst lazy importierten) Crawler-Stack. Beim Pre-Fork-Betrieb (preload_app) geschieht das im Master-Prozess,
+        sodass alle Worker Templates und Module per Copy-on-Write übernehmen, statt sie
+        beim ersten Request zu laden.
+
+    Parameter:
+        app (flask.Flask): Die zu wärmende Anwendung.
+
+    Return:
+        - Keine
+    """
+    for template_name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template_name)
+
+    # Katalog-Snapshot einmal laden (Worker erben ihn und prüfen nur noch die Version)
+    try:
+        get_catalog()
+    except sqlite3.Error as exc:
+        app.logger.warning("Katalog konnte nicht vorgeladen werden: %s", exc)
+
+    # Crawler-Stack (requests, urllib3, bs4) einmalig im Master importieren,
+    # statt ihn in jedem Worker beim ersten Suchrequest nachzuladen.
+    from scrapers.registry import get_scrapers
+
+    get_scrapers()
+
+
+def _buffered(chunks, size: int = STREAM_CHUNK_CHARS):
+    """Fasst kleine Template-Fragmente zu Blöcken von etwa size Zeichen zusammen."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_page(template_name: str, **context) -> Response:
+    """
+    Label: Template gestreamt ausliefern
+    Kurzbeschreibung:
+        Rendert ein Template schrittweise (flask.stream_template) und sendet es blockweise.
+        Der Kopf der Seite geht sofort raus, und die vollständige Seite liegt nie als ein
+        einziger String im Speicher. Gedacht für Seiten mit langen Tabellen.
+
+    Parameter:
+        template_name (str): Name des Templates.
+        **context: Template-Variablen.
+
+    Return:
+        flask.Response: Antwort mit gestreamtem Body (text/html).
+
+    Tests:
+        1. GET /search liefert denselben HTML-Inhalt wie render_template("search.html", ...).
+        2. Bei vielen Zeilen besteht der Body aus mehreren Blöcken.
+    """
+    return Response(_buffered(stream_template(template_name, **context)), mimetype="text/html")
+
+
+# Ohne Anmeldung wird mit diesem (Demo-)User gearbeitet. Leer = Anmeldung erforderlich.
+DEFAULT_USER_ID = os.getenv("GROCERY_DEFAULT_USER", "u1")
+
+# Ohne Anmeldung erreichbar, auch wenn kein Default-User gesetzt ist
+PUBLIC_ENDPOINTS = {"login", "register", "static"}
+
+
+def current_user_id() -> str | None:
+    """
+    Label: Aktuellen User bestimmen
+    Kurzbeschreibung:
+        Liefert die ID des angemeldeten Users aus der Session, sonst DEFAULT_USER_ID.
+
+    Return:
+        str | None: User-ID oder None (nicht angemeldet und kein Default-User).
+    """
+    return session.get("user_id") or DEFAULT_USER_ID or None
+
+
+def require_login():
+    """
+    Label: Anmeldung erzwingen (before_request)
+    Kurzbeschreibung:
+        Ist weder ein User angemeldet noch ein Default-User konfiguriert, werden Seiten auf
+        /login umgeleitet und API-Aufrufe mit 401 beantwortet.
+
+    Return:
+        flask.Response | None: Umleitung bzw. Fehlerantwort; None = Request fortsetzen.
+    """
+    if current_user_id() is not None or request.endpoint in PUBLIC_ENDPOINTS:
+        return None
+    if request.path.startswith("/api/"):
+        return jsonify(error="Anmeldung erforderlich"), 401
+    return redirect(url_for("login", next=request.full_path.rstrip("?")))
 
 
 # =======================
 # Routen – Einstieg
 # =======================
 
-@app.route("/")
+@route("/")
 def index():
     """
     Label: Startseite / Redirect
@@ -69,44 +262,147 @@ def index():
 
 
 # =======================
-# Routen – Suche & Merkliste
+# Routen – Anmeldung
 # =======================
 
-@app.route("/search", methods=["GET", "POST"])
-def search():
+@route("/login", methods=["GET", "POST"])
+def login():
     """
-    Label: Produktsuche & Preisvergleich
+    Label: Anmelden
     Kurzbeschreibung:
-        Ermöglicht die Suche nach Produkten über Name oder Kategorie. Es werden zunächst
-        passende Produkte aus der lokalen SQLite-Datenbank geladen und anschließend
-        Live-Preisangebote von Aldi Süd über den Crawler ergänzt. Beide Ergebnislisten
-        werden in einer gemeinsamen Tabelle im Template 'search.html' dargestellt.
+        Prüft Benutzername und Passwort gegen 'users' (Passwort-Hash via werkzeug) und legt
+        User-ID und Namen in der (signierten) Session ab.
 
     Parameter:
-        - Keine direkten Funktionsparameter.
-        - Suchbegriff:
-            - Bei POST: request.form["q"]
-            - Bei GET: request.args["q"]
+        - username, password (Formularfelder, POST).
+        - next (Query-Parameter, optional): Ziel nach erfolgreicher Anmeldung.
 
     Return:
-        flask.Response: Gerendertes Template 'search.html' mit:
-            - query  (str): der eingegebene Suchbegriff
-            - products (list): kombinierte Liste aus DB-Records und Aldi-Live-Dicts
+        flask.Response:
+            - GET bzw. Fehler: Formular 'login.html'.
+            - POST (erfolgreich): Redirect auf next bzw. /search.
 
     Tests:
-        1. Ohne Suchbegriff (GET /search) werden alle DB-Produkte mit Preisen angezeigt.
-        2. Mit Suchbegriff werden nur Produkte angezeigt, deren Name oder Kategorie LIKE '%q%' matcht.
-        3. Bei einem gültigen Suchbegriff wird zusätzlich scrape_aldi_sued_top(query) aufgerufen
-           und die Ergebnisse in der Tabelle angezeigt (erkennbar an is_live = True).
+        1. Richtige Zugangsdaten setzen session["user_id"] und leiten weiter.
+        2. Falsches Passwort zeigt das Formular mit Fehlermeldung, die Session bleibt leer.
     """
-    # Suchbegriff abhängig von HTTP-Methode ermitteln
-    query = (
-        request.form.get("q", "")
-        if request.method == "POST"
-        else request.args.get("q", "")
-    )
+    error = None
+    if request.method == "POST":
+        username = request.form.get("username", "").strip()
+        password = request.form.get("password", "")
+
+        conn = get_connection()
+        user = conn.execute(
+            "SELECT id, username, password_hash FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        conn.close()
+
+        if user is not None and check_password_hash(user["password_hash"], password):
+            session.clear()
+            session["user_id"] = user["id"]
+            session["username"] = user["username"]
+            target = request.args.get("next", "")
+            # Nur relative Ziele zulassen (kein Open Redirect)
+            if not target.startswith("/") or target.startswith("//"):
+                target = url_for("search")
+            return redirect(target)
+        error = "Benutzername oder Passwort ist falsch."
 
-    conn = get_connection()
+    return render_template("login.html", error=error)
+
+
+@route("/register", methods=["GET", "POST"])
+def register():
+    """
+    Label: Registrieren
+    Kurzbeschreibung:
+        Legt einen neuen User an (Passwort wird nur als Hash gespeichert) und meldet ihn
+        direkt an. Die Prüfung auf einen freien Benutzernamen läuft im Writer-Thread, damit
+        zwei gleichzeitige Registrierungen nicht denselben Namen erhalten.
+
+    Parameter:
+        - username, email, password (Formularfelder, POST).
+
+    Return:
+        flask.Response:
+            - GET bzw. Fehler: Formular 'register.html'.
+            - POST (erfolgreich): Redirect auf /search.
+
+    Tests:
+        1. Registrierung mit neuem Namen erzeugt einen Eintrag in 'users' und meldet an.
+        2. Ein bereits vergebener Benutzername führt zur Fehlermeldung.
+    """
+    error = None
+    if request.method == "POST":
+        username = request.form.get("username", "").strip()
+        email = request.form.get("email", "").strip()
+        password = request.form.get("password", "")
+
+        if not username or not email or len(password) < 8:
+            error = "Bitte Benutzername, E-Mail und ein Passwort mit mindestens 8 Zeichen angeben."
+        else:
+            user_id = new_id("u")
+            password_hash = generate_password_hash(password)
+            now = datetime.now().isoformat()
+
+            def write(conn):
+                taken = conn.execute(
+                    "SELECT 1 FROM users WHERE username = ?", (username,)
+                ).fetchone()
+                if taken:
+                    return False
+                conn.execute(
+                    """
+                    INSERT INTO users (id, username, email, password_hash, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (user_id, username, email, password_hash, now),
+                )
+                return True
+
+            if get_writer().execute(write):
+                session.clear()
+                session["user_id"] = user_id
+                session["username"] = username
+                return redirect(url_for("search"))
+            error = "Dieser Benutzername ist bereits vergeben."
+
+    return render_template("register.html", error=error)
+
+
+@route("/logout")
+def logout():
+    """
+    Label: Abmelden
+    Kurzbeschreibung:
+        Leert die Session; danach gilt wieder der Default-User (bzw. Anmeldung erforderlich).
+
+    Return:
+        flask.Response: Redirect auf /login.
+    """
+    session.clear()
+    return redirect(url_for("login"))
+
+
+# =======================
+# Routen – Suche & Merkliste
+# =======================
+
+def db_offers(query: str) -> tuple[list, bool]:
+    """
+    Label: Preisangebote aus der Datenbank
+    Kurzbeschreibung:
+        Lädt passende Angebote aus der Datenbank (LIKE auf Name/Kategorie, ohne Treffer über
+        den Trigramm-Index). Ohne Live-Scraper; siehe find_offers().
+
+    Parameter:
+        query (str): Suchbegriff (leer = alle Angebote).
+
+    Return:
+        tuple[list[Offer], bool]: Angebote und ob sie aus der fehlertoleranten Suche stammen.
+    """
+    # Nur Katalogtabellen: liest aus dem In-Memory-Spiegel, falls aktiviert
+    conn = get_read_connection()
     cur = conn.cursor()
 
     # SQL-Query abhängig davon, ob ein Suchbegriff vorhanden ist
@@ -115,15 +411,19 @@ def search():
         SELECT
             p.id as product_id,
             p.name,
-            p.brand,
-            p.category,
+            b.name AS brand,
+            c.name AS category,
             s.name AS supermarket_name,
             s.id AS supermarket_id,
             sp.price
         FROM products p
         JOIN supermarket_products sp ON sp.product_id = p.id
         JOIN supermarkets s ON s.id = sp.supermarket_id
-        WHERE p.name LIKE ? OR p.category LIKE ?
+        LEFT JOIN brands b ON b.id = p.brand_id
+        LEFT JOIN categories c ON c.id = p.category_id
+        -- Kategorien einmal im (kleinen) Wörterbuch suchen, Produkte per Integer-ID filtern
+        WHERE p.name LIKE ?
+           OR p.category_id IN (SELECT id FROM categories WHERE name LIKE ?)
         ORDER BY p.name, sp.price ASC
         """
         params = (f"%{query}%", f"%{query}%")
@@ -132,31 +432,186 @@ def search():
         SELECT
             p.id as product_id,
             p.name,
-            p.brand,
-            p.category,
+            b.name AS brand,
+            c.name AS category,
             s.name AS supermarket_name,
             s.id AS supermarket_id,
             sp.price
         FROM products p
         JOIN supermarket_products sp ON sp.product_id = p.id
         JOIN supermarkets s ON s.id = sp.supermarket_id
+        LEFT JOIN brands b ON b.id = p.brand_id
+        LEFT JOIN categories c ON c.id = p.category_id
         ORDER BY p.name, sp.price ASC
         """
         params = ()
 
     # DB-Ergebnisse laden
-    products = cur.execute(sql, params).fetchall()
+    products = fetch_as(cur.execute(sql, params), Offer)
+
+    # Kein exakter Treffer → fehlertolerante Suche über den Trigramm-Index ("Volmilch")
+    fuzzy = False
+    if query and not products:
+        matches = get_trigram_index().search(query)
+        if matches:
+            fuzzy = True
+            rank = {product_id: i for i, (product_id, _) in enumerate(matches)}
+            placeholders = ",".join("?" * len(rank))
+            products = fetch_as(cur.execute(
+                f"""
+                SELECT
+                    p.id as product_id,
+                    p.name,
+                    b.name AS brand,
+                    c.name AS category,
+                    s.name AS supermarket_name,
+                    s.id AS supermarket_id,
+                    sp.price
+                FROM products p
+                JOIN supermarket_products sp ON sp.product_id = p.id
+                JOIN supermarkets s ON s.id = sp.supermarket_id
+                LEFT JOIN brands b ON b.id = p.brand_id
+                LEFT JOIN categories c ON c.id = p.category_id
+                WHERE p.id IN ({placeholders})
+                ORDER BY sp.price ASC
+                """,
+                tuple(rank),
+            ), Offer)
+            # ähnlichste Produkte zuerst (stabile Sortierung behält Preisreihenfolge bei)
+            products.sort(key=lambda offer: rank[offer.product_id])
     conn.close()
+    return products, fuzzy
+
+
+def merge_live_offers(products: list, live_results: list[dict]) -> list:
+    """
+    Label: Live-Treffer mit DB-Angeboten zusammenführen
+    Kurzbeschreibung:
+        Hängt die (bereits zugeordneten) Live-Treffer an die DB-Angebote an. Gemeinsam
+        genutzt von find_offers() und der asynchronen Suche (asgi.py).
+
+    Parameter:
+        products (list[Offer]): DB-Angebote aus db_offers().
+        live_results (list[dict]): Ergebnis von scrapers.matching.resolve_items().
+
+    Return:
+        list[Offer]: Zusammengeführte Angebote.
+    """
+    # Live-Treffer, die einem Katalogprodukt zugeordnet wurden, ersetzen den DB-Eintrag
+    # desselben Produkts im selben Markt (aktuellerer Preis, keine Doppelung)
+    live_keys = {
+        (result["product_id"], result["supermarket_name"])
+        for result in live_results
+        if result.get("product_id")
+    }
+    if live_keys:
+        products = [
+            offer for offer in products
+            if (offer.product_id, offer.supermarket_name) not in live_keys
+        ]
+    products.extend(Offer.from_item(result) for result in live_results)
+    return products
+
+
+def find_offers(query: str, live: bool = True) -> tuple[list, bool]:
+    """
+    Label: Preisangebote suchen (DB, Fuzzy-Fallback, Live-Scraper)
+    Kurzbeschreibung:
+        Gemeinsame Datenbasis für /search und /api/v1/search: Angebote aus der Datenbank
+        (db_offers), optional ergänzt um die Live-Treffer aller Scraper.
+
+    Parameter:
+        query (str): Suchbegriff (leer = alle Angebote).
+        live (bool): Live-Scraper befragen (nur bei nicht leerem Suchbegriff).
+
+    Return:
+        tuple[list[Offer], bool]: Angebote und ob sie aus der fehlertoleranten Suche stammen.
+    """
+    products, fuzzy = db_offers(query)
+
+    # Crawler erst beim ersten Bedarf importieren (requests/bs4/TLS-Setup kosten Startzeit)
+    from scrapers.matching import resolve_items
+    from scrapers.registry import fan_out
+
+    # Live-Ergebnisse aller registrierten Märkte parallel abfragen; was bis zur Deadline
+    # nicht da ist, fehlt in dieser Antwort (ohne Suchbegriff wird nicht gecrawlt)
+    live_results = resolve_items(fan_out(query)) if query and live else []
+    return merge_live_offers(products, live_results), fuzzy
+
+
+@route("/search", methods=["GET", "POST"])
+def search():
+    """
+    Label: Produktsuche & Preisvergleich
+    Kurzbeschreibung:
+        Ermöglicht die Suche nach Produkten über Name oder Kategorie. Es werden zunächst
+        passende Produkte aus der lokalen SQLite-Datenbank geladen und anschließend
+        Live-Preisangebote von Aldi Süd über den Crawler ergänzt. Beide Ergebnislisten
+        werden in einer gemeinsamen Tabelle im Template 'search.html' dargestellt.
+
+    Parameter:
+        - Keine direkten Funktionsparameter.
+        - Suchbegriff:
+            - Bei POST: request.form["q"]
+            - Bei GET: request.args["q"]
+
+    Return:
+        flask.Response: Gerendertes Template 'search.html' mit:
+            - query  (str): der eingegebene Suchbegriff
+            - products (list[Offer]): DB-Angebote und Live-Treffer der Scraper im selben Zeilentyp
+            - fuzzy (bool): True, wenn die DB-Treffer aus der fehlertoleranten Suche stammen
+
+    Tests:
+        1. Ohne Suchbegriff (GET /search) werden alle DB-Produkte mit Preisen angezeigt.
+        2. Mit Suchbegriff werden nur Produkte angezeigt, deren Name oder Kategorie LIKE '%q%' matcht.
+           Gibt es keinen solchen Treffer, werden ähnliche Produkte über den Trigramm-Index
+           angezeigt (fuzzy = True, z. B. "Volmilch" → "Vollmilch 3.5%").
+        3. Bei einem gültigen Suchbegriff werden alle registrierten Scraper parallel befragt
+           (scrapers.registry.fan_out) und deren Treffer in der Tabelle angezeigt (is_live = True).
+        4. Ein Live-Treffer, der einem Katalogprodukt zugeordnet wurde, trägt dessen product_id
+           und ersetzt den DB-Eintrag desselben Produkts bei Aldi Süd.
+    """
+    # Suchbegriff abhängig von HTTP-Methode ermitteln
+    query = (
+        request.form.get("q", "")
+        if request.method == "POST"
+        else request.args.get("q", "")
+    )
 
-    # Live-Ergebnisse von Aldi Süd hinzufügen (falls query leer, wird i. d. R. eine leere Liste zurückgegeben)
-    aldi_results = scrape_aldi_sued_top(query)
-    for result in aldi_results:
-        products.append(result)
+    products, fuzzy = find_offers(query)
+    return stream_page("search.html", query=query, products=products, fuzzy=fuzzy)
 
-    return render_template("search.html", query=query, products=products)
 
+@route("/api/suggest")
+def suggest():
+    """
+    Label: Autovervollständigung für die Produktsuche
+    Kurzbeschreibung:
+        Liefert die besten Vervollständigungen für einen eingegebenen Präfix aus dem
+        In-Memory-Präfix-Index (Produktnamen, Namensbestandteile, Marken, Kategorien).
+        Es wird keine Datenbankabfrage ausgeführt, solange sich der Katalog nicht ändert.
 
-@app.route("/save_product/<product_id>")
+    Parameter:
+        - q (Query-Parameter, str): eingegebener Präfix.
+        - k (Query-Parameter, optional, int): maximale Anzahl Vorschläge (1–20, Standard 8).
+
+    Return:
+        flask.Response: JSON mit query und suggestions (Liste aus id, name, brand, category).
+
+    Tests:
+        1. GET /api/suggest?q=voll liefert "Vollmilch 3.5%" als ersten Vorschlag.
+        2. Ohne q wird eine leere Vorschlagsliste geliefert.
+        3. Ein neu angelegtes Produkt erscheint ohne Neustart in den Vorschlägen.
+    """
+    query = request.args.get("q", "")
+    try:
+        k = min(max(int(request.args.get("k", 8)), 1), 20)
+    except ValueError:
+        k = 8
+    return jsonify(query=query, suggestions=get_prefix_index().suggest(query, k))
+
+
+@route("/save_product/<product_id>")
 def save_product(product_id: str):
     """
     Label: Produkt auf Merkliste setzen
@@ -178,80 +633,108 @@ def save_product(product_id: str):
         2. Mehrfaches Speichern desselben Produkts ist möglich und erzeugt mehrere Einträge.
         3. Nach dem Speichern wird ein Redirect ausgeführt (kein reines 200-Response).
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # Einfache ID-Erzeugung basierend auf aktueller Zeit (Millisekunden)
-    saved_id = f"svp_{int(datetime.now().timestamp() * 1000)}"
+    # Kollisionsfreie, zeitlich sortierbare ID (siehe database/ids.py)
+    saved_id = new_id("svp")
     now = datetime.now().isoformat()
+    # Der Schreibauftrag läuft im Writer-Thread (ohne Request-Kontext): User vorher bestimmen
+    user_id = current_user_id()
 
-    cur.execute(
-        """
-        INSERT INTO saved_products (id, user_id, product_id, saved_at)
-        VALUES (?, ?, ?, ?)
-        """,
-        (saved_id, CURRENT_USER_ID, product_id, now),
-    )
+    def write(conn):
+        conn.execute(
+            """
+            INSERT INTO saved_products (id, user_id, product_id, saved_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (saved_id, user_id, product_id, now),
+        )
 
-    conn.commit()
-    conn.close()
+    # Schreibzugriff über die Single-Writer-Queue des User-Shards (Group-Commit)
+    get_user_writer(user_id).execute(write)
+    if is_sharded():
+        # Shard-Merklisten erreicht der Trigger in grocery.db nicht: Beobachter direkt anlegen
+        get_writer().execute(watch_product, user_id, product_id)
 
     return redirect(request.referrer or url_for("saved"))
 
 
-@app.route("/saved")
-def saved():
+def saved_items(user_id: str) -> list:
     """
-    Label: Merkliste anzeigen
+    Label: Merkliste eines Users laden
     Kurzbeschreibung:
-        Zeigt alle für den aktuellen User gespeicherten Produkte aus 'saved_products'
-        an. Zusätzlich wird für jedes Produkt der günstigste bekannte Preis aus
-        'supermarket_products' berechnet (MIN-Preis).
+        Gemeinsame Datenbasis für /saved und /api/v1/saved: gespeicherte Produkte mit dem
+        günstigsten bekannten Preis, neueste zuerst. Der Preis stammt aus dem von Triggern
+        gepflegten 'product_watchers' (price_watch.best_prices), statt je Aufruf MIN(price)
+        über alle Angebote jedes gemerkten Produkts zu berechnen.
 
     Parameter:
-        - Keine direkten Funktionsparameter (User wird über CURRENT_USER_ID bestimmt).
+        user_id (str): ID des Users.
 
     Return:
-        flask.Response: Gerendertes Template 'saved.html' mit:
-            - items (list[sqlite3.Row]): Name, Marke, Kategorie, min_price, saved_at.
-
-    Tests:
-        1. Für einen User ohne gespeicherte Produkte wird eine leere Liste/Empty-State angezeigt.
-        2. Für gespeicherte Produkte wird der korrekte MIN-Preis angezeigt.
-        3. Die Einträge sind absteigend nach gespeicherten Datum sortiert (neueste zuerst).
+        list[SavedItem]: Einträge der Merkliste.
     """
-    conn = get_connection()
+    conn = get_user_connection(user_id)
+    conn.row_factory = None
     sql = """
     SELECT
         sp.id,
         sp.saved_at,
         p.name,
-        p.brand,
-        p.category,
-        MIN(spm.price) AS min_price
+        b.name AS brand,
+        c.name AS category,
+        sp.product_id
     FROM saved_products sp
     JOIN products p ON p.id = sp.product_id
-    LEFT JOIN supermarket_products spm ON spm.product_id = p.id
+    LEFT JOIN brands b ON b.id = p.brand_id
+    LEFT JOIN categories c ON c.id = p.category_id
     WHERE sp.user_id = ?
-    GROUP BY
-        sp.id,
-        sp.saved_at,
-        p.name,
-        p.brand,
-        p.category
     ORDER BY sp.saved_at DESC
     """
-    items = conn.execute(sql, (CURRENT_USER_ID,)).fetchall()
+    rows = conn.execute(sql, (user_id,)).fetchall()
     conn.close()
+    prices = best_prices(user_id, {row[5] for row in rows})
+    return [SavedItem(*row[:5], prices.get(row[5])) for row in rows]
 
-    return render_template("saved.html", items=items)
+
+@route("/saved")
+def saved():
+    """
+    Label: Merkliste anzeigen
+    Kurzbeschreibung:
+        Zeigt alle für den aktuellen User gespeicherten Produkte aus 'saved_products'
+        an. Zusätzlich wird für jedes Produkt der günstigste bekannte Preis angezeigt
+        (Bestpreis aus 'product_watchers', siehe saved_items()). Seit dem letzten Besuch erkannte
+        Preissenkungen (database/price_watch.py) werden oberhalb angezeigt und danach als
+        gelesen markiert.
+
+    Parameter:
+        - Keine direkten Funktionsparameter (User wird über current_user_id() bestimmt).
+
+    Return:
+        flask.Response: Gerendertes Template 'saved.html' mit:
+            - items (list[SavedItem]): Name, Marke, Kategorie, min_price, saved_at.
+            - drops (list[PriceDrop]): Ungelesene Preissenkungen.
+
+    Tests:
+        1. Für einen User ohne gespeicherte Produkte wird eine leere Liste/Empty-State angezeigt.
+        2. Für gespeicherte Produkte wird der korrekte MIN-Preis angezeigt.
+        3. Die Einträge sind absteigend nach gespeicherten Datum sortiert (neueste zuerst).
+        4. Eine Preissenkung wird genau beim nächsten Aufruf angezeigt, danach nicht mehr.
+    """
+    user_id = current_user_id()
+    items = saved_items(user_id)
+    drops = unseen_drops(user_id)
+    if drops:
+        # Markieren muss die Seite nicht aufhalten
+        get_writer().submit(mark_seen, user_id, [drop.id for drop in drops])
+
+    return render_template("saved.html", items=items, drops=drops)
 
 
 # =======================
 # Routen – Produkt & Bestellung anlegen
 # =======================
 
-@app.route("/add_product", methods=["GET", "POST"])
+@route("/add_product", methods=["GET", "POST"])
 def add_product():
     """
     Label: Neues Produkt anlegen
@@ -275,13 +758,8 @@ def add_product():
            in 'supermarket_products'.
         3. POST mit leerem Namen zeigt das Formular erneut mit der Fehlermeldung "Name darf nicht leer sein.".
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # Supermärkte für Formular laden
-    supermarkets = cur.execute(
-        "SELECT id, name FROM supermarkets ORDER BY name"
-    ).fetchall()
+    # Supermärkte für Formular aus dem In-Memory-Katalog (kein Query, solange unverändert)
+    supermarkets = get_catalog().supermarkets
 
     if request.method == "POST":
         name = request.form.get("name", "").strip()
@@ -290,7 +768,6 @@ def add_product():
 
         if not name:
             # Minimal: bei fehlendem Namen einfach wieder Formular zeigen
-            conn.close()
             return render_template(
                 "add_product.html",
                 supermarkets=supermarkets,
@@ -298,18 +775,11 @@ def add_product():
             )
 
         now = datetime.now().isoformat()
-        product_id = f"up_{int(datetime.now().timestamp() * 1000)}"
-
-        # Produktstammsatz anlegen
-        cur.execute(
-            """
-            INSERT INTO products (id, name, brand, category, created_by_user_id, is_user_created, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (product_id, name, brand, category, CURRENT_USER_ID, 1, now),
-        )
+        product_id = new_id("up")
+        user_id = current_user_id()
 
         # Preise je Supermarkt aus Formular einlesen
+        prices = []
         for s in supermarkets:
             field_name = f"price_{s['id']}"
             price_str = request.form.get(field_name, "").strip()
@@ -323,27 +793,36 @@ def add_product():
                 # Ungültiger Preis → ignorieren
                 continue
 
-            sp_id = f"spu_{s['id']}_{product_id}"
-            cur.execute(
+            prices.append((f"spu_{s['id']}_{product_id}", s["id"], price))
+
+        def write(conn):
+            # Produktstammsatz anlegen; Marke/Kategorie werden im Wörterbuch dedupliziert
+            conn.execute(
+                """
+                INSERT INTO products (id, name, brand_id, category_id, created_by_user_id, is_user_created, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (product_id, name, lookup_id(conn, "brands", brand),
+                 lookup_id(conn, "categories", category), user_id, 1, now),
+            )
+            conn.executemany(
                 """
                 INSERT INTO supermarket_products (id, supermarket_id, product_id, price, available, last_updated)
                 VALUES (?, ?, ?, ?, ?, ?)
                 """,
-                (sp_id, s["id"], product_id, price, 1, now),
+                [(sp_id, s_id, product_id, price, 1, now) for sp_id, s_id, price in prices],
             )
 
-        conn.commit()
-        conn.close()
+        get_writer().execute(write)
 
         # Danach direkt zur Suche mit dem neuen Produktnamen
         return redirect(url_for("search", q=name))
 
     # GET: Formular anzeigen
-    conn.close()
     return render_template("add_product.html", supermarkets=supermarkets, error=None)
 
 
-@app.route("/add_order", methods=["GET", "POST"])
+@route("/add_order", methods=["GET", "POST"])
 def add_order():
     """
     Label: Neue Bestellung erfassen
@@ -370,16 +849,10 @@ def add_order():
         3. POST ohne gültige Position oder ohne Supermarkt zeigt eine Fehlermeldung:
            "Bitte Supermarkt wählen und mindestens eine gültige Position mit Preis angeben."
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # Supermärkte und Produkte für Formular laden
-    supermarkets = cur.execute(
-        "SELECT id, name FROM supermarkets ORDER BY name"
-    ).fetchall()
-    products = cur.execute(
-        "SELECT id, name, brand FROM products ORDER BY name"
-    ).fetchall()
+    # Supermärkte und Produkte für Formular aus dem In-Memory-Katalog
+    catalog = get_catalog()
+    supermarkets = catalog.supermarkets
+    products = catalog.products
 
     error = None
 
@@ -403,13 +876,21 @@ def add_order():
             dt = datetime.now()
         order_date_iso = dt.isoformat()
 
+        # Unbekannte Supermarkt-IDs per Dictionary-Lookup verwerfen
+        if supermarket_id not in catalog.supermarkets_by_id:
+            supermarket_id = None
+
         # Bestellpositionen einsammeln (3 Zeilen als einfache Variante)
+        conn = get_read_connection()
+        cur = conn.cursor()
         items = []
         for i in range(1, 4):
             product_id = request.form.get(f"product_{i}")
             qty_str = request.form.get(f"qty_{i}", "").strip()
 
-            if not product_id or not qty_str:
+            if not supermarket_id or not product_id or not qty_str:
+                continue
+            if product_id not in catalog.products_by_id:
                 continue
 
             try:
@@ -438,6 +919,8 @@ def add_order():
             price = row["price"]
             items.append((product_id, qty, price))
 
+        conn.close()
+
         if not supermarket_id or not items:
             error = "Bitte Supermarkt wählen und mindestens eine gültige Position mit Preis angeben."
             return render_template(
@@ -448,37 +931,38 @@ def add_order():
             )
 
         # Order-ID und Gesamtbetrag berechnen
-        order_id = f"o_{int(datetime.now().timestamp() * 1000)}"
+        order_id = new_id("o")
         total_amount = sum(qty * price for _, qty, price in items)
+        user_id = current_user_id()
 
-        # Bestellung anlegen
-        cur.execute(
-            """
-            INSERT INTO orders (id, user_id, order_date, supermarket_id, total_amount)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (order_id, CURRENT_USER_ID, order_date_iso, supermarket_id, total_amount),
-        )
+        def write(conn):
+            # Bestellung anlegen
+            conn.execute(
+                """
+                INSERT INTO orders (id, user_id, order_date, supermarket_id, total_amount)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (order_id, user_id, order_date_iso, supermarket_id, total_amount),
+            )
 
-        # Order-Items anlegen
-        for idx, (product_id, qty, price) in enumerate(items, start=1):
-            item_id = f"oi_{order_id}_{idx}"
-            cur.execute(
+            # Order-Items anlegen
+            conn.executemany(
                 """
                 INSERT INTO order_items (id, order_id, product_id, quantity, price_at_purchase)
                 VALUES (?, ?, ?, ?, ?)
                 """,
-                (item_id, order_id, product_id, qty, price),
+                [
+                    (f"oi_{order_id}_{idx}", order_id, product_id, qty, price)
+                    for idx, (product_id, qty, price) in enumerate(items, start=1)
+                ],
             )
 
-        conn.commit()
-        conn.close()
+        get_user_writer(user_id).execute(write)
 
         # Nach neuer Bestellung direkt zu den KPIs (Standard: 30 Tage)
         return redirect(url_for("kpis", days=30))
 
     # GET: Formular anzeigen
-    conn.close()
     return render_template(
         "add_order.html",
         supermarkets=supermarkets,
@@ -491,45 +975,32 @@ def add_order():
 # Routen – KPIs & Ersparnis
 # =======================
 
-@app.route("/kpis")
-def kpis():
+def parse_days(value) -> int:
+    """Normalisiert den Zeitraum-Parameter auf 7, 30 oder 90 Tage (Standard 30)."""
+    try:
+        days = int(value or 30)
+    except ValueError:
+        return 30
+    return days if days in (7, 30, 90) else 30
+
+
+def kpi_data(user_id: str, days: int) -> dict:
     """
-    Label: KPI-Dashboard (Ausgabenanalyse)
+    Label: Kennzahlen eines Users berechnen
     Kurzbeschreibung:
-        Liefert Kennzahlen zu den Ausgaben des aktuellen Users in einem wählbaren
-        Zeitraum (7, 30 oder 90 Tage). Es werden Gesamtausgaben, Ausgaben pro
-        Supermarkt und Ausgaben pro Produktkategorie berechnet und im Template
-        'kpis.html' in Tabellenform und als Balkendiagramm (Chart.js) dargestellt.
+        Gemeinsame Datenbasis für /kpis und /api/v1/kpis: Gesamtausgaben, Ausgaben nach
+        Supermarkt und nach Kategorie im Zeitraum.
 
     Parameter:
-        - days (Query-Parameter, optional, str):
-            "7", "30" oder "90". Standard: "30".
+        user_id (str): ID des Users.
+        days (int): Zeitraum in Tagen (bereits normalisiert, siehe parse_days).
 
     Return:
-        flask.Response: Gerendertes Template 'kpis.html' mit:
-            - total_last_30 (float): Gesamtausgaben im Zeitraum (Name historisch),
-            - by_market (list[sqlite3.Row]): Ausgaben nach Supermarkt,
-            - by_category (list[sqlite3.Row]): Ausgaben nach Kategorie,
-            - since (date), until (date): Datumsgrenzen,
-            - days (int): tatsächlich verwendeter Zeitraum.
-
-    Tests:
-        1. Ungültiger days-Parameter (z. B. "abc") wird auf 30 Tage normalisiert.
-        2. Ohne Orders im Zeitraum sind Summen 0 und Tabellen leer.
-        3. Mit vorhandenen Orders stimmen Summen und Gruppierungen mit der Datenbank überein.
+        dict: total_amount, by_market, by_category, since, until, days.
     """
-    conn = get_connection()
+    conn = get_user_connection(user_id)
     cur = conn.cursor()
 
-    days_param = request.args.get("days", "30")
-    try:
-        days = int(days_param)
-    except ValueError:
-        days = 30
-
-    if days not in (7, 30, 90):
-        days = 30
-
     now = datetime.now()
     since = now - timedelta(days=days)
 
@@ -541,7 +1012,7 @@ def kpis():
         WHERE user_id = ?
           AND order_date >= ?
         """,
-        (CURRENT_USER_ID, since.isoformat()),
+        (user_id, since.isoformat()),
     ).fetchone()
     total_amount = total_row["total"]
 
@@ -559,99 +1030,113 @@ def kpis():
         GROUP BY s.id
         ORDER BY sum_amount DESC
         """,
-        (CURRENT_USER_ID, since.isoformat()),
+        (user_id, since.isoformat()),
     ).fetchall()
 
-    # Ausgaben nach Produktkategorie
+    # Ausgaben nach Produktkategorie: gruppiert wird über die Integer-ID, der Name kommt
+    # erst danach aus dem Wörterbuch (eine Zeile je Kategorie statt je Position)
     by_category = cur.execute(
         """
         SELECT
-            p.category AS category,
-            SUM(oi.quantity * oi.price_at_purchase) AS sum_amount
-        FROM order_items oi
-        JOIN orders o ON o.id = oi.order_id
-        JOIN products p ON p.id = oi.product_id
-        WHERE o.user_id = ?
-          AND o.order_date >= ?
-        GROUP BY p.category
-        ORDER BY sum_amount DESC
+            c.name AS category,
+            t.sum_amount
+        FROM (
+            SELECT
+                p.category_id,
+                SUM(oi.quantity * oi.price_at_purchase) AS sum_amount
+            FROM order_items oi
+            JOIN orders o ON o.id = oi.order_id
+            JOIN products p ON p.id = oi.product_id
+            WHERE o.user_id = ?
+              AND o.order_date >= ?
+            GROUP BY p.category_id
+        ) t
+        LEFT JOIN categories c ON c.id = t.category_id
+        ORDER BY t.sum_amount DESC
         """,
-        (CURRENT_USER_ID, since.isoformat()),
+        (user_id, since.isoformat()),
     ).fetchall()
 
     conn.close()
 
+    return {
+        "total_amount": total_amount,
+        "by_market": by_market,
+        "by_category": by_category,
+        "since": since.date(),
+        "until": now.date(),
+        "days": days,
+    }
+
+
+@route("/kpis")
+def kpis():
+    """
+    Label: KPI-Dashboard (Ausgabenanalyse)
+    Kurzbeschreibung:
+        Liefert Kennzahlen zu den Ausgaben des aktuellen Users in einem wählbaren
+        Zeitraum (7, 30 oder 90 Tage). Es werden Gesamtausgaben, Ausgaben pro
+        Supermarkt und Ausgaben pro Produktkategorie berechnet und im Template
+        'kpis.html' in Tabellenform und als Balkendiagramm (Chart.js) dargestellt.
+
+    Parameter:
+        - days (Query-Parameter, optional, str):
+            "7", "30" oder "90". Standard: "30".
+
+    Return:
+        flask.Response: Gerendertes Template 'kpis.html' mit:
+            - total_last_30 (float): Gesamtausgaben im Zeitraum (Name historisch),
+            - by_market (list[sqlite3.Row]): Ausgaben nach Supermarkt,
+            - by_category (list[sqlite3.Row]): Ausgaben nach Kategorie,
+            - since (date), until (date): Datumsgrenzen,
+            - days (int): tatsächlich verwendeter Zeitraum.
+
+    Tests:
+        1. Ungültiger days-Parameter (z. B. "abc") wird auf 30 Tage normalisiert.
+        2. Ohne Orders im Zeitraum sind Summen 0 und Tabellen leer.
+        3. Mit vorhandenen Orders stimmen Summen und Gruppierungen mit der Datenbank überein.
+    """
+    data = kpi_data(current_user_id(), parse_days(request.args.get("days")))
+
     return render_template(
         "kpis.html",
-        total_last_30=total_amount,
-        by_market=by_market,
-        by_category=by_category,
-        since=since.date(),
-        until=now.date(),
-        days=days,
+        total_last_30=data["total_amount"],
+        by_market=data["by_market"],
+        by_category=data["by_category"],
+        since=data["since"],
+        until=data["until"],
+        days=data["days"],
     )
 
 
-@app.route("/savings")
-def savings():
+def savings_data(user_id: str, days: int, market_id: str | None) -> dict:
     """
-    Label: Ersparnis-Rechner („Was-wäre-wenn“-Analyse)
+    Label: Was-wäre-wenn-Vergleich berechnen
     Kurzbeschreibung:
-        Berechnet, wie sich die Ausgaben des aktuellen Users verändert hätten, wenn
-        alle Einkäufe im Zeitraum bei einem bestimmten Referenz-Supermarkt getätigt
-        worden wären. Verglichen werden:
-            - tatsächliche Ausgaben,
-            - vergleichbare Ausgaben (nur Produkte, die im Referenzmarkt verfügbar sind),
-            - hypothetische Ausgaben im Referenzmarkt,
-            - potentielle Ersparnis oder Mehrkosten.
+        Gemeinsame Datenbasis für /savings und /api/v1/savings (siehe savings()).
 
     Parameter:
-        - days (Query-Parameter, optional, str): Zeitraum in Tagen (7, 30, 90), Standard 30.
-        - market_id (Query-Parameter, optional, str): ID des Referenz-Supermarkts.
-          Falls nicht gesetzt oder ungültig, wird der erste Markt aus der DB verwendet.
+        user_id (str): ID des Users.
+        days (int): Zeitraum in Tagen (bereits normalisiert, siehe parse_days).
+        market_id (str | None): gewünschter Referenzmarkt; ungültig/leer = erster Markt.
 
     Return:
-        flask.Response: Gerendertes Template 'savings.html' mit:
-            - supermarkets (list[sqlite3.Row]): Liste aller Märkte,
-            - selected_market_id (str): effektiver Referenzmarkt,
-            - days (int), since (date), until (date),
-            - rows (list[sqlite3.Row]): Detailpositionen mit Ist- und Referenzpreisen,
-            - actual_total (float): tatsächliche Ausgaben im Zeitraum,
-            - comparable_actual_total (float): Ausgaben für vergleichbare Positionen,
-            - alt_total (float): hypothetische Ausgaben im Referenzmarkt,
-            - skipped_total (float): Summe der nicht vergleichbaren Positionen,
-            - potential_saving (float): > 0 = Referenzmarkt wäre günstiger gewesen.
-
-    Tests:
-        1. Ohne bestehende Orders im Zeitraum sind alle Summen 0 und es gibt keine Detailzeilen.
-        2. Wenn market_id fehlt oder ungültig ist, wird automatisch der erste Markt gewählt.
-        3. Für Produkte ohne Preis im Referenzmarkt wird deren Wert in skipped_total addiert
-           und in den Detailzeilen als „–“ dargestellt.
+        dict: supermarkets, selected_market_id, days, since, until, rows, actual_total,
+        comparable_actual_total, alt_total, skipped_total, potential_saving.
     """
-    conn = get_connection()
+    conn = get_user_connection(user_id)
     cur = conn.cursor()
 
-    # Zeitraum wie bei KPIs
-    days_param = request.args.get("days", "30")
-    try:
-        days = int(days_param)
-    except ValueError:
-        days = 30
-    if days not in (7, 30, 90):
-        days = 30
-
     now = datetime.now()
     since = now - timedelta(days=days)
 
-    # verfügbare Supermärkte laden
-    supermarkets = cur.execute(
-        "SELECT id, name FROM supermarkets ORDER BY name"
-    ).fetchall()
+    # verfügbare Supermärkte aus dem In-Memory-Katalog
+    catalog = get_catalog(conn)
+    supermarkets = catalog.supermarkets
 
-    selected_market_id = request.args.get("market_id")
+    selected_market_id = market_id
     if supermarkets:
-        valid_ids = [s["id"] for s in supermarkets]
-        if not selected_market_id or selected_market_id not in valid_ids:
+        if not selected_market_id or selected_market_id not in catalog.supermarkets_by_id:
             selected_market_id = supermarkets[0]["id"]
     else:
         selected_market_id = None
@@ -663,7 +1148,7 @@ def savings():
     skipped_total = 0.0
 
     if selected_market_id:
-        rows = cur.execute(
+        rows = fetch_as(cur.execute(
             """
             SELECT
                 oi.order_id,
@@ -672,7 +1157,7 @@ def savings():
                 s.name AS actual_supermarket_name,
                 p.id AS product_id,
                 p.name AS product_name,
-                p.category,
+                c.name AS category,
                 oi.quantity,
                 oi.price_at_purchase,
                 sp_ref.price AS ref_price
@@ -680,21 +1165,22 @@ def savings():
             JOIN orders o ON o.id = oi.order_id
             JOIN supermarkets s ON s.id = o.supermarket_id
             JOIN products p ON p.id = oi.product_id
+            LEFT JOIN categories c ON c.id = p.category_id
             LEFT JOIN supermarket_products sp_ref
               ON sp_ref.product_id = p.id
              AND sp_ref.supermarket_id = ?
             WHERE o.user_id = ?
               AND o.order_date >= ?
             """,
-            (selected_market_id, CURRENT_USER_ID, since.isoformat()),
-        ).fetchall()
+            (selected_market_id, user_id, since.isoformat()),
+        ), SavingsLine)
 
         for r in rows:
-            line_actual = r["quantity"] * r["price_at_purchase"]
+            line_actual = r.quantity * r.price_at_purchase
             actual_total += line_actual
 
-            if r["ref_price"] is not None:
-                line_alt = r["quantity"] * r["ref_price"]
+            if r.ref_price is not None:
+                line_alt = r.quantity * r.ref_price
                 alt_total += line_alt
                 comparable_actual_total += line_actual
             else:
@@ -705,20 +1191,286 @@ def savings():
     # > 0 = Referenzmarkt wäre günstiger gewesen
     potential_saving = comparable_actual_total - alt_total
 
-    return render_template(
-        "savings.html",
-        supermarkets=supermarkets,
-        selected_market_id=selected_market_id,
-        days=days,
-        since=since.date(),
-        until=now.date(),
-        rows=rows,
-        actual_total=actual_total,
-        comparable_actual_total=comparable_actual_total,
-        alt_total=alt_total,
-        skipped_total=skipped_total,
-        potential_saving=potential_saving,
+    return {
+        "supermarkets": supermarkets,
+        "selected_market_id": selected_market_id,
+        "days": days,
+        "since": since.date(),
+        "until": now.date(),
+        "rows": rows,
+        "actual_total": actual_total,
+        "comparable_actual_total": comparable_actual_total,
+        "alt_total": alt_total,
+        "skipped_total": skipped_total,
+        "potential_saving": potential_saving,
+    }
+
+
+@route("/savings")
+def savings():
+    """
+    Label: Ersparnis-Rechner („Was-wäre-wenn“-Analyse)
+    Kurzbeschreibung:
+        Berechnet, wie sich die Ausgaben des aktuellen Users verändert hätten, wenn
+        alle Einkäufe im Zeitraum bei einem bestimmten Referenz-Supermarkt getätigt
+        worden wären. Verglichen werden:
+            - tatsächliche Ausgaben,
+            - vergleichbare Ausgaben (nur Produkte, die im Referenzmarkt verfügbar sind),
+            - hypothetische Ausgaben im Referenzmarkt,
+            - potentielle Ersparnis oder Mehrkosten.
+
+    Parameter:
+        - days (Query-Parameter, optional, str): Zeitraum in Tagen (7, 30, 90), Standard 30.
+        - market_id (Query-Parameter, optional, str): ID des Referenz-Supermarkts.
+          Falls nicht gesetzt oder ungültig, wird der erste Markt aus der DB verwendet.
+
+    Return:
+        flask.Response: Gerendertes Template 'savings.html' mit:
+            - supermarkets (tuple[Supermarket]): Liste aller Märkte (Katalog-Snapshot),
+            - selected_market_id (str): effektiver Referenzmarkt,
+            - days (int), since (date), until (date),
+            - rows (list[SavingsLine]): Detailpositionen mit Ist- und Referenzpreisen,
+            - actual_total (float): tatsächliche Ausgaben im Zeitraum,
+            - comparable_actual_total (float): Ausgaben für vergleichbare Positionen,
+            - alt_total (float): hypothetische Ausgaben im Referenzmarkt,
+            - skipped_total (float): Summe der nicht vergleichbaren Positionen,
+            - potential_saving (float): > 0 = Referenzmarkt wäre günstiger gewesen.
+
+    Tests:
+        1. Ohne bestehende Orders im Zeitraum sind alle Summen 0 und es gibt keine Detailzeilen.
+        2. Wenn market_id fehlt oder ungültig ist, wird automatisch der erste Markt gewählt.
+        3. Für Produkte ohne Preis im Referenzmarkt wird deren Wert in skipped_total addiert
+           und in den Detailzeilen als „–“ dargestellt.
+    """
+    data = savings_data(
+        current_user_id(), parse_days(request.args.get("days")), request.args.get("market_id")
+    )
+
+    return stream_page("savings.html", **data)
+
+
+# =======================
+# Routen – JSON-API (v1)
+# =======================
+
+# Antworten ab dieser Größe werden gzip-komprimiert, falls der Client es erlaubt
+API_GZIP_MIN_BYTES = 1024
+
+
+class ApiError(Exception):
+    """Fehlerhafte API-Anfrage (wird als JSON mit Status 400 beantwortet)."""
+
+
+def _json_default(obj):
+    """Serialisiert Zeilentypen, sqlite3.Row und Datumswerte."""
+    if hasattr(obj, "as_dict"):
+        return obj.as_dict()
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Nicht serialisierbar: {type(obj).__name__}")
+
+
+def _dumps(payload) -> bytes:
+    if orjson is not None:
+        # orjson serialisiert Dataclasses (auch mit __slots__) und Datumswerte selbst
+        return orjson.dumps(payload, default=_json_default)
+    return json.dumps(
+        payload, default=_json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _requested_fields() -> list | None:
+    """Liest ?fields=a,b,c (None = alle Felder)."""
+    raw = request.args.get("fields", "").strip()
+    return [f.strip() for f in raw.split(",") if f.strip()] or None
+
+
+def _select_fields(rows, fields: list | None, row_type) -> list:
+    """
+    Label: Feldauswahl für Zeilenlisten
+    Kurzbeschreibung:
+        Reduziert jede Zeile auf die angeforderten Felder. Ohne Auswahl werden die Zeilen
+        unverändert an den Serializer gegeben. Geprüft wird gegen die Felder des Zeilentyps,
+        damit auch ein leeres Ergebnis unbekannte Felder ablehnt.
+
+    Parameter:
+        rows (list): Zeilen vom Typ row_type.
+        fields (list | None): gewünschte Feldnamen.
+        row_type (type): Zeilentyp aus database/rows.py (liefert die erlaubten Felder).
+
+    Return:
+        list: Zeilen bzw. Dictionaries mit den ausgewählten Feldern.
+
+    Tests:
+        1. fields=["name", "price"] liefert Dictionaries mit genau diesen Schlüsseln.
+        2. Ein unbekanntes Feld führt zu ApiError, auch wenn rows leer ist.
+    """
+    if not fields:
+        return rows
+    unknown = [f for f in fields if f not in row_type.keys()]
+    if unknown:
+        raise ApiError(f"Unbekannte Felder: {', '.join(unknown)}")
+    return [{f: row[f] for f in fields} for row in rows]
+
+
+def api_response(payload, status: int = 200) -> Response:
+    """
+    Label: JSON-Antwort der API
+    Kurzbeschreibung:
+        Serialisiert die Daten ohne Umweg über Jinja (orjson, falls installiert) und
+        komprimiert größere Antworten mit gzip, wenn der Client das unterstützt.
+
+    Parameter:
+        payload: JSON-serialisierbare Daten (inkl. Zeilentypen).
+        status (int): HTTP-Status.
+
+    Return:
+        flask.Response: application/json-Antwort.
+    """
+    body = _dumps(payload)
+    resp = Response(body, status=status, mimetype="application/json")
+    resp.vary.add("Accept-Encoding")
+    if len(body) >= API_GZIP_MIN_BYTES and request.accept_encodings["gzip"]:
+        resp.set_data(gzip.compress(body, compresslevel=5))
+        resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
+
+def _api_view(build):
+    """Wandelt ApiError einer API-View in eine JSON-Fehlerantwort um."""
+    def view(*args, **kwargs):
+        try:
+            return api_response(build(*args, **kwargs))
+        except ApiError as exc:
+            return api_response({"error": str(exc)}, status=400)
+    view.__name__ = build.__name__
+    view.__doc__ = build.__doc__
+    return view
+
+
+@route("/api/v1/search")
+@_api_view
+def api_search():
+    """
+    Label: Produktsuche als JSON
+    Kurzbeschreibung:
+        Wie /search, aber als JSON. Mit live=0 werden nur Datenbank-Angebote geliefert.
+
+    Parameter:
+        - q (Query-Parameter, str): Suchbegriff.
+        - live (Query-Parameter, optional): "0" = Live-Scraper nicht befragen (Standard "1").
+        - fields (Query-Parameter, optional): kommagetrennte Felder je Angebot.
+
+    Return:
+        dict: query, fuzzy, count, offers.
+
+    Tests:
+        1. GET /api/v1/search?q=Milch&live=0&fields=name,price liefert nur name und price.
+        2. Unbekanntes Feld → Status 400 mit "error".
+    """
+    query = request.args.get("q", "")
+    products, fuzzy = find_offers(query, live=request.args.get("live", "1") != "0")
+    return {
+        "query": query,
+        "fuzzy": fuzzy,
+        "count": len(products),
+        "offers": _select_fields(products, _requested_fields(), Offer),
+    }
+
+
+@route("/api/v1/saved")
+@_api_view
+def api_saved():
+    """
+    Label: Merkliste als JSON
+    Kurzbeschreibung:
+        Wie /saved, aber als JSON (optional mit ?fields=). Ungelesene Preissenkungen werden
+        mitgeliefert, aber nicht als gelesen markiert.
+
+    Return:
+        dict: count, items, price_drops.
+    """
+    user_id = current_user_id()
+    items = saved_items(user_id)
+    return {
+        "count": len(items),
+        "items": _select_fields(items, _requested_fields(), SavedItem),
+        "price_drops": unseen_drops(user_id),
+    }
+
+
+@route("/api/v1/kpis")
+@_api_view
+def api_kpis():
+    """
+    Label: KPIs als JSON
+    Kurzbeschreibung:
+        Wie /kpis, aber als JSON. ?fields= wählt Schlüssel der obersten Ebene aus
+        (total_amount, by_market, by_category, since, until, days).
+
+    Return:
+        dict: Kennzahlen des Zeitraums.
+    """
+    data = kpi_data(current_user_id(), parse_days(request.args.get("days")))
+    fields = _requested_fields()
+    if fields:
+        unknown = [f for f in fields if f not in data]
+        if unknown:
+            raise ApiError(f"Unbekannte Felder: {', '.join(unknown)}")
+        data = {f: data[f] for f in fields}
+    return data
+
+
+@route("/api/v1/savings")
+@_api_view
+def api_savings():
+    """
+    Label: Ersparnis-Analyse als JSON
+    Kurzbeschreibung:
+        Wie /savings, aber als JSON. ?fields= gilt für die Detailzeilen (rows).
+
+    Return:
+        dict: Summen, Referenzmarkt, Zeitraum und rows.
+    """
+    data = savings_data(
+        current_user_id(), parse_days(request.args.get("days")), request.args.get("market_id")
     )
+    data["rows"] = _select_fields(data["rows"], _requested_fields(), SavingsLine)
+    return data
+
+
+# =======================
+# Routen – Betrieb
+# =======================
+
+@route("/_stats/writer")
+def writer_stats():
+    """
+    Label: Kennzahlen der Single-Writer-Queue
+    Kurzbeschreibung:
+        Liefert Queue-Tiefe, Anzahl der Group-Commits und Commit-Latenzen des
+        Writer-Threads dieses Prozesses als JSON (für Monitoring und Lasttests).
+        Nur mit dem Betriebs-Token (GROCERY_PROFILE_TOKEN) im Header
+        "Authorization: Bearer <token>" (nicht X-Profile, damit Monitoring-Abfragen kein
+        Profil schreiben); sonst 404, auch wenn kein Token konfiguriert ist.
+
+    Parameter:
+        - Keine
+
+    Return:
+        flask.Response: JSON-Objekt aus WriteCoordinator.stats() bzw. 404.
+
+    Tests:
+        1. Nach einem POST auf /add_order ist "jobs" um eins gestiegen.
+        2. Ohne Last ist "queue_depth" gleich 0.
+        3. Ohne bzw. mit falschem Token antwortet die Route mit 404.
+    """
+    scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token_matches(supplied.strip()):
+        return jsonify(error="Nicht gefunden"), 404
+    return jsonify(get_writer().stats())
 
 
 # =======================
@@ -731,6 +1483,7 @@ if __name__ == "__main__":
     Kurzbeschreibung:
         Startet die Flask-Anwendung im Debug-Modus, wenn app.py direkt über den
         Python-Interpreter ausgeführt wird. Geeignet für lokale Entwicklung und Tests.
+        Für den Produktivbetrieb mit mehreren Workern siehe gunicorn.conf.py.
 
     Tests:
         1. Ausführung von `python app.py` startet einen Entwicklungsserver auf
@@ -738,4 +1491,4 @@ if __name__ == "__main__":
         2. Änderungen am Code werden im Debug-Modus automatisch neu geladen.
     """
     print("Starte Flask app, app.py:", os.path.abspath(__file__))
-    app.run(debug=True)
+    create_app().run(debug=True)
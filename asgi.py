@@ -0,0 +1,190 @@
+# asgi.py
+"""
+Label: ASGI-Einstiegspunkt mit asynchroner Produktsuche
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Unter gunicorn belegt jede Suche einen Worker-Thread, bis alle Live-Scraper geantwortet
+    haben oder die Deadline abgelaufen ist. Dieser Einstiegspunkt für ASGI-Server (uvicorn)
+    beantwortet /search stattdessen als Coroutine:
+        - DB-Abfrage (db_offers) im Thread-Pool und Live-Scraper (fan_out_async)
+          laufen gleichzeitig; gewartet wird in der Event-Loop, ohne einen Thread zu belegen,
+        - Zuordnung der Live-Treffer und Rendern des Templates laufen ebenfalls im Thread-Pool
+          (asyncio.to_thread übernimmt den Flask-Request-Kontext),
+        - Hooks (Anmeldung, Session) und Template sind dieselben wie in app.py.
+    Alle anderen Routen laufen unverändert über asgiref.WsgiToAsgi durch die Flask-App.
+    Nicht auf /search wirkt die WSGI-Middleware aus profiling.py.
+
+    Grenze: Die Marktabfragen selbst bleiben synchron (requests). fan_out_async() reicht sie
+    an den Scraper-Pool weiter und wartet nur asynchron; jede laufende Abfrage belegt weiter
+    einen Pool-Thread je Markt. Live-Crawls sind damit durch GROCERY_SCRAPER_THREADS
+    begrenzt (Standard 8): Weitere Suchen warten in der Warteschlange des Pools, verbrauchen
+    dort ihre Deadline (GROCERY_SCRAPE_DEADLINE) und kommen dann nur mit DB-Angeboten zurück.
+    Gewonnen wird, dass wartende Suchen keinen Request-Thread blockieren; für viele
+    gleichzeitige Suchen muss der Pool entsprechend groß sein (etwa gleichzeitige Suchen
+    × Märkte).
+
+    Start (ein Worker bedient viele laufende Suchen gleichzeitig):
+        GROCERY_SCRAPER_THREADS=32 uvicorn asgi:app --host 127.0.0.1 --port 8000 --workers 2
+
+    Messung: python benchmarks/asgi_concurrency.py
+"""
+import asyncio
+import io
+import os
+import sys
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import render_template, request
+
+from app import create_app, db_offers, merge_live_offers
+
+flask_app = create_app(warm=os.getenv("GROCERY_PRELOAD", "1") != "0")
+_wsgi = WsgiToAsgi(flask_app)
+
+
+def _environ(scope: dict, body: bytes) -> dict:
+    """Baut aus einem ASGI-HTTP-Scope ein WSGI-Environ (für den Flask-Request-Kontext)."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif name != "CONTENT_LENGTH":
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+async def _live_offers(query: str) -> list[dict]:
+    """Live-Treffer aller Scraper, bereits Katalogprodukten zugeordnet."""
+    # Crawler erst beim ersten Bedarf importieren (wie in app.find_offers)
+    from scrapers.matching import resolve_items
+    from scrapers.registry import fan_out_async
+
+    items = await fan_out_async(query)
+    return await asyncio.to_thread(resolve_items, items) if items else []
+
+
+async def _no_offers() -> list:
+    return []
+
+
+async def search(scope, receive, send):
+    """
+    Label: Produktsuche (asynchron)
+    Kurzbeschreibung:
+        Entspricht app.search(): gleiche Parameter, gleiches Template, gleiche Hooks. DB und
+        Live-Scraper werden gleichzeitig abgefragt; solange die Scraper laufen, bedient die
+        Event-Loop andere Requests.
+
+    Parameter:
+        scope, receive, send: ASGI-Schnittstelle.
+
+    Tests:
+        1. GET /search?q=milch liefert dieselben DB-Angebote wie die WSGI-Route.
+        2. 50 gleichzeitige Suchen mit 0,5 s Scraper-Latenz dauern in einem Worker deutlich
+           weniger als 50 × 0,5 s (siehe benchmarks/asgi_concurrency.py).
+        3. Ohne Anmeldung (kein Default-User) wird wie in der WSGI-Route auf /login umgeleitet.
+        4. abort(403) in einem before_request-Hook liefert 403 (nicht 500) wie unter WSGI.
+    """
+    body = await _read_body(receive)
+    # Ablauf wie Flask.wsgi_app/full_dispatch_request: HTTPExceptions (abort, Redirects) über
+    # handle_user_exception, nur echte Fehler als 500 über handle_exception; ctx.pop(error)
+    # führt die teardown_request-Hooks (do_teardown_request) mit dem Fehler aus.
+    ctx = flask_app.request_context(_environ(scope, body))
+    error = None
+    ctx.push()
+    try:
+        try:
+            response = flask_app.preprocess_request()
+            if response is None:
+                query = (
+                    request.form.get("q", "")
+                    if request.method == "POST"
+                    else request.args.get("q", "")
+                )
+                (products, fuzzy), live_results = await asyncio.gather(
+                    asyncio.to_thread(db_offers, query),
+                    _live_offers(query) if query else _no_offers(),
+                )
+                products = merge_live_offers(products, live_results)
+                response = await asyncio.to_thread(
+                    render_template, "search.html", query=query, products=products, fuzzy=fuzzy
+                )
+        except Exception as exc:
+            response = flask_app.handle_user_exception(exc)
+        response = flask_app.finalize_request(response)
+    except Exception as exc:
+        error = exc
+        response = flask_app.handle_exception(exc)
+    try:
+        headers = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                   for name, value in response.headers.items()]
+        payload = response.get_data()
+    finally:
+        ctx.pop(error)
+
+    await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": payload})
+
+
+# Pfad → asynchrone Route; alles andere geht an die Flask-App
+ASYNC_ROUTES = {"/search": search}
+
+
+async def app(scope, receive, send):
+    """
+    Label: ASGI-Anwendung
+    Kurzbeschreibung:
+        Verteilt Requests auf die asynchronen Routen (ASYNC_ROUTES) bzw. die Flask-App.
+        Das Lifespan-Protokoll wird direkt bestätigt (Start-Arbeit erledigt create_app()).
+    """
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    handler = ASYNC_ROUTES.get(scope.get("path")) if scope["type"] == "http" else None
+    if handler is not None and scope["method"] in ("GET", "POST"):
+        await handler(scope, receive, send)
+    else:
+        await _wsgi(scope, receive, send)
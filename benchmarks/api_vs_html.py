@@ -0,0 +1,73 @@
+# benchmarks/api_vs_html.py
+"""
+Label: Antwortzeit und -größe der JSON-API im Vergleich zu den HTML-Seiten
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Ruft jede HTML-Route und ihr /api/v1-Gegenstück über den Flask-Test-Client auf und
+    misst Median-Antwortzeit sowie Größe der Antwort (unkomprimiert und mit gzip).
+    Live-Scraper werden nicht befragt: /search ohne Suchbegriff bzw. die API mit live=0.
+    Verwendet die vorhandene grocery.db.
+
+    Aufruf (aus dem Projektverzeichnis):
+        python benchmarks/api_vs_html.py
+        python benchmarks/api_vs_html.py --repeats 200 --days 90
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(BASE_DIR))
+
+import app as app_module  # noqa: E402
+
+
+def pairs(days: int, query: str):
+    return [
+        ("search", f"/search?q={query}", f"/api/v1/search?q={query}&live=0"),
+        ("saved", "/saved", "/api/v1/saved"),
+        ("kpis", f"/kpis?days={days}", f"/api/v1/kpis?days={days}"),
+        ("savings", f"/savings?days={days}", f"/api/v1/savings?days={days}"),
+    ]
+
+
+def measure(client, url: str, repeats: int, headers=None):
+    """Liefert (Median in ms, Bytes der letzten Antwort)."""
+    timings = []
+    size = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        resp = client.get(url, headers=headers)
+        timings.append(time.perf_counter() - started)
+        size = len(resp.data)
+    return statistics.median(timings) * 1000, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON-API vs. HTML-Seiten")
+    parser.add_argument("--repeats", type=int, default=100)
+    parser.add_argument("--days", type=int, default=30, choices=(7, 30, 90))
+    parser.add_argument("--query", default="", help="Suchbegriff (leer = alle DB-Angebote)")
+    args = parser.parse_args()
+
+    print(f"JSON-Serializer: {'orjson' if app_module.orjson is not None else 'json (stdlib)'}")
+    client = app_module.create_app().test_client()
+    gzip_header = {"Accept-Encoding": "gzip"}
+    print(f"{'Route':<8} {'HTML [ms]':>10} {'HTML [B]':>10} {'API [ms]':>10} {'API [B]':>10} "
+          f"{'API gzip [B]':>13}")
+    for name, html_url, api_url in pairs(args.days, args.query):
+        html_ms, html_size = measure(client, html_url, args.repeats)
+        api_ms, api_size = measure(client, api_url, args.repeats)
+        _, gzip_size = measure(client, api_url, 1, headers=gzip_header)
+        print(f"{name:<8} {html_ms:10.2f} {html_size:10d} {api_ms:10.2f} {api_size:10d} "
+              f"{gzip_size:13d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# benchmarks/asgi_concurrency.py
+"""
+Label: Gleichzeitige Suchen je Worker – ASGI (asgi.py) vs. WSGI (Thread-Worker)
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Lasttest mit --clients gleichzeitigen Suchen gegen genau einen Worker:
+        - wsgi: Flask-App mit --threads Threads (wie ein gunicorn-Worker, GROCERY_THREADS),
+        - asgi: asgi:app unter uvicorn (eine Event-Loop).
+    Statt der echten Märkte antwortet ein simulierter Scraper nach --latency Sekunden, damit
+    die Messung reproduzierbar und ohne Netzwerk läuft. Ausgegeben werden Gesamtdauer,
+    Latenz (p50/p95), die erreichte Parallelität: clients × latency / Gesamtdauer
+    (= wie viele Suchen der Worker im Mittel gleichzeitig offen hatte) und wie viele Suchen
+    Live-Treffer enthielten.
+
+    Beide Varianten teilen sich denselben Scraper-Pool (--scraper-threads, Standard wie in
+    Produktion GROCERY_SCRAPER_THREADS bzw. 8). Die Marktabfragen bleiben auch unter ASGI
+    synchron und belegen je Markt einen Pool-Thread; Suchen, die länger als die Deadline
+    (GROCERY_SCRAPE_DEADLINE) in der Warteschlange stehen, kommen ohne Live-Treffer zurück.
+    Verwendet die vorhandene grocery.db; benötigt uvicorn und asgiref.
+
+    Aufruf (aus dem Projektverzeichnis):
+        python benchmarks/asgi_concurrency.py
+        python benchmarks/asgi_concurrency.py --clients 200 --latency 1.0 --scraper-threads 32
+"""
+import argparse
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(BASE_DIR))
+
+import uvicorn  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from scrapers import registry  # noqa: E402
+
+LATENCY = 0.5
+
+
+class SimulatedScraper(registry.Scraper):
+    """Antwortet nach LATENCY Sekunden mit einem Treffer (statt HTTP-Abruf)."""
+
+    name = "simulated"
+    supermarket_name = "Aldi Süd"
+
+    def search(self, query, top_n=3, session=None, max_wait=None):
+        time.sleep(LATENCY)
+        return [{
+            "supermarket_name": self.supermarket_name, "name": f"{query} (live)", "brand": None,
+            "price": 1.0, "product_url": f"https://example.invalid/{query}", "is_live": True,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }]
+
+
+def _use_simulated_scraper():
+    # Eingebaute Plugins nicht laden, nur den simulierten Markt befragen
+    registry._loaded = True
+    registry._registry.clear()
+    registry.register(SimulatedScraper)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(port: int):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server auf Port {port} nicht erreichbar")
+
+
+def start_wsgi(threads: int):
+    """Flask-App mit höchstens threads gleichzeitig laufenden Requests (wie ein gunicorn-Worker)."""
+    from app import create_app
+
+    flask_app = create_app(warm=True)
+    slots = threading.BoundedSemaphore(threads)
+
+    def limited(environ, start_response):
+        with slots:
+            return [b"".join(flask_app(environ, start_response))]
+
+    port = _free_port()
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", port, limited, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _wait_for(port)
+    return port, server.shutdown
+
+
+def start_asgi():
+    """asgi:app unter uvicorn mit einer Event-Loop."""
+    import asgi
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(asgi.app, host="127.0.0.1", port=port,
+                                           log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    _wait_for(port)
+
+    def stop():
+        server.should_exit = True
+
+    return port, stop
+
+
+def load_test(port: int, clients: int) -> tuple[float, list, int]:
+    """clients gleichzeitige Suchen; liefert Gesamtdauer, Einzellatenzen (s) und Anzahl mit Live-Treffer."""
+    def one(i):
+        started = time.perf_counter()
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/search?q=milch{i}", timeout=120) as resp:
+            body = resp.read()
+            assert resp.status == 200
+        return time.perf_counter() - started, b"(live)" in body
+
+    with ThreadPoolExecutor(clients) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(one, range(clients)))
+        total = time.perf_counter() - started
+    return total, [latency for latency, _ in results], sum(live for _, live in results)
+
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser(description="Gleichzeitige Suchen je Worker: ASGI vs. WSGI")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5, help="simulierte Scraper-Latenz (s)")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("GROCERY_THREADS", "4")),
+                        help="Threads des WSGI-Workers")
+    parser.add_argument("--scraper-threads", type=int,
+                        default=int(os.getenv("GROCERY_SCRAPER_THREADS", "8")),
+                        help="Größe des Scraper-Pools (für beide Varianten gleich)")
+    args = parser.parse_args()
+    LATENCY = args.latency
+    # Der Pool wird erst beim ersten Fan-out angelegt und liest die Größe dann aus der Umgebung
+    os.environ["GROCERY_SCRAPER_THREADS"] = str(args.scraper_threads)
+    _use_simulated_scraper()
+
+    print(f"{args.clients} gleichzeitige Suchen, Scraper-Latenz {args.latency:.2f} s, ein Worker, "
+          f"Scraper-Pool {args.scraper_threads} Threads, Deadline {registry.DEFAULT_DEADLINE:.1f} s")
+    print(f"{'Variante':<18} {'gesamt s':>9} {'p50 s':>7} {'p95 s':>7} {'parallel':>9} {'mit Live':>9}")
+    for label, start in ((f"wsgi ({args.threads} Threads)", lambda: start_wsgi(args.threads)),
+                         ("asgi (uvicorn)", start_asgi)):
+        port, stop = start()
+        load_test(port, min(args.clients, 4))  # Aufwärmen (Imports, Templates)
+        total, latencies, live = load_test(port, args.clients)
+        stop()
+        latencies.sort()
+        print(f"{label:<18} {total:9.2f} {statistics.median(latencies):7.2f} "
+              f"{latencies[int(len(latencies) * 0.95) - 1]:7.2f} "
+              f"{args.clients * args.latency / total:9.1f} {live:>5}/{args.clients}")
+
+
+if __name__ == "__main__":
+    main()
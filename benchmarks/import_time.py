@@ -0,0 +1,130 @@
+# benchmarks/import_time.py
+"""
+Label: Import-Zeit-Profil (python -X importtime)
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Misst die Kaltstartzeit der Web-App und der Hilfsskripte unter database/. Für jedes Modul
+    wird ein frischer Interpreter mit `-X importtime` gestartet, die Ausgabe ausgewertet und
+    ein Bericht mit Gesamtzeit sowie den teuersten Imports (kumulativ) ausgegeben.
+
+    Aufruf (aus dem Projektverzeichnis):
+        python benchmarks/import_time.py
+        python benchmarks/import_time.py --runs 5 --top 15 app scrapers.aldi_crawler
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent.resolve()
+
+# Standardziele: Web-App (inkl. Factory) und die CLI-Skripte unter database/
+DEFAULT_TARGETS = [
+    "app",
+    "scrapers.aldi_crawler",
+    "db_init",
+    "reset_db",
+    "populate_db",
+    "pop_with_csv",
+    "pop_with_example",
+]
+
+
+def measure_import(module: str) -> list[tuple[int, int, str]]:
+    """
+    Label: Einzelmessung
+    Kurzbeschreibung:
+        Startet einen neuen Interpreter mit `-X importtime`, importiert das Modul und
+        liefert alle protokollierten Imports zurück.
+
+    Parameter:
+        module (str): Modulname, z. B. "app" oder "db_init" (database/ liegt im Suchpfad).
+
+    Return:
+        list[tuple[int, int, str]]: (self_us, cumulative_us, modulname) je Import.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(BASE_DIR), str(BASE_DIR / "database"), env.get("PYTHONPATH", "")]
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import von {module} fehlgeschlagen:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return entries
+
+
+def _subtree(entries, module):
+    """
+    Schneidet aus der importtime-Ausgabe nur die Imports heraus, die durch das Zielmodul
+    ausgelöst wurden (Interpreterstart/site werden ignoriert). Kinder stehen vor ihrem
+    Elternmodul und sind tiefer eingerückt.
+    """
+    def depth(name):
+        return len(name) - len(name.lstrip())
+
+    end = max(i for i, e in enumerate(entries) if e[2].strip() == module)
+    root_depth = depth(entries[end][2])
+    start = end
+    while start > 0 and depth(entries[start - 1][2]) > root_depth:
+        start -= 1
+    return entries[start:end + 1]
+
+
+def profile(module: str, runs: int) -> tuple[float, list[tuple[int, int, str]]]:
+    """Führt mehrere Messungen durch und liefert die schnellste (geringstes Rauschen)."""
+    best = None
+    for _ in range(runs):
+        entries = _subtree(measure_import(module), module)
+        total = entries[-1][1]
+        if best is None or total < best[0]:
+            best = (total, entries)
+    return best[0] / 1000.0, best[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-Zeit-Profil der Anwendung")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--runs", type=int, default=3, help="Messungen pro Modul (Minimum zählt)")
+    parser.add_argument("--top", type=int, default=10, help="Anzahl der teuersten Imports je Modul")
+    args = parser.parse_args()
+
+    summary = []
+    for module in args.modules:
+        total_ms, entries = profile(module, args.runs)
+        summary.append((module, total_ms))
+
+        print(f"\n== {module}: {total_ms:.1f} ms ==")
+        print(f"{'kumulativ [ms]':>15} {'self [ms]':>10}  Modul")
+        heaviest = sorted(
+            (e for e in entries if e[2].strip() != module),
+            key=lambda e: e[1],
+            reverse=True,
+        )[: args.top]
+        for self_us, cumulative_us, name in heaviest:
+            print(f"{cumulative_us / 1000:15.1f} {self_us / 1000:10.1f}  {name}")
+
+    print("\n== Zusammenfassung ==")
+    for module, total_ms in summary:
+        print(f"{module:<25} {total_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/read_mirror.py
+"""
+Label: Leselatenz In-Memory-Spiegel vs. Datei
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Misst je Request-Muster (Verbindung öffnen, Abfrage, schließen) die Latenz gegen
+    grocery.db und gegen den In-Memory-Spiegel (database/read_mirror.py):
+        - search:  Angebote per LIKE (wie /search),
+        - offers:  alle Angebote (wie /search ohne Suchbegriff),
+        - price:   einzelner Preis (wie /add_order je Position),
+    außerdem die Dauer einer Aktualisierung nach einer Preisänderung. Sie wächst mit der
+    Größe von supermarket_products (die Tabelle wird komplett neu geladen), daher wird die
+    Zeilenzahl mit ausgegeben.
+    Verwendet die vorhandene grocery.db (ändert einen Preis und setzt ihn zurück).
+
+    Aufruf (aus dem Projektverzeichnis):
+        python benchmarks/read_mirror.py
+        python benchmarks/read_mirror.py --repeats 5000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(BASE_DIR))
+
+from database.my_helpers import get_connection  # noqa: E402
+from database.read_mirror import ReadMirror  # noqa: E402
+from database.writer import get_writer  # noqa: E402
+
+OFFERS = """
+SELECT p.id, p.name, b.name, c.name, s.name, s.id, sp.price
+FROM products p
+JOIN supermarket_products sp ON sp.product_id = p.id
+JOIN supermarkets s ON s.id = sp.supermarket_id
+LEFT JOIN brands b ON b.id = p.brand_id
+LEFT JOIN categories c ON c.id = p.category_id
+{where}
+ORDER BY p.name, sp.price
+"""
+
+QUERIES = {
+    "search": (OFFERS.format(where="WHERE p.name LIKE ? OR p.category_id IN (SELECT id FROM categories WHERE name LIKE ?)"), ("%milch%", "%milch%")),
+    "offers": (OFFERS.format(where=""), ()),
+    "price": ("SELECT price FROM supermarket_products WHERE supermarket_id = ? AND product_id = ?",
+              ("s1", "p1")),
+}
+
+
+def measure(connect, sql, params, repeats: int):
+    """Median und p95 (µs) für Verbinden + Abfragen + Schließen."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        conn = connect()
+        conn.execute(sql, params).fetchall()
+        conn.close()
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leselatenz: In-Memory-Spiegel vs. Datei")
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+
+    # max_age groß: gemessen wird das reine Lesen, nicht die Versionsprüfung
+    mirror = ReadMirror(max_age=3600)
+    started = time.perf_counter()
+    mirror.uri()
+    print(f"Erstes Laden (Backup-API): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    print(f"{'Abfrage':<8} {'Datei p50':>10} {'p95':>8} {'Spiegel p50':>12} {'p95':>8}  [µs]")
+    for name, (sql, params) in QUERIES.items():
+        file_p50, file_p95 = measure(get_connection, sql, params, args.repeats)
+        mem_p50, mem_p95 = measure(mirror.connect, sql, params, args.repeats)
+        print(f"{name:<8} {file_p50:10.0f} {file_p95:8.0f} {mem_p50:12.0f} {mem_p95:8.0f}")
+
+    # Aktualisierung nach einem Commit: Kopie der Generation + supermarket_products komplett
+    writer = get_writer()
+    writer.add_commit_listener(mirror.mark_dirty)
+    update = "UPDATE supermarket_products SET price = price + ? WHERE supermarket_id = 's1' AND product_id = 'p1'"
+    writer.execute(lambda conn: conn.execute(update, (0.01,)))
+    started = time.perf_counter()
+    mirror.uri()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    conn = get_connection()
+    rows = conn.execute("SELECT COUNT(*) FROM supermarket_products").fetchone()[0]
+    conn.close()
+    print(f"Aktualisierung nach Preisänderung: {elapsed_ms:.1f} ms bei {rows} Preiszeilen "
+          f"({mirror.stats()['generations']} Generationen)")
+    writer.execute(lambda conn: conn.execute(update, (-0.01,)))
+
+
+if __name__ == "__main__":
+    main()
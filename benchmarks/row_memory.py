@@ -0,0 +1,138 @@
+# benchmarks/row_memory.py
+"""
+Label: Speicherbedarf und Renderzeit der Zeilentypen
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Vergleicht drei Darstellungen derselben Suchergebnisse:
+        - sqlite3.Row (bisherige DB-Zeilen),
+        - dict (bisherige Crawler-Treffer),
+        - database.rows.Offer (Dataclass mit __slots__).
+    Gemessen werden der Speicher je 100k Zeilen (tracemalloc, nur die Ergebnisliste) und die
+    Renderzeit von templates/search.html. Die Daten liegen in einer In-Memory-Datenbank,
+    grocery.db wird nicht verwendet.
+
+    Aufruf (aus dem Projektverzeichnis):
+        python benchmarks/row_memory.py
+        python benchmarks/row_memory.py --rows 50000 --render-rows 5000
+"""
+import argparse
+import gc
+import sqlite3
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(BASE_DIR))
+
+from database.rows import Offer, fetch_as  # noqa: E402
+
+SQL = """
+SELECT
+    p.id AS product_id, p.name, p.brand, p.category,
+    s.name AS supermarket_name, s.id AS supermarket_id, sp.price
+FROM products p
+JOIN supermarket_products sp ON sp.product_id = p.id
+JOIN supermarkets s ON s.id = sp.supermarket_id
+"""
+
+
+def build_db(rows: int) -> sqlite3.Connection:
+    """Legt eine In-Memory-Datenbank mit `rows` Preisangeboten an (3 Märkte je Produkt)."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE supermarkets (id TEXT PRIMARY KEY, name TEXT);
+        CREATE TABLE products (id TEXT PRIMARY KEY, name TEXT, brand TEXT, category TEXT);
+        CREATE TABLE supermarket_products (product_id TEXT, supermarket_id TEXT, price REAL);
+        INSERT INTO supermarkets VALUES ('s1', 'Aldi Süd'), ('s2', 'Rewe'), ('s3', 'Lidl');
+        """
+    )
+    products = (rows + 2) // 3
+    conn.executemany(
+        "INSERT INTO products VALUES (?, ?, ?, ?)",
+        ((f"p{i}", f"Produkt {i} Vollmilch", f"Marke {i % 50}", f"Kategorie {i % 20}")
+         for i in range(products)),
+    )
+    conn.executemany(
+        "INSERT INTO supermarket_products VALUES (?, ?, ?)",
+        ((f"p{i // 3}", f"s{i % 3 + 1}", 0.5 + (i % 400) / 100) for i in range(rows)),
+    )
+    return conn
+
+
+def load_rows(conn):
+    conn.row_factory = sqlite3.Row
+    return conn.execute(SQL).fetchall()
+
+
+def load_dicts(conn):
+    conn.row_factory = sqlite3.Row
+    return [
+        {**dict(row), "is_live": True, "product_url": None, "timestamp": "2026-10-19T12:00:00"}
+        for row in conn.execute(SQL)
+    ]
+
+
+def load_offers(conn):
+    conn.row_factory = sqlite3.Row
+    return fetch_as(conn.execute(SQL), Offer)
+
+
+VARIANTS = [("sqlite3.Row", load_rows), ("dict", load_dicts), ("Offer (slots)", load_offers)]
+
+
+def measure_memory(conn, loader):
+    """Liefert (Bytes, Sekunden) für das Laden der Ergebnisliste."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = loader(conn)
+    seconds = time.perf_counter() - started
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, seconds
+
+
+def measure_render(conn, loader, limit: int, repeats: int) -> float:
+    """Renderzeit (Minimum aus `repeats` Läufen) von search.html mit `limit` Zeilen."""
+    from app import create_app
+
+    app = create_app()
+    products = loader(conn)[:limit]
+    template = app.jinja_env.get_template("search.html")
+    best = None
+    with app.test_request_context("/search?q=Vollmilch"):
+        for _ in range(repeats):
+            started = time.perf_counter()
+            template.render(query="Vollmilch", products=products, fuzzy=False)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speicher/Renderzeit der Zeilentypen")
+    parser.add_argument("--rows", type=int, default=100_000, help="Anzahl Zeilen für die Speichermessung")
+    parser.add_argument("--render-rows", type=int, default=10_000, help="Anzahl Zeilen im Template")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    conn = build_db(args.rows)
+    print(f"{'Variante':<15} {'MB gesamt':>10} {'Bytes/Zeile':>12} {'Laden [ms]':>11} "
+          f"{'Render ' + str(args.render_rows) + ' [ms]':>18}")
+    for name, loader in VARIANTS:
+        size, seconds = measure_memory(conn, loader)
+        render = measure_render(conn, loader, args.render_rows, args.repeats)
+        print(f"{name:<15} {size / 1e6:10.1f} {size / args.rows:12.0f} {seconds * 1000:11.1f} "
+              f"{render * 1000:18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+# backup_db.py
+"""
+Label: Online-Backup und Zurücksetzen per Template-Klon
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    reset_db.py löscht grocery.db und funktioniert nur, solange kein anderer Prozess die Datei
+    geöffnet hat; danach müssen Schema und Daten komplett neu eingefügt werden. Dieses Skript
+    nutzt stattdessen die Backup-API von SQLite:
+
+        - backup:   Kopie der laufenden Datenbank ohne Downtime. Kopiert wird seitenweise
+                    (pages Seiten pro Schritt, dazwischen kurze Pause), sodass Schreiber nie
+                    lange warten. Das Ziel wird erst am Ende atomar umbenannt.
+        - template: Baut einmalig eine fertig befüllte Vorlage (Schema + Beispiel- bzw.
+                    CSV-Daten) unter .cache/templates. Der Dateiname enthält einen Hash über
+                    schema.sql und Seed-Skript; nach Änderungen wird automatisch neu gebaut.
+        - reset:    Kopiert die Vorlage per Backup-API in grocery.db (Millisekunden, auch bei
+                    laufendem Server). Die Versionszähler in 'table_versions' werden danach
+                    angehoben, damit In-Memory-Caches laufender Prozesse neu laden.
+        - restore:  Wie reset, aber aus einer beliebigen Backup-Datei.
+
+    Liegen Bestellungen und Merklisten in Shards (SHARD_DIR, siehe database/sharding.py),
+    sichert backup jede Shard-Datei mit in das Verzeichnis <backup>.shards neben der
+    Backup-Datei. restore/reset spielen die Shards daraus zurück; Shards, die es im Backup
+    nicht gibt (z. B. User, die sich später registriert haben), werden geleert, damit keine
+    aktuellen Nutzerdaten neben einem alten zentralen Stand stehen bleiben. Die Dateien werden
+    nacheinander kopiert, jede für sich konsistent; Schreibzugriffe zwischen zwei Dateien
+    können also im Backup auf einer Seite fehlen.
+
+    Aufruf (aus dem Projektverzeichnis):
+        python database/backup_db.py backup [--keep 10]
+        python database/backup_db.py reset [--kind example|csv]
+        python database/backup_db.py restore backups/grocery-20261019-120000.db
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from my_helpers import BASE_DIR, DB_PATH, SHARD_DIR
+
+# Nutzerbezogene Tabellen in den Shards (wie USER_TABLES in database/sharding.py)
+SHARD_TABLES = ("orders", "order_items", "saved_products")
+
+BACKUP_DIR = BASE_DIR / "backups"
+TEMPLATE_DIR = BASE_DIR / ".cache" / "templates"
+SCHEMA_FILE = Path(__file__).parent / "schema.sql"
+SEED_FILES = {
+    "example": Path(__file__).parent / "pop_with_example.py",
+    "csv": Path(__file__).parent / "pop_with_csv.py",
+}
+
+
+def _copy(source, target, pages: int = 0, sleep: float = 0.0, progress=None):
+    """Kopiert source → target per Backup-API (beides Pfade oder Verbindungen)."""
+    src = source if isinstance(source, sqlite3.Connection) else sqlite3.connect(source)
+    dst = target if isinstance(target, sqlite3.Connection) else sqlite3.connect(target)
+    try:
+        src.backup(dst, pages=pages, sleep=sleep, progress=progress)
+    finally:
+        if src is not source:
+            src.close()
+        if dst is not target:
+            dst.close()
+
+
+def _shard_files(directory) -> list[Path]:
+    """Alle Shard-Dateien in directory (leer, wenn es das Verzeichnis nicht gibt)."""
+    directory = Path(directory)
+    return sorted(directory.glob("*.db")) if directory.is_dir() else []
+
+
+def shard_backup_dir(backup) -> Path:
+    """Verzeichnis mit den Shards zu einer Backup-Datei: backups/grocery-<Zeit>.shards."""
+    backup = Path(backup)
+    return backup.with_name(f"{backup.stem}.shards")
+
+
+def online_backup(target=None, source=DB_PATH, pages: int = 256, sleep: float = 0.005,
+                  keep: int | None = None, shard_dir=SHARD_DIR) -> Path:
+    """
+    Label: Online-Backup erstellen
+    Kurzbeschreibung:
+        Kopiert die Datenbank im laufenden Betrieb. Zwischen den Schritten (je pages Seiten)
+        wird die Sperre freigegeben und sleep Sekunden gewartet, damit Schreiber
+        weiterarbeiten. Ändert ein anderer Prozess die Quelle, beginnt SQLite den Durchlauf
+        automatisch neu; das Ergebnis ist immer ein konsistenter Stand.
+
+    Parameter:
+        target (Path | str, optional): Zieldatei. Standard: backups/grocery-<Zeitstempel>.db.
+        source (Path | str): Quelldatenbank. Standard: grocery.db.
+        pages (int): Seiten pro Schritt (0 oder negativ = alles in einem Schritt).
+        sleep (float): Pause zwischen den Schritten in Sekunden.
+        keep (int, optional): Nur die neuesten keep Backups im Verzeichnis des Ziels behalten.
+        shard_dir (Path | str): Shard-Verzeichnis, dessen Dateien mitgesichert werden.
+
+    Return:
+        Path: Pfad des fertigen Backups.
+
+    Tests:
+        1. Das Backup enthält dieselbe Anzahl Zeilen in 'products' wie die Quelle.
+        2. Während des Backups abgesetzte Schreibzugriffe schlagen nicht mit "database is locked" fehl.
+        3. Mit Shards enthält <backup>.shards je Shard eine Datei mit denselben Bestellungen.
+        4. Mit --to in ein anderes Verzeichnis bleibt BACKUP_DIR bei --keep unangetastet.
+    """
+    if target is None:
+        BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+        target = BACKUP_DIR / f"grocery-{datetime.now():%Y%m%d-%H%M%S}.db"
+    target = Path(target)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+
+    shards = _shard_files(shard_dir)
+    if shards:
+        # Shards zuerst: die Backup-Datei selbst entsteht als Letztes (= Backup vollständig)
+        shard_target = shard_backup_dir(target)
+        shard_tmp = shard_target.with_name(f"{shard_target.name}.{os.getpid()}.tmp")
+        shutil.rmtree(shard_tmp, ignore_errors=True)
+        shard_tmp.mkdir(parents=True)
+        for shard in shards:
+            _copy(shard, shard_tmp / shard.name, pages=pages, sleep=sleep)
+        shutil.rmtree(shard_target, ignore_errors=True)
+        os.replace(shard_tmp, shard_target)
+    else:
+        # Kein veraltetes Shard-Verzeichnis eines früheren Backups gleichen Namens übernehmen
+        shutil.rmtree(shard_backup_dir(target), ignore_errors=True)
+
+    _copy(source, tmp, pages=pages, sleep=sleep)
+    # Erst der vollständige Stand erhält den endgültigen Namen
+    os.replace(tmp, target)
+
+    if keep is not None and keep > 0:
+        # Nur das Verzeichnis aufräumen, in das gerade geschrieben wurde
+        for old in sorted(target.parent.glob("grocery-*.db"))[:-keep]:
+            old.unlink()
+            shutil.rmtree(shard_backup_dir(old), ignore_errors=True)
+    return target
+
+
+def _fingerprint(kind: str) -> str:
+    digest = hashlib.sha256(SCHEMA_FILE.read_bytes())
+    digest.update(SEED_FILES[kind].read_bytes())
+    if kind == "example":
+        # Beispieldaten sind relativ zu "heute" datiert (KPIs für 7/30/90 Tage)
+        digest.update(date.today().isoformat().encode())
+    else:
+        for csv_file in sorted((BASE_DIR / "data").glob("*.csv")):
+            digest.update(csv_file.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def build_template(kind: str = "example", rebuild: bool = False) -> Path:
+    """
+    Label: Befüllte Vorlage bereitstellen
+    Kurzbeschreibung:
+        Liefert die Vorlage für kind und baut sie bei Bedarf (Schema + Seed in eine neue
+        Datei, danach atomar umbenannt). Veraltete Vorlagen derselben Art werden entfernt.
+
+    Parameter:
+        kind (str): "example" (pop_with_example.py) oder "csv" (pop_with_csv.py).
+        rebuild (bool): Vorlage auch dann neu bauen, wenn sie schon existiert.
+
+    Return:
+        Path: Pfad der Vorlage.
+
+    Tests:
+        1. Zwei Aufrufe ohne Änderungen liefern dieselbe Datei, ohne neu zu bauen.
+        2. Nach einer Änderung an schema.sql entsteht eine Vorlage mit neuem Namen.
+    """
+    TEMPLATE_DIR.mkdir(parents=True, exist_ok=True)
+    path = TEMPLATE_DIR / f"{kind}-{_fingerprint(kind)}.db"
+    if path.exists() and not rebuild:
+        return path
+
+    import db_init
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    db_init.init_tables(tmp)
+    if kind == "example":
+        import pop_with_example
+        pop_with_example.main(tmp)
+    else:
+        import pop_with_csv
+        pop_with_csv.seed_data(tmp)
+    os.replace(tmp, path)
+
+    for stale in TEMPLATE_DIR.glob(f"{kind}-*.db"):
+        if stale != path:
+            stale.unlink()
+    return path
+
+
+def _restore_file(source, target) -> dict:
+    """Überschreibt target mit source (Backup-API); liefert die Zähler aus 'table_versions' vorher."""
+    conn = sqlite3.connect(target, timeout=30)
+    try:
+        try:
+            before = dict(conn.execute("SELECT name, version FROM table_versions").fetchall())
+        except sqlite3.OperationalError:
+            before = {}
+        _copy(source, conn)
+        with conn:
+            for name, version in before.items():
+                conn.execute(
+                    "UPDATE table_versions SET version = MAX(version, ?) + 1 WHERE name = ?",
+                    (version, name),
+                )
+    finally:
+        conn.close()
+    return before
+
+
+def _restore_shards(source_dir, shard_dir):
+    """Shards aus source_dir zurückspielen, alle übrigen Shards in shard_dir leeren."""
+    shard_dir = Path(shard_dir)
+    backed_up = {shard.name: shard for shard in _shard_files(source_dir)}
+    if backed_up:
+        shard_dir.mkdir(parents=True, exist_ok=True)
+    for name, shard in backed_up.items():
+        _restore_file(shard, shard_dir / name)
+    for current in _shard_files(shard_dir):
+        if current.name in backed_up:
+            continue
+        conn = sqlite3.connect(current, timeout=30)
+        try:
+            with conn:
+                for table in SHARD_TABLES:
+                    try:
+                        conn.execute(f"DELETE FROM {table}")
+                    except sqlite3.OperationalError:
+                        pass  # Tabelle (noch) nicht angelegt
+        finally:
+            conn.close()
+
+
+def restore(source, target=DB_PATH, shard_dir=SHARD_DIR) -> float:
+    """
+    Label: Datenbank aus Datei wiederherstellen
+    Kurzbeschreibung:
+        Überschreibt den Inhalt von target per Backup-API mit source. Anders als Löschen
+        und Neuanlegen funktioniert das auch, wenn andere Prozesse target geöffnet haben:
+        deren Verbindungen sehen beim nächsten Lesen den neuen Stand. Die Zähler in
+        'table_versions' werden über den bisherigen Stand angehoben, damit Katalog-Snapshot
+        und Read-Mirror laufender Prozesse sicher neu laden. Die Shards in shard_dir werden
+        aus <source>.shards zurückgespielt bzw. geleert, wenn das Backup keine Datei für sie
+        enthält (eine Vorlage hat nie Shards).
+
+    Parameter:
+        source (Path | str): Vorlage oder Backup.
+        target (Path | str): Zieldatenbank. Standard: grocery.db.
+        shard_dir (Path | str): Shard-Verzeichnis. Standard: SHARD_DIR.
+
+    Return:
+        float: Dauer in Millisekunden.
+
+    Tests:
+        1. Nach restore() entspricht der Inhalt von target dem von source.
+        2. Jeder Zähler in 'table_versions' ist größer als vor dem Restore.
+        3. Nach dem Backup angelegte Bestellungen in einem Shard sind nach restore() weg.
+    """
+    started = time.perf_counter()
+    _restore_file(source, target)
+    _restore_shards(shard_backup_dir(source), shard_dir)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online-Backup und Template-Reset von grocery.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    backup_cmd = sub.add_parser("backup", help="Online-Backup der laufenden Datenbank")
+    backup_cmd.add_argument("--to", default=None, help="Zieldatei (Standard: backups/grocery-<Zeit>.db)")
+    backup_cmd.add_argument("--pages", type=int, default=256, help="Seiten pro Schritt")
+    backup_cmd.add_argument("--keep", type=int, default=None, help="Nur die neuesten N Backups behalten")
+
+    for name, text in (("template", "Vorlage bauen"), ("reset", "grocery.db aus Vorlage klonen")):
+        cmd = sub.add_parser(name, help=text)
+        cmd.add_argument("--kind", choices=sorted(SEED_FILES), default="example")
+        cmd.add_argument("--rebuild", action="store_true", help="Vorlage neu bauen")
+
+    restore_cmd = sub.add_parser("restore", help="grocery.db aus einer Backup-Datei wiederherstellen")
+    restore_cmd.add_argument("source")
+    args = parser.parse_args()
+
+    if args.command == "backup":
+        started = time.perf_counter()
+        path = online_backup(args.to, pages=args.pages, keep=args.keep)
+        print(f"Backup {path} erstellt ({(time.perf_counter() - started) * 1000:.0f} ms).")
+    elif args.command == "template":
+        print(f"Vorlage: {build_template(args.kind, args.rebuild)}")
+    elif args.command == "reset":
+        template = build_template(args.kind, args.rebuild)
+        print(f"{DB_PATH} aus {template.name} geklont ({restore(template):.1f} ms).")
+    else:
+        print(f"{DB_PATH} aus {args.source} wiederhergestellt ({restore(args.source):.1f} ms).")
+
+
+if __name__ == "__main__":
+    main()
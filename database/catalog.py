@@ -0,0 +1,143 @@
+"""
+Label: In-Memory-Katalog (Supermärkte & Produkte)
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Formulare und Validierungen (add_product, add_order, savings) benötigen bei jedem
+    Request die Liste der Supermärkte bzw. Produkte. Statt diese jedes Mal per SQL zu laden,
+    hält dieses Modul einen unveränderlichen, versionierten Snapshot im Prozessspeicher.
+
+    Die Version ergibt sich aus der Tabelle 'table_versions', die per Trigger bei jeder
+    Änderung an 'supermarkets' bzw. 'products' hochgezählt wird (siehe schema.sql). Pro
+    Request wird nur noch dieser Zähler gelesen; der Snapshot wird ausschließlich dann neu
+    aufgebaut, wenn sich die zugrunde liegenden Tabellen tatsächlich geändert haben.
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from database.read_mirror import get_read_connection
+from database.rows import Product, Supermarket, fetch_as
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Label: Unveränderlicher Katalog-Snapshot
+    Kurzbeschreibung:
+        Enthält alle Supermärkte und Produkte (jeweils nach Name sortiert) sowie
+        schreibgeschützte ID→Zeile-Maps für Lookups in O(1).
+
+    Attribute:
+        version (tuple | None): Stand aus 'table_versions' (None = Tabelle fehlt, kein Caching).
+        supermarkets (tuple[Supermarket]): Zeilen mit id, name.
+        products (tuple[Product]): Zeilen mit id, name, brand, category.
+        supermarkets_by_id (Mapping): id → Supermarkt-Zeile.
+        products_by_id (Mapping): id → Produkt-Zeile.
+    """
+
+    version: tuple | None
+    supermarkets: tuple
+    products: tuple
+    supermarkets_by_id: Mapping
+    products_by_id: Mapping
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def _read_version(conn):
+    """Liest die Änderungszähler der Katalogtabellen (None, falls die Tabelle noch fehlt)."""
+    try:
+        rows = conn.execute(
+            # Nur die Tabellen des Snapshots (Preisänderungen lösen keinen Neuaufbau aus)
+            "SELECT name, version FROM table_versions "
+            "WHERE name IN ('brands', 'categories', 'products', 'supermarkets') ORDER BY name"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # Datenbank mit älterem Schema → Snapshot wird bei jedem Aufruf neu geladen
+        return None
+    return tuple((r["name"], r["version"]) for r in rows)
+
+
+def _load_snapshot(conn, version) -> CatalogSnapshot:
+    supermarkets = tuple(
+        fetch_as(conn.execute("SELECT id, name FROM supermarkets ORDER BY name"), Supermarket)
+    )
+    products = tuple(
+        fetch_as(
+            conn.execute(
+                """
+                SELECT p.id, p.name, b.name AS brand, c.name AS category
+                FROM products p
+                LEFT JOIN brands b ON b.id = p.brand_id
+                LEFT JOIN categories c ON c.id = p.category_id
+                ORDER BY p.name
+                """
+            ),
+            Product,
+        )
+    )
+    return CatalogSnapshot(
+        version=version,
+        supermarkets=supermarkets,
+        products=products,
+        supermarkets_by_id=MappingProxyType({s["id"]: s for s in supermarkets}),
+        products_by_id=MappingProxyType({p["id"]: p for p in products}),
+    )
+
+
+def get_catalog(conn=None) -> CatalogSnapshot:
+    """
+    Label: Aktuellen Katalog-Snapshot holen
+    Kurzbeschreibung:
+        Prüft den Änderungszähler in 'table_versions' und liefert den vorhandenen Snapshot,
+        falls er noch aktuell ist. Andernfalls wird genau ein neuer Snapshot geladen und
+        atomar ausgetauscht (parallele Requests warten nicht auf doppelte Ladevorgänge).
+
+    Parameter:
+        conn (sqlite3.Connection, optional): Bestehende Verbindung; sonst wird eine eigene
+            Verbindung geöffnet und wieder geschlossen.
+
+    Return:
+        CatalogSnapshot: Unveränderlicher Snapshot der Katalogtabellen.
+
+    Tests:
+        1. Zwei Aufrufe ohne Zwischenänderung liefern dasselbe Objekt (identity).
+        2. Nach einem INSERT in 'products' enthält der nächste Snapshot das neue Produkt.
+        3. Ohne Tabelle 'table_versions' wird der Katalog bei jedem Aufruf frisch geladen.
+    """
+    global _snapshot
+    own_conn = conn is None
+    if own_conn:
+        conn = get_read_connection()
+    try:
+        version = _read_version(conn)
+        current = _snapshot
+        if current is not None and version is not None and current.version == version:
+            return current
+
+        with _lock:
+            current = _snapshot
+            if current is not None and version is not None and current.version == version:
+                return current
+            snapshot = _load_snapshot(conn, version)
+            _snapshot = snapshot
+            return snapshot
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def invalidate():
+    """Verwirft den aktuellen Snapshot (z. B. nach einem Reset der Datenbank)."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
@@ -18,7 +18,7 @@ from pathlib import Path
 # Absolute path to schema.sql
 SCHEMA_FILE = Path(__file__).parent / "schema.sql"
 
-def init_tables():
+def init_tables(db_path=None):
     """
     Label: Tabellen initialisieren
     Kurzbeschreibung:
@@ -26,7 +26,7 @@ def init_tables():
         Datei 'schema.sql' und führt alle enthaltenen SQL-Anweisungen aus, um die Tabellen zu erstellen.
 
     Parameter:
-        - Keine (nimmt die Datenbankverbindung über get_connection() und die Schema-Datei automatisch)
+        db_path (Path | str, optional): Zieldatenbank. Standard: grocery.db (über get_connection()).
 
     Return:
         - Keine (Funktion führt Operationen auf der DB durch)
@@ -35,7 +35,7 @@ def init_tables():
         1. Erfolg: Die Datenbankverbindung wird erfolgreich geöffnet und das SQL-Skript wird ohne Fehler ausgeführt.
         2. Dateiprüfung: Die Datei 'schema.sql' existiert im erwarteten Pfad und kann gelesen werden.
     """
-    conn = get_connection()
+    conn = get_connection(db_path)
     with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
         conn.executescript(f.read())
     conn.commit()
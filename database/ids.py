@@ -0,0 +1,111 @@
+"""
+Label: Zentraler ID-Generator für Primärschlüssel
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Dieses Modul erzeugt kollisionsfreie, zeitlich sortierbare IDs für alle schreibenden
+    Pfade der Anwendung (Merkliste, Produkte, Bestellungen). Bisher wurden IDs aus dem
+    Millisekunden-Timestamp gebildet, wodurch zwei Requests in derselben Millisekunde
+    denselben Primärschlüssel erzeugt haben (IntegrityError).
+
+    Format: ULID, 26 Zeichen Crockford-Base32 (48 Bit Zeit + 80 Bit Zufall), innerhalb eines
+    Prozesses streng monoton; parallele Prozesse unterscheiden sich über den Zufallsanteil.
+
+    Abwägung: Die Schlüssel werden dadurch nicht kürzer. Eine ULID-ID ("o_" + 26 Zeichen)
+    ist fast doppelt so lang wie die bisherige Form "o_<Millisekunden>" (ca. 15 Zeichen).
+    Gewonnen wird die Kollisionsfreiheit, nicht Platz in den Index-B-Bäumen.
+"""
+
+import os
+import secrets
+import threading
+import time
+
+# Crockford-Base32 (ohne I, L, O, U) – lexikografisch sortierbar
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_MAX_RANDOM = (1 << 80) - 1
+
+_lock = threading.Lock()
+_last_ulid_ms = -1
+_last_ulid_random = 0
+
+
+def _reset_state():
+    """Setzt den Generatorzustand zurück (beim Import und nach einem fork() im Kindprozess)."""
+    global _last_ulid_ms, _last_ulid_random
+    # Kindprozesse zählen nicht vom Zufallsanteil des Elternprozesses aus weiter
+    _last_ulid_ms = -1
+    _last_ulid_random = 0
+
+
+_reset_state()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_state)
+
+
+def _encode(value: int, length: int) -> str:
+    """Kodiert eine nicht-negative Ganzzahl als Crockford-Base32 mit fester Länge."""
+    chars = []
+    for _ in range(length):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def new_ulid() -> str:
+    """
+    Label: ULID erzeugen
+    Kurzbeschreibung:
+        Erzeugt eine 26-stellige ULID (48 Bit Millisekunden + 80 Bit Zufall). Werden mehrere
+        IDs in derselben Millisekunde angefordert, wird der Zufallsanteil der letzten ID um
+        eins erhöht, sodass die Reihenfolge innerhalb des Prozesses streng monoton bleibt.
+
+    Parameter:
+        - Keine
+
+    Return:
+        str: ULID in Crockford-Base32.
+
+    Tests:
+        1. 10.000 direkt hintereinander erzeugte IDs sind eindeutig und aufsteigend sortiert.
+        2. Parallele Aufrufe aus mehreren Threads erzeugen keine Duplikate.
+    """
+    global _last_ulid_ms, _last_ulid_random
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ulid_ms:
+            # gleiche (oder zurückgestellte) Uhrzeit → monoton weiterzählen
+            now_ms = _last_ulid_ms
+            random_part = _last_ulid_random + 1
+            if random_part > _MAX_RANDOM:
+                now_ms += 1
+                random_part = secrets.randbits(80)
+        else:
+            random_part = secrets.randbits(80)
+        _last_ulid_ms = now_ms
+        _last_ulid_random = random_part
+    return _encode(now_ms, 10) + _encode(random_part, 16)
+
+
+def new_id(prefix: str) -> str:
+    """
+    Label: Primärschlüssel mit Präfix erzeugen
+    Kurzbeschreibung:
+        Zentrale Funktion für alle INSERT-Pfade. Liefert eine ULID mit fachlichem Präfix
+        (z. B. "o_…").
+
+    Parameter:
+        prefix (str): Fachliches Präfix ohne Unterstrich, z. B. "svp", "up" oder "o".
+
+    Return:
+        str: ID im Format "<prefix>_<id>".
+
+    Tests:
+        1. new_id("o") beginnt mit "o_" und ist 28 Zeichen lang.
+        2. IDs aus zwei geforkten Prozessen kollidieren nicht.
+    """
+    return f"{prefix}_{new_ulid()}"
@@ -0,0 +1,267 @@
+"""
+Label: Wörterbuch-Tabellen für Marken und Kategorien
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Marken und Kategorien stehen nicht mehr als Freitext in jeder Produktzeile, sondern
+    genau einmal in 'brands' bzw. 'categories'; 'products' speichert nur noch brand_id und
+    category_id. Gruppieren (KPIs nach Kategorie), Filtern und Indizes arbeiten damit auf
+    kleinen Integern, und Schreibvarianten wie "Milch"/"milch" fallen zusammen.
+
+    Die Funktionen erwarten eine offene Verbindung innerhalb der Schreibtransaktion des
+    Aufrufers (Writer-Auftrag, Seed-Skript) und committen nicht selbst. Das Modul hat keine
+    Paket-Imports, damit es auch aus den Skripten in database/ heraus nutzbar ist.
+
+    Namen werden wie von COLLATE NOCASE verglichen: Nur A–Z sind unabhängig von Groß- und
+    Kleinschreibung, "Äpfel" und "äpfel" bleiben getrennte Einträge. Der Cache in
+    encode_product() verwendet denselben Schlüssel (_name_key), damit Cache und Datenbank
+    nie verschiedene IDs für denselben Namen liefern.
+
+    Bestehende Datenbanken mit den Freitextspalten products.brand/products.category werden
+    einmalig umgestellt (idempotent, weitere Aufrufe ändern nichts):
+        python -m database.lookups migrate
+"""
+
+import argparse
+import string
+
+# Produktspalte (Freitext aus Formular/CSV) → (ID-Spalte in 'products', Wörterbuch-Tabelle)
+LOOKUP_COLUMNS = {
+    "brand": ("brand_id", "brands"),
+    "category": ("category_id", "categories"),
+}
+
+# Entspricht COLLATE NOCASE von SQLite (nur ASCII-Buchstaben werden gleichgesetzt)
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _name_key(name: str) -> str:
+    """Vergleichsschlüssel eines Namens, identisch zur Spalten-Collation NOCASE."""
+    return name.translate(_NOCASE)
+
+
+def lookup_id(conn, table: str, name):
+    """
+    Label: ID eines Wörterbuch-Eintrags holen oder anlegen
+    Kurzbeschreibung:
+        Liefert die ID von name in table ('brands' oder 'categories') und legt den Eintrag
+        bei Bedarf an. Führende/abschließende Leerzeichen werden entfernt, der Vergleich
+        ignoriert Groß-/Kleinschreibung von A–Z (COLLATE NOCASE im Schema).
+
+    Parameter:
+        conn (sqlite3.Connection): Verbindung (Commit durch den Aufrufer).
+        table (str): 'brands' oder 'categories'.
+        name (str | None): Freitext aus Formular oder CSV.
+
+    Return:
+        int | None: ID des Eintrags, None bei leerem Namen.
+
+    Tests:
+        1. Zwei Aufrufe mit "Milch" und " milch " liefern dieselbe ID und legen eine Zeile an.
+        2. Leerer Name oder None liefert None, ohne etwas einzufügen.
+        3. "Äpfel" und "äpfel" ergeben zwei Einträge (wie COLLATE NOCASE).
+    """
+    if table not in ("brands", "categories"):
+        raise ValueError(f"Unbekannte Wörterbuch-Tabelle: {table}")
+    name = (name or "").strip()
+    if not name:
+        return None
+    row = conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()
+    if row is not None:
+        return row[0]
+    return conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid
+
+
+def encode_product(conn, row: dict, cache: dict | None = None) -> dict:
+    """
+    Label: Produktzeile mit Freitext in ID-Spalten übersetzen
+    Kurzbeschreibung:
+        Ersetzt die Schlüssel 'brand' und 'category' einer Produktzeile (z. B. aus einer CSV
+        im bisherigen Format) durch 'brand_id' und 'category_id'. Mit cache werden bei
+        Massenimporten gleiche Namen nur einmal nachgeschlagen.
+
+    Parameter:
+        conn (sqlite3.Connection): Verbindung (Commit durch den Aufrufer).
+        row (dict): Produktzeile.
+        cache (dict, optional): (Tabelle, Name) → ID, wird vom Aufrufer weitergereicht.
+
+    Return:
+        dict: Neue Zeile mit ID-Spalten statt Freitext.
+    """
+    encoded = dict(row)
+    for column, (id_column, table) in LOOKUP_COLUMNS.items():
+        if column not in encoded:
+            continue
+        name = (encoded.pop(column) or "").strip()
+        key = (table, _name_key(name))
+        if cache is not None and key in cache:
+            encoded[id_column] = cache[key]
+            continue
+        encoded[id_column] = lookup_id(conn, table, name)
+        if cache is not None:
+            cache[key] = encoded[id_column]
+    return encoded
+
+
+_MIGRATION_STEPS = (
+    """
+    CREATE TABLE IF NOT EXISTS brands (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE
+    )
+    """,
+    # Gleiche Normalisierung wie lookup_id(): trim + UNIQUE COLLATE NOCASE
+    """
+    INSERT OR IGNORE INTO brands (name)
+    SELECT trim(brand) FROM products WHERE trim(COALESCE(brand, '')) <> '' ORDER BY rowid
+    """,
+    """
+    INSERT OR IGNORE INTO categories (name)
+    SELECT trim(category) FROM products WHERE trim(COALESCE(category, '')) <> '' ORDER BY rowid
+    """,
+    """
+    CREATE TABLE products_new (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        brand_id INTEGER,
+        category_id INTEGER,
+        created_by_user_id TEXT,
+        is_user_created INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (brand_id) REFERENCES brands(id),
+        FOREIGN KEY (category_id) REFERENCES categories(id),
+        FOREIGN KEY (created_by_user_id) REFERENCES users(id)
+    )
+    """,
+    """
+    INSERT INTO products_new
+        (id, name, brand_id, category_id, created_by_user_id, is_user_created, created_at)
+    SELECT p.id, p.name,
+           (SELECT b.id FROM brands b WHERE b.name = trim(p.brand)),
+           (SELECT c.id FROM categories c WHERE c.name = trim(p.category)),
+           p.created_by_user_id, p.is_user_created, p.created_at
+    FROM products p
+    """,
+    "DROP TABLE products",
+    "ALTER TABLE products_new RENAME TO products",
+    "CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id)",
+    "CREATE INDEX IF NOT EXISTS idx_products_brand ON products (brand_id)",
+)
+
+
+def _version_triggers(conn):
+    """Änderungszähler für brands/categories wie in schema.sql (nur mit 'table_versions')."""
+    has_versions = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'table_versions'"
+    ).fetchone()
+    if not has_versions:
+        return
+    for table in ("brands", "categories"):
+        conn.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)", (table,))
+        # Laufende Prozesse laden ihren Katalog-Snapshot danach neu
+        conn.execute("UPDATE table_versions SET version = version + 1 WHERE name = ?", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                END
+                """
+            )
+
+
+def migrate(conn) -> int:
+    """
+    Label: Freitextspalten in Wörterbuch-IDs umstellen
+    Kurzbeschreibung:
+        Stellt eine Datenbank mit products.brand/products.category auf das Schema mit
+        brand_id/category_id um: Wörterbuch-Tabellen anlegen, Namen übernehmen, 'products'
+        nach dem SQLite-Verfahren für Tabellenumbauten (neue Tabelle, kopieren, alte löschen,
+        umbenennen) neu aufbauen und die Indizes sowie die bisherigen Trigger auf 'products'
+        wiederherstellen. Alles läuft in einer Transaktion; bei einem Fehler bleibt die
+        Datenbank unverändert. Ist 'products' bereits umgestellt, passiert nichts.
+
+    Parameter:
+        conn (sqlite3.Connection): Verbindung ohne offene Transaktion (committet selbst).
+
+    Return:
+        int: Anzahl umgestellter Produkte (0, wenn nichts zu tun war).
+
+    Tests:
+        1. Produkte mit "Milch" und " milch " zeigen danach auf dieselbe category_id.
+        2. Ein zweiter Aufruf liefert 0 und ändert nichts.
+        3. Der Katalog (database/catalog.py) lädt danach ohne "no such column".
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(products)")}
+    if "brand" not in columns and "category" not in columns:
+        return 0
+
+    # Umbau nach https://www.sqlite.org/lang_altertable.html#otheralter: Fremdschlüssel aus,
+    # Verweise in Triggern/Views beim Umbenennen nicht neu auflösen (legacy_alter_table)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            triggers = [
+                row[0] for row in conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'products'"
+                )
+            ]
+            for column in ("brand", "category"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE products ADD COLUMN {column} TEXT")
+            for statement in _MIGRATION_STEPS:
+                conn.execute(statement)
+            for sql in triggers:
+                conn.execute(sql)
+            _version_triggers(conn)
+            migrated = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            # Nur die neuen Verweise prüfen (Altlasten, z. B. gelöschte User, bleiben wie sie sind)
+            problems = [
+                row for row in conn.execute("PRAGMA foreign_key_check(products)")
+                if row[2] in ("brands", "categories")
+            ]
+            if problems:
+                raise RuntimeError(f"Fremdschlüssel verletzt nach Umbau: {problems[:5]}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+        conn.execute("PRAGMA foreign_keys = ON")
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wörterbuch-Tabellen für Marken und Kategorien")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="products.brand/category in brand_id/category_id umstellen")
+    parser.parse_args()
+
+    from database.my_helpers import get_connection
+
+    conn = get_connection()
+    try:
+        migrated = migrate(conn)
+    finally:
+        conn.close()
+    if migrated:
+        print(f"{migrated} Produkte auf brand_id/category_id umgestellt.")
+    else:
+        print("Schema ist bereits aktuell, nichts zu tun.")
+
+
+if __name__ == "__main__":
+    main()
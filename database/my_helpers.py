@@ -10,6 +10,7 @@ Kurzbeschreibung des Moduls:
     Funktion zur Herstellung einer konfigurierten Verbindung zur SQLite-Datenbank (`grocery.db`).
 """
 
+import os
 import sqlite3
 from pathlib import Path
 
@@ -17,8 +18,21 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent.parent.resolve()
 DB_PATH = BASE_DIR / "grocery.db"
 
+# Ablage der nutzerbezogenen Shard-Dateien (siehe database/sharding.py)
+SHARD_DIR = Path(os.getenv("GROCERY_SHARD_DIR") or BASE_DIR / "shards")
 
-def get_connection():
+# Slow-Query-Log (database/query_log.py): nur mit GROCERY_SLOW_QUERY_MS zeitmessende Verbindungen
+if os.getenv("GROCERY_SLOW_QUERY_MS", "").strip():
+    # Import als Paket (App) oder als Skript aus database/ (reset_db.py, pop_*.py, …)
+    if __package__:
+        from .query_log import TimedConnection as CONNECTION_FACTORY
+    else:
+        from query_log import TimedConnection as CONNECTION_FACTORY
+else:
+    CONNECTION_FACTORY = sqlite3.Connection
+
+
+def get_connection(db_path=None):
     """
     Label: Datenbank-Verbindung herstellen
     Kurzbeschreibung:
@@ -26,7 +40,7 @@ def get_connection():
         über BASE_DIR bestimmt wird. Die Datenbank wird erstellt, falls sie noch nicht existiert.
 
     Parameter:
-        - Keine
+        db_path (Path | str, optional): Abweichender Datenbankpfad. Standard: DB_PATH.
 
     Return:
         sqlite3.Connection: Die konfigurierte Datenbank-Verbindung.
@@ -35,7 +49,8 @@ def get_connection():
         1. Verbindungskonfiguration: Die Row-Factory ist auf sqlite3.Row gesetzt (Zugriff über Spaltenname).
         2. Integrität: Foreign Keys (Fremdschlüssel) sind in der Datenbankverbindung aktiviert.
     """
-    conn = sqlite3.connect(DB_PATH)
+    # uri=True: erlaubt URI-Dateinamen (z. B. den In-Memory-Spiegel, auch per ATTACH)
+    conn = sqlite3.connect(db_path or DB_PATH, uri=True, factory=CONNECTION_FACTORY)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
\ No newline at end of file
@@ -16,17 +16,24 @@ import csv
 from pathlib import Path
 
 from db_init import get_connection
+from lookups import encode_product
 
-def load_csv(table_name, csv_path):
+# Absoluter Pfad zu /data, damit das Skript unabhängig vom Arbeitsverzeichnis läuft
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+def load_csv(table_name, csv_path, db_path=None):
     """
     Label: Lädt Daten aus CSV in Tabelle
     Kurzbeschreibung:
         Öffnet eine CSV-Datei, liest die Daten ein und fügt sie in die angegebene Zieltabelle 
         in der Datenbank ein. Die Spaltennamen der CSV müssen mit denen der Tabelle übereinstimmen.
+        Ausnahme 'products': Die Freitextspalten brand/category werden über die
+        Wörterbuch-Tabellen in brand_id/category_id übersetzt (siehe database/lookups.py).
 
     Parameter:
         table_name (str): Der Name der Zieltabelle in der Datenbank.
         csv_path (str | Path): Der Pfad zur Quell-CSV-Datei.
+        db_path (Path | str, optional): Zieldatenbank. Standard: grocery.db.
 
     Return:
         - Keine (Funktion führt Datenoperationen durch)
@@ -36,7 +43,7 @@ def load_csv(table_name, csv_path):
         2. Leere Datei: Eine leere CSV-Datei wird ohne Fehler verarbeitet, und es werden keine Zeilen eingefügt.
         
     """
-    conn = get_connection()
+    conn = get_connection(db_path)
     path = Path(csv_path)
     with path.open(newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -45,6 +52,10 @@ def load_csv(table_name, csv_path):
     if not rows:
         return
 
+    if table_name == "products":
+        cache = {}
+        rows = [encode_product(conn, row, cache) for row in rows]
+
     cols = rows[0].keys()
     placeholders = ",".join(["?"] * len(cols))
     col_list = ",".join(cols)
@@ -58,7 +69,7 @@ def load_csv(table_name, csv_path):
     conn.close()
 
 
-def seed_data():
+def seed_data(db_path=None):
     """
     Label: Befüllt Datenbank mit initialen Daten
     Kurzbeschreibung:
@@ -66,7 +77,7 @@ def seed_data():
         zugehörige CSV-Dateien auf, um die Datenbank mit Beispieldaten zu befüllen.
 
     Parameter:
-        - Keine
+        db_path (Path | str, optional): Zieldatenbank. Standard: grocery.db.
 
     Return:
         - Keine (Funktion führt DB-Seeding durch)
@@ -76,12 +87,12 @@ def seed_data():
         2. Abhängigkeiten: Die Tabellen werden in der korrekten Reihenfolge geladen, um Foreign-Key-Abhängigkeiten zu erfüllen.
         
     """
-    load_csv("users", "../data/users.csv")
-    load_csv("supermarkets", "../data/supermarkets.csv")
-    load_csv("products", "../data/products.csv")
-    load_csv("supermarket_products", "../data/supermarket_products.csv")
-    load_csv("orders", "../data/orders.csv")
-    load_csv("order_items", "../data/order_items.csv")
+    load_csv("users", DATA_DIR / "users.csv", db_path)
+    load_csv("supermarkets", DATA_DIR / "supermarkets.csv", db_path)
+    load_csv("products", DATA_DIR / "products.csv", db_path)
+    load_csv("supermarket_products", DATA_DIR / "supermarket_products.csv", db_path)
+    load_csv("orders", DATA_DIR / "orders.csv", db_path)
+    load_csv("order_items", DATA_DIR / "order_items.csv", db_path)
 
 
 
@@ -14,9 +14,12 @@ Kurzbeschreibung des Moduls:
 """
 from datetime import datetime, timedelta
 
+from werkzeug.security import generate_password_hash
+
+from lookups import lookup_id
 from my_helpers import get_connection
 
-def main():
+def main(db_path=None):
     """
     Label: Feste Testdaten einfügen
     Kurzbeschreibung:
@@ -25,7 +28,7 @@ def main():
         Die Daten umfassen Bestellungen über mehrere Zeiträume zur KPI-Demonstration.
 
     Parameter:
-        - Keine
+        db_path (Path | str, optional): Zieldatenbank. Standard: grocery.db.
 
     Return:
         - Keine (Funktion führt DB-Operationen durch und gibt Statusmeldungen aus)
@@ -34,7 +37,7 @@ def main():
         1. Vollständigkeit: Es wird mindestens ein User, drei Supermärkte und Bestellungen über 90 Tage eingefügt.
         2. Zeitstempel: Die Bestellungen werden korrekt mit rückdatierten Zeitstempeln versehen, um die Zeitraumberechnung zu ermöglichen.
     """
-    conn = get_connection()
+    conn = get_connection(db_path)
     cur = conn.cursor()
     now = datetime.now()
     now_iso = now.isoformat()
@@ -45,7 +48,8 @@ def main():
         INSERT INTO users (id, username, email, password_hash, created_at)
         VALUES (?, ?, ?, ?, ?)
         """,
-        ("u1", "philip", "philip@example.com", "hash123", now_iso),
+        # Demo-Login: philip / philip123
+        ("u1", "philip", "philip@example.com", generate_password_hash("philip123"), now_iso),
     )
 
     # Supermärkte
@@ -61,17 +65,22 @@ def main():
         ],
     )
 
-    # Produkte
+    # Produkte (Marke und Kategorie als IDs aus den Wörterbuch-Tabellen)
+    products = [
+        ("p1", "Vollmilch 3.5%", "Aldi", "Milch"),
+        ("p2", "Spaghetti 500g", "NoName", "Nudeln"),
+        ("p3", "Butter 250g", "Marke X", "Butter"),
+        ("p4", "Eier 10er", "Aldi", "Eier"),
+    ]
     cur.executemany(
         """
-        INSERT INTO products (id, name, brand, category, created_by_user_id, is_user_created, created_at)
+        INSERT INTO products (id, name, brand_id, category_id, created_by_user_id, is_user_created, created_at)
         VALUES (?, ?, ?, ?, ?, ?, ?)
         """,
         [
-            ("p1", "Vollmilch 3.5%", "Aldi", "Milch", "u1", 0, now_iso),
-            ("p2", "Spaghetti 500g", "NoName", "Nudeln", "u1", 0, now_iso),
-            ("p3", "Butter 250g", "Marke X", "Butter", "u1", 0, now_iso),
-            ("p4", "Eier 10er", "Aldi", "Eier", "u1", 0, now_iso),
+            (product_id, name, lookup_id(conn, "brands", brand), lookup_id(conn, "categories", category),
+             "u1", 0, now_iso)
+            for product_id, name, brand, category in products
         ],
     )
 
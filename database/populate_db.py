@@ -8,13 +8,10 @@ Lizenz: Proprietär (für Studienzwecke)
 Kurzbeschreibung des Moduls:
     Dieses Skript dient als zentrale Schnittstelle für die Befüllung der Datenbank. 
     Es bietet dem User eine interaktive Auswahl, ob die Daten aus statischen CSV-Dateien 
-    oder aus fest codierten Beispieldaten geladen werden sollen. Die eigentliche Logik wird 
-    über subprocess-Aufrufe an die entsprechenden Skripte delegiert.
+    oder aus fest codierten Beispieldaten geladen werden sollen. Die eigentliche Logik liegt
+    in den entsprechenden Skripten, die erst nach der Auswahl importiert und im selben
+    Prozess ausgeführt werden (kein zusätzlicher Python-Interpreterstart).
 """
-import subprocess
-from pathlib import Path
-
-BASE_DIR = Path(__file__).parent.resolve()
 
 
 def main():
@@ -23,13 +20,13 @@ def main():
     Kurzbeschreibung:
         Zeigt dem User die verfügbaren Optionen zur Datenbankbefüllung an (CSV oder Beispiele) 
         und führt das gewählte Skript (`pop_with_csv.py` oder `pop_with_example.py`) 
-        mittels subprocess.run() im aktuellen Verzeichnis aus.
+        per Lazy-Import im aktuellen Prozess aus.
 
     Parameter:
         - Keine
 
     Return:
-        - Keine (Funktion führt Unterprozesse aus und beendet sich)
+        - Keine (Funktion führt das gewählte Befüllungsskript aus und beendet sich)
 
     Tests:
         1. CSV-Auswahl (Eingabe '1'): Das Skript 'pop_with_csv.py' wird erfolgreich gestartet und ausgeführt.
@@ -46,11 +43,14 @@ def main():
 
     if choice == "1":
         print("Running pop_with_csv.py...\n")
-        subprocess.run(["python", "pop_with_csv.py"], check=True, cwd=BASE_DIR)
+        import pop_with_csv
+        pop_with_csv.seed_data()
+        print("DB mit .csv daten befüllt.")
 
     elif choice == "2":
         print("Running pop_with_example.py...\n")
-        subprocess.run(["python", "pop_with_example.py"], check=True, cwd=BASE_DIR)
+        import pop_with_example
+        pop_with_example.main()
 
     else:
         print("Invalid option. Exiting.")
@@ -0,0 +1,194 @@
+"""
+Label: Präfix-Index für Autovervollständigung
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Hält je Trefferart (Produktname, Namensbestandteil, Marke, Kategorie) einen sortierten
+    In-Memory-Index. Vorschläge für einen eingegebenen Präfix werden per Binärsuche (bisect)
+    gefunden, ohne die Datenbank abzufragen.
+
+    Der Index wird aus dem Katalog-Snapshot (database/catalog.py) gespeist. Ändert sich die
+    Katalogversion, werden neu angelegte Produkte inkrementell eingefügt; nur bei geänderten
+    oder gelöschten Produkten wird der Index komplett neu aufgebaut.
+"""
+
+import bisect
+import threading
+
+from database.catalog import get_catalog
+
+# Art des Treffers – kleinere Werte werden in den Vorschlägen bevorzugt
+KIND_NAME = 0
+KIND_WORD = 1
+KIND_BRAND = 2
+KIND_CATEGORY = 3
+_KINDS = (KIND_NAME, KIND_WORD, KIND_BRAND, KIND_CATEGORY)
+
+
+def normalize(text: str) -> str:
+    """Normalisiert Text für den Präfixvergleich (Groß-/Kleinschreibung, Leerraum)."""
+    return " ".join(text.casefold().split())
+
+
+def _terms(product):
+    """Liefert alle indexierten Begriffe (term, kind) eines Produkts."""
+    name = normalize(product["name"] or "")
+    if name:
+        yield name, KIND_NAME
+        words = name.split()
+        for word in words[1:]:
+            yield word, KIND_WORD
+    if product["brand"]:
+        yield normalize(product["brand"]), KIND_BRAND
+    if product["category"]:
+        yield normalize(product["category"]), KIND_CATEGORY
+
+
+class PrefixIndex:
+    """
+    Label: Sortierte Arrays mit Binärsuche (eines je Trefferart)
+    Kurzbeschreibung:
+        Speichert Tupel (term, product_id) in einer sortierten Liste je Trefferart (KIND_*).
+        Alle Begriffe mit einem gegebenen Präfix liegen darin zusammenhängend und werden mit
+        bisect_left in O(log n) gefunden. Getrennte Listen sorgen dafür, dass viele Marken-
+        oder Kategorietreffer die Namenstreffer nicht aus dem betrachteten Bereich verdrängen.
+
+    Tests:
+        1. suggest("voll") liefert "Vollmilch 3.5%" an erster Stelle.
+        2. suggest("milch") findet Produkte über die Kategorie "Milch".
+        3. Nach add() ist das neue Produkt ohne Neuaufbau sofort auffindbar.
+        4. Mehr als MAX_SCAN Marken mit dem Präfix verdrängen keinen Namenstreffer.
+    """
+
+    # Obergrenze der betrachteten Treffer je Trefferart und Anfrage (begrenzt die Laufzeit bei
+    # kurzen Präfixen). Gibt es mehr, werden nur die alphabetisch ersten MAX_SCAN nach Länge
+    # gerankt; ein kürzerer Begriff dahinter wird bei sehr kurzen Präfixen also übergangen.
+    MAX_SCAN = 500
+
+    def __init__(self):
+        self._entries = [[] for _ in _KINDS]
+        self._products = {}
+        self.version = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._products)
+
+    def rebuild(self, products, version=None):
+        """Baut den Index vollständig aus einer Produktliste neu auf."""
+        entries = [[] for _ in _KINDS]
+        by_id = {}
+        for product in products:
+            by_id[product["id"]] = product
+            for term, kind in _terms(product):
+                entries[kind].append((term, product["id"]))
+        for kind_entries in entries:
+            kind_entries.sort()
+        with self._lock:
+            self._entries = entries
+            self._products = by_id
+            self.version = version
+
+    def add(self, product):
+        """Fügt ein einzelnes Produkt inkrementell (bisect.insort) hinzu."""
+        with self._lock:
+            if product["id"] in self._products:
+                return
+            self._products[product["id"]] = product
+            for term, kind in _terms(product):
+                bisect.insort(self._entries[kind], (term, product["id"]))
+
+    def sync(self, catalog):
+        """
+        Label: Index mit Katalog-Snapshot abgleichen
+        Kurzbeschreibung:
+            Vergleicht die Katalogversion mit dem Indexstand. Kommen nur neue Produkte hinzu,
+            werden diese einzeln eingefügt; bei Änderungen oder Löschungen erfolgt ein
+            vollständiger Neuaufbau.
+
+        Parameter:
+            catalog (CatalogSnapshot): Aktueller Katalog-Snapshot.
+
+        Return:
+            - Keine
+        """
+        if catalog.version is not None and catalog.version == self.version:
+            return
+        with self._sync_lock:
+            if catalog.version is not None and catalog.version == self.version:
+                return
+            current = catalog.products_by_id
+            known = self._products
+            # Zeilen sind Product-Dataclasses → Vergleich über deren __eq__
+            changed = any(
+                pid not in current or current[pid] != row
+                for pid, row in known.items()
+            )
+            if changed or not known:
+                self.rebuild(catalog.products, catalog.version)
+                return
+            for pid, product in current.items():
+                if pid not in known:
+                    self.add(product)
+            self.version = catalog.version
+
+    def suggest(self, prefix: str, k: int = 8) -> list[dict]:
+        """
+        Label: Top-k-Vervollständigungen
+        Kurzbeschreibung:
+            Sucht die Begriffe mit dem Präfix je Trefferart (höchstens MAX_SCAN je Art) und
+            liefert höchstens k Produkte. Sortiert wird nach Trefferart (Name vor Wort vor
+            Marke vor Kategorie) und Begriffslänge. Liefern die vorderen Arten bereits k
+            Produkte, werden die übrigen nicht mehr durchsucht.
+
+        Parameter:
+            prefix (str): Eingegebener Text (wird normalisiert).
+            k (int): Maximale Anzahl Vorschläge.
+
+        Return:
+            list[dict]: Vorschläge mit id, name, brand, category.
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        with self._lock:
+            matches = []
+            found = set()
+            for kind, entries in enumerate(self._entries):
+                if len(found) >= k:
+                    break
+                start = bisect.bisect_left(entries, (key,))
+                for term, pid in entries[start:start + self.MAX_SCAN]:
+                    if not term.startswith(key):
+                        break
+                    matches.append((kind, len(term), term, pid))
+                    found.add(pid)
+            products = self._products
+
+        matches.sort()
+        seen = set()
+        suggestions = []
+        for _, _, _, pid in matches:
+            if pid in seen:
+                continue
+            seen.add(pid)
+            p = products[pid]
+            suggestions.append(
+                {"id": p["id"], "name": p["name"], "brand": p["brand"], "category": p["category"]}
+            )
+            if len(suggestions) >= k:
+                break
+        return suggestions
+
+
+_index = PrefixIndex()
+
+
+def get_prefix_index() -> PrefixIndex:
+    """Liefert den prozessweiten Präfix-Index, abgeglichen mit dem aktuellen Katalog."""
+    _index.sync(get_catalog())
+    return _index
@@ -0,0 +1,193 @@
+"""
+Label: Inkrementelle Erkennung von Preissenkungen für gemerkte Produkte
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Statt bei jedem Aufruf der Merkliste alle Preise aller User zu vergleichen, hält
+    'product_watchers' einen Index Produkt → beobachtende User mit dem zuletzt bekannten
+    Bestpreis. Trigger auf 'supermarket_products' (siehe schema.sql) betrachten bei jeder
+    Preisänderung – ob manuell (/add_product), per Crawler oder per Replay – nur die
+    Beobachter des geänderten Produkts: Wird ihr Bestpreis unterboten, entsteht ein Eintrag
+    in 'price_drop_events'. Der Aufwand ist damit proportional zu den geänderten Preisen.
+
+    Neue Einträge in 'saved_products' werden per Trigger beobachtet. Liegt die Merkliste in
+    Shards (database/sharding.py), meldet die App das Produkt über watch_product() an.
+
+    Bestehende Merklisten (z. B. nach einer Migration) werden übernommen mit:
+        python -m database.price_watch backfill
+"""
+
+import argparse
+from datetime import datetime
+
+from database.my_helpers import get_connection
+from database.rows import PriceDrop, fetch_as
+from database.sharding import SHARD_DIR, is_sharded
+
+
+def watch_product(conn, user_id: str, product_id: str):
+    """
+    Label: Produkt beobachten (Schreibauftrag)
+    Kurzbeschreibung:
+        Legt den Beobachter an, sofern noch nicht vorhanden; Ausgangswert ist der aktuelle
+        Bestpreis. Für get_writer().execute() auf grocery.db gedacht.
+
+    Parameter:
+        conn (sqlite3.Connection): Writer-Verbindung.
+        user_id (str): ID des Users.
+        product_id (str): ID des Produkts.
+    """
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO product_watchers (product_id, user_id, best_price)
+        VALUES (?, ?, (SELECT MIN(price) FROM supermarket_products WHERE product_id = ?))
+        """,
+        (product_id, user_id, product_id),
+    )
+
+
+def unseen_drops(user_id: str, limit: int = 20) -> list:
+    """
+    Label: Ungelesene Preissenkungen eines Users
+    Kurzbeschreibung:
+        Liefert die neuesten noch nicht angezeigten Preissenkungen inkl. Produkt- und
+        Marktname.
+
+    Parameter:
+        user_id (str): ID des Users.
+        limit (int): Maximale Anzahl Einträge.
+
+    Return:
+        list[PriceDrop]: Neueste zuerst.
+
+    Tests:
+        1. Nach einer Preissenkung unter den Bestpreis eines gemerkten Produkts erscheint ein Eintrag.
+        2. Eine Preiserhöhung oder ein Preis über dem Bestpreis erzeugt keinen Eintrag.
+        3. Nach mark_seen() ist die Liste leer.
+    """
+    conn = get_connection()
+    try:
+        return fetch_as(conn.execute(
+            """
+            SELECT e.id, e.product_id, p.name, s.name AS supermarket_name,
+                   e.old_price, e.new_price, e.created_at
+            FROM price_drop_events e
+            JOIN products p ON p.id = e.product_id
+            JOIN supermarkets s ON s.id = e.supermarket_id
+            WHERE e.user_id = ? AND e.seen_at IS NULL
+            ORDER BY e.id DESC
+            LIMIT ?
+            """,
+            (user_id, limit),
+        ), PriceDrop)
+    finally:
+        conn.close()
+
+
+def best_prices(user_id: str, product_ids) -> dict:
+    """
+    Label: Bestpreise der gemerkten Produkte eines Users
+    Kurzbeschreibung:
+        Liest den von den Triggern gepflegten Bestpreis aus 'product_watchers' (Primärschlüssel
+        (product_id, user_id), kein Aggregat über alle Angebote). Nur für Produkte ohne
+        Beobachter (Merkliste vor dem Backfill) wird MIN(price) nachberechnet.
+
+    Parameter:
+        user_id (str): ID des Users.
+        product_ids (Iterable[str]): IDs der gemerkten Produkte.
+
+    Return:
+        dict: product_id → günstigster bekannter Preis (None ohne Angebot).
+
+    Tests:
+        1. Nach einer Preissenkung liefert best_prices() den neuen Preis ohne erneuten Aufruf
+           von watch_product().
+        2. Ein Produkt ohne Eintrag in 'product_watchers' erhält den MIN-Preis aus
+           'supermarket_products'.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+    conn = get_connection()
+    try:
+        placeholders = ",".join("?" * len(product_ids))
+        prices = dict(conn.execute(
+            f"SELECT product_id, best_price FROM product_watchers "
+            f"WHERE user_id = ? AND product_id IN ({placeholders})",
+            (user_id, *product_ids),
+        ).fetchall())
+        missing = [pid for pid in product_ids if pid not in prices]
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            prices.update(conn.execute(
+                f"SELECT product_id, MIN(price) FROM supermarket_products "
+                f"WHERE product_id IN ({placeholders}) GROUP BY product_id",
+                missing,
+            ).fetchall())
+        return prices
+    finally:
+        conn.close()
+
+
+def mark_seen(conn, user_id: str, event_ids):
+    """Schreibauftrag: markiert die angezeigten Ereignisse als gelesen."""
+    conn.executemany(
+        "UPDATE price_drop_events SET seen_at = ? WHERE id = ? AND user_id = ?",
+        [(datetime.now().isoformat(), event_id, user_id) for event_id in event_ids],
+    )
+
+
+def backfill() -> int:
+    """
+    Label: Beobachter aus bestehenden Merklisten anlegen
+    Kurzbeschreibung:
+        Übernimmt alle (User, Produkt)-Paare aus 'saved_products' – in grocery.db und, bei
+        aktivem Sharding, in allen Shards – nach 'product_watchers'.
+
+    Return:
+        int: Anzahl neu angelegter Beobachter.
+    """
+    conn = get_connection()
+    before = conn.total_changes
+    with conn:
+        sources = ["main"]
+        if is_sharded():
+            for index, shard in enumerate(sorted(SHARD_DIR.glob("*.db"))):
+                alias = f"shard{index}"
+                conn.execute("ATTACH DATABASE ? AS " + alias, (str(shard),))
+                sources.append(alias)
+        for source in sources:
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO product_watchers (product_id, user_id, best_price)
+                SELECT sp.product_id, sp.user_id,
+                       (SELECT MIN(price) FROM main.supermarket_products m WHERE m.product_id = sp.product_id)
+                FROM {source}.saved_products sp
+                """
+            )
+    created = conn.total_changes - before
+    conn.close()
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preisbeobachtung für gemerkte Produkte")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="Beobachter aus bestehenden Merklisten anlegen")
+    list_cmd = sub.add_parser("list", help="Ungelesene Preissenkungen eines Users anzeigen")
+    list_cmd.add_argument("--user", default="u1")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        print(f"{backfill()} Beobachter angelegt.")
+        return
+    for drop in unseen_drops(args.user, limit=100):
+        print(f"{drop.created_at[:16]}  {drop.name:<30} {drop.supermarket_name:<10} "
+              f"{drop.old_price:6.2f} → {drop.new_price:6.2f} €")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Label: Slow-Query-Log mit automatischer Erfassung des Abfrageplans
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Ist GROCERY_SLOW_QUERY_MS gesetzt, liefert get_connection() (database/my_helpers.py)
+    Verbindungen vom Typ TimedConnection. Jede Anweisung wird von execute() bis zum letzten
+    gelesenen Datensatz gemessen (SQLite rechnet beim Lesen weiter). Liegt die Dauer über
+    der Schwelle (in ms, 0 = alles protokollieren), wird eine JSON-Zeile geschrieben mit:
+        - sql (Leerzeichen normalisiert) und params (lange Texte gekürzt, Bytes als Länge),
+        - ms, rows (gelesene Zeilen) bzw. rowcount (geänderte Zeilen),
+        - plan: Ausgabe von EXPLAIN QUERY PLAN, als eingerückter Baum,
+        - db (Datei bzw. URI) und path (Request-Pfad, falls innerhalb eines Flask-Requests).
+
+    Das Log rotiert (GROCERY_SLOW_QUERY_LOG, Standard logs/slow_queries.jsonl, 5 MB × 3).
+    Auswertung, sortiert nach Gesamtdauer je Anweisung:
+        python -m database.query_log report [--top 20] [--plans]
+
+    Ohne die Variable bleibt es bei sqlite3.Connection; es entsteht kein Mehraufwand. Das Modul
+    hat keine Paket-Imports, damit auch die Skripte in database/ es verwenden können.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+_raw = os.getenv("GROCERY_SLOW_QUERY_MS", "").strip()
+# Schwelle in Millisekunden; None = Log aus
+THRESHOLD_MS = float(_raw) if _raw else None
+
+LOG_PATH = Path(os.getenv("GROCERY_SLOW_QUERY_LOG")
+                or Path(__file__).parent.parent.resolve() / "logs" / "slow_queries.jsonl")
+MAX_BYTES = int(os.getenv("GROCERY_SLOW_QUERY_MAX_BYTES", str(5 * 1024 * 1024)))
+BACKUP_COUNT = 3
+
+# Nur für diese Anweisungen ist ein Abfrageplan sinnvoll (nicht für PRAGMA, BEGIN, …)
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+_WHITESPACE = re.compile(r"\s+")
+_MAX_PARAM_CHARS = 64
+
+_logger = None
+
+
+def _get_logger() -> logging.Logger:
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("grocery.slow_query")
+        if not logger.handlers:
+            LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(LOG_PATH, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        _logger = logger
+    return _logger
+
+
+def normalize_sql(sql: str) -> str:
+    """Fasst Leerraum zusammen; gleiche Anweisungen ergeben denselben Text (Gruppierung im Report)."""
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _normalize_value(value):
+    if isinstance(value, str) and len(value) > _MAX_PARAM_CHARS:
+        return value[:_MAX_PARAM_CHARS] + "…"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return repr(value)[:_MAX_PARAM_CHARS]
+
+
+def normalize_params(params):
+    """Parameter fürs Log: lange Texte gekürzt, Binärdaten nur als Länge."""
+    if isinstance(params, dict):
+        return {key: _normalize_value(value) for key, value in params.items()}
+    return [_normalize_value(value) for value in params or ()]
+
+
+def _query_plan(conn, sql: str, params) -> list | None:
+    """EXPLAIN QUERY PLAN als eingerückte Zeilen (None, falls nicht möglich)."""
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        # Basis-Cursor: der Plan selbst soll nicht gemessen werden
+        rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    except sqlite3.Error:
+        return None
+    depth = {0: -1}
+    plan = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        plan.append("  " * depth[node_id] + detail)
+    return plan
+
+
+def _request_path():
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return None
+    return request.path if has_request_context() else None
+
+
+def _log(conn, sql: str, params, seconds: float, rows=None, rowcount=None, explain_params=None):
+    ms = seconds * 1000
+    if THRESHOLD_MS is None or ms < THRESHOLD_MS:
+        return
+    record = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "ms": round(ms, 3),
+        "sql": normalize_sql(sql),
+        "params": normalize_params(params),
+        "rows": rows,
+        "rowcount": rowcount,
+        "plan": _query_plan(conn, sql, params if explain_params is None else explain_params),
+        "db": getattr(conn, "database", None),
+        "path": _request_path(),
+    }
+    _get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Label: Cursor mit Zeitmessung
+    Kurzbeschreibung:
+        Misst execute() und alle folgenden fetch-Aufrufe einer Anweisung. Protokolliert wird,
+        sobald das Ergebnis vollständig gelesen, der Cursor geschlossen oder freigegeben bzw.
+        die nächste Anweisung ausgeführt wird.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # [sql, params, Sekunden, gelesene Zeilen] der laufenden SELECT-Anweisung
+        self._pending = None
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, seconds, rows = pending
+            _log(self.connection, sql, params, seconds, rows=rows)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        elapsed = time.perf_counter() - started
+        if self.description is None:
+            # Keine Ergebniszeilen (INSERT/UPDATE/…): Anweisung ist bereits fertig
+            _log(self.connection, sql, parameters, elapsed, rowcount=self.rowcount)
+        else:
+            self._pending = [sql, parameters, elapsed, 0]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        elapsed = time.perf_counter() - started
+        first = seq_of_parameters[0] if seq_of_parameters else ()
+        _log(self.connection, sql, [f"<{len(seq_of_parameters)} Parametersätze>"], elapsed,
+             rowcount=self.rowcount, explain_params=first)
+        return self
+
+    def executescript(self, sql_script):
+        self._finish()
+        started = time.perf_counter()
+        super().executescript(sql_script)
+        _log(self.connection, sql_script, (), time.perf_counter() - started)
+        return self
+
+    def _timed(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - started
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if self._pending is not None:
+            if row is None:
+                self._finish()
+            else:
+                self._pending[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if self._pending is not None:
+            self._pending[3] += len(rows)
+            if len(rows) < size:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._pending is not None:
+            self._pending[3] += len(rows)
+            self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        if self._pending is not None:
+            self._pending[3] += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # z. B. conn.execute(...).fetchone(): Ergebnis nicht bis zum Ende gelesen
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    Label: Verbindung mit Slow-Query-Log
+    Kurzbeschreibung:
+        sqlite3.Connection, deren Cursor (auch über die Abkürzungen execute/executemany/
+        executescript) TimedCursor sind. Wird über factory= an sqlite3.connect übergeben.
+
+    Tests:
+        1. Mit GROCERY_SLOW_QUERY_MS=0 erzeugt conn.execute("SELECT ...").fetchall() genau eine
+           Logzeile mit rows = Anzahl Zeilen und nicht leerem plan.
+        2. Eine Anweisung unter der Schwelle erzeugt keine Logzeile.
+    """
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.database = str(database)
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection.execute & Co. rufen cursor() nicht über Python auf
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def _read_records(path: Path):
+    """Liest das Log inkl. rotierter Dateien (älteste zuerst)."""
+    files = [path.with_name(f"{path.name}.{i}") for i in range(BACKUP_COUNT, 0, -1)] + [path]
+    for file in files:
+        if not file.exists():
+            continue
+        with file.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def report(path: Path = LOG_PATH, top: int = 20) -> list:
+    """
+    Label: Langsamste Anweisungen ermitteln
+    Kurzbeschreibung:
+        Gruppiert die Logeinträge nach normalisiertem SQL und sortiert nach Gesamtdauer.
+
+    Parameter:
+        path (Path): Logdatei (rotierte Dateien werden mitgelesen).
+        top (int): Anzahl Einträge.
+
+    Return:
+        list[dict]: sql, calls, total_ms, avg_ms, max_ms, avg_rows, plan (des langsamsten Aufrufs),
+        paths (betroffene Request-Pfade).
+    """
+    groups = {}
+    for record in _read_records(Path(path)):
+        group = groups.setdefault(record["sql"], {
+            "sql": record["sql"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "rows": 0, "plan": None, "paths": set(),
+        })
+        group["calls"] += 1
+        group["total_ms"] += record["ms"]
+        group["rows"] += record.get("rows") or 0
+        if record["ms"] >= group["max_ms"]:
+            group["max_ms"] = record["ms"]
+            group["plan"] = record.get("plan")
+        if record.get("path"):
+            group["paths"].add(record["path"])
+
+    ranked = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)[:top]
+    for group in ranked:
+        group["avg_ms"] = group["total_ms"] / group["calls"]
+        group["avg_rows"] = group.pop("rows") / group["calls"]
+        group["paths"] = sorted(group["paths"])
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auswertung des Slow-Query-Logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_cmd = sub.add_parser("report", help="Anweisungen nach Gesamtdauer sortiert")
+    report_cmd.add_argument("--log", default=str(LOG_PATH))
+    report_cmd.add_argument("--top", type=int, default=20)
+    report_cmd.add_argument("--plans", action="store_true", help="Abfrageplan mit ausgeben")
+    args = parser.parse_args()
+
+    ranked = report(Path(args.log), args.top)
+    if not ranked:
+        print(f"Keine Einträge in {args.log}.")
+        return
+    print(f"{'gesamt ms':>10} {'Aufrufe':>8} {'Ø ms':>8} {'max ms':>8} {'Ø Zeilen':>9}  SQL")
+    for group in ranked:
+        sql = group["sql"] if len(group["sql"]) <= 90 else group["sql"][:89] + "…"
+        print(f"{group['total_ms']:10.1f} {group['calls']:8d} {group['avg_ms']:8.2f} "
+              f"{group['max_ms']:8.2f} {group['avg_rows']:9.1f}  {sql}")
+        if args.plans:
+            if group["paths"]:
+                print(f"{'':>47}Routen: {', '.join(group['paths'])}")
+            for line in group["plan"] or ():
+                print(f"{'':>47}{line}")
+
+
+if __name__ == "__main__":
+    main()
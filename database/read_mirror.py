@@ -0,0 +1,260 @@
+"""
+Label: In-Memory-Lesespiegel der Katalogtabellen
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Lesende Routen (Suche, Formulare, Merkliste im Sharding-Modus) öffnen pro Request eine
+    Verbindung zu grocery.db und lesen Katalog und Preise von der Platte. Ist der Spiegel
+    aktiviert (GROCERY_READ_MIRROR=1), hält jeder Prozess eine Kopie der Katalogtabellen
+    (MIRROR_TABLES) in einer Shared-Cache-In-Memory-Datenbank; get_read_connection() liefert
+    dann Verbindungen zu dieser Kopie.
+
+    Aufbau und Aktualisierung:
+        - Beim ersten Zugriff wird grocery.db per Backup-API in den Speicher kopiert; alle
+          übrigen Tabellen (Bestellungen, Merkliste, …) werden dort entfernt.
+        - Der Writer (database/writer.py) markiert den Spiegel nach jedem Commit als
+          veraltet; Schreibzugriffe anderer Prozesse werden spätestens nach max_age Sekunden
+          über 'table_versions' erkannt.
+        - Haben sich Zähler geändert, entsteht eine neue Generation: Kopie der bisherigen
+          Generation (Backup Speicher → Speicher), danach wird jede Tabelle mit geändertem
+          Zähler vollständig von der Platte neu geladen. Laufende Leser behalten ihre alte
+          Generation, bis sie ihre Verbindung schließen. Nur das Öffnen einer Leseverbindung
+          wartet kurz auf eine laufende Aktualisierung, damit die alte Generation nicht genau
+          dazwischen freigegeben wird.
+
+    Kosten: Die Aktualisierung arbeitet tabellenweise, nicht zeilenweise. Ein einzelner neuer
+    Preis lädt ganz 'supermarket_products' neu, zusätzlich wird jedes Mal die komplette
+    bisherige Generation kopiert; der Aufwand wächst also mit der Größe des Katalogs, nicht
+    mit der Zahl der geänderten Zeilen. Der Spiegel lohnt sich daher bei vielen Lesern und
+    seltenen Preisänderungen (Messung: benchmarks/read_mirror.py, "Aktualisierung").
+
+    Fehlen die nötigen Versionszähler (älteres Schema), bleibt der Spiegel aus und alle
+    Leser verwenden weiterhin die Datei.
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+from database.my_helpers import CONNECTION_FACTORY, DB_PATH, get_connection
+from database.writer import get_writer
+
+# Tabellen im Spiegel; jede braucht einen Zähler in 'table_versions' (siehe schema.sql)
+MIRROR_TABLES = ("supermarkets", "brands", "categories", "products", "supermarket_products")
+
+ENABLED = os.getenv("GROCERY_READ_MIRROR", "off").strip().lower() not in ("", "0", "off")
+
+# Höchstalter (s), nach dem auf Schreibzugriffe anderer Prozesse geprüft wird
+DEFAULT_MAX_AGE = float(os.getenv("GROCERY_MIRROR_MAX_AGE", "1.0"))
+
+_names = itertools.count(1)
+
+
+class ReadMirror:
+    """
+    Label: Lesespiegel einer Datenbankdatei
+    Kurzbeschreibung:
+        Verwaltet die jeweils aktuelle Generation der In-Memory-Kopie. Eine offene
+        Anker-Verbindung hält die Generation am Leben; SQLite gibt eine Shared-Cache-
+        Speicherdatenbank erst frei, wenn ihre letzte Verbindung geschlossen wird.
+
+    Parameter:
+        db_path (Path | str): Quelldatei. Standard: DB_PATH.
+        max_age (float): Höchstalter in Sekunden bis zur nächsten Versionsprüfung.
+
+    Tests:
+        1. Nach einem INSERT in 'supermarket_products' über get_writer() liefert die nächste
+           Leseverbindung den neuen Preis.
+        2. Eine vor der Aktualisierung geöffnete Verbindung liest weiter den alten Stand.
+        3. Tabellen wie 'orders' existieren im Spiegel nicht.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_age: float = DEFAULT_MAX_AGE):
+        self.db_path = db_path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._anchor = None
+        self._uri = None
+        self._versions = None
+        self._checked = 0.0
+        self._dirty = True
+        self._disk = None
+        self.generations = 0
+        self.tables_reloaded = 0
+
+    # ---------- Aktualisierung ----------
+
+    def mark_dirty(self):
+        """Commit-Listener: nächster Lesezugriff prüft die Versionszähler."""
+        self._dirty = True
+
+    def _disk_versions(self) -> dict:
+        if self._disk is None:
+            self._disk = sqlite3.connect(self.db_path, check_same_thread=False)
+        return dict(self._disk.execute("SELECT name, version FROM table_versions").fetchall())
+
+    def _new_target(self):
+        uri = f"file:grocery_mirror_{os.getpid()}_{next(_names)}?mode=memory&cache=shared"
+        return uri, sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    def _full_load(self, target):
+        """Erste Generation: ganze Datei per Backup-API, danach Trigger und Nicht-Katalogtabellen entfernen."""
+        source = sqlite3.connect(self.db_path)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+        # Trigger würden beim Nachladen auf entfernte Tabellen zugreifen; der Spiegel ist read-only
+        triggers = [r[0] for r in target.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]
+        for trigger in triggers:
+            target.execute(f'DROP TRIGGER "{trigger}"')
+        keep = {*MIRROR_TABLES, "table_versions"}
+        tables = [r[0] for r in target.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        for table in tables:
+            if table not in keep:
+                target.execute(f'DROP TABLE "{table}"')
+        target.commit()
+        self.tables_reloaded += len(MIRROR_TABLES)
+        return dict(target.execute("SELECT name, version FROM table_versions").fetchall())
+
+    def _reload_changed_tables(self, target):
+        """Neue Generation: Kopie der alten, jede Tabelle mit geändertem Zähler komplett neu laden."""
+        self._anchor.backup(target)
+        target.execute("ATTACH DATABASE ? AS disk", (str(self.db_path),))
+        try:
+            with target:
+                # Versionen und Daten stammen aus derselben Lesetransaktion der Datei
+                versions = dict(target.execute(
+                    "SELECT name, version FROM disk.table_versions"
+                ).fetchall())
+                changed = [t for t in MIRROR_TABLES if versions.get(t) != self._versions.get(t)]
+                for table in changed:
+                    target.execute(f"DELETE FROM main.{table}")
+                    target.execute(f"INSERT INTO main.{table} SELECT * FROM disk.{table}")
+                target.execute("DELETE FROM main.table_versions")
+                target.execute("INSERT INTO main.table_versions SELECT * FROM disk.table_versions")
+        finally:
+            target.execute("DETACH DATABASE disk")
+        self.tables_reloaded += len(changed)
+        return versions
+
+    def _refresh(self):
+        uri, target = self._new_target()
+        try:
+            versions = self._reload_changed_tables(target) if self._anchor else self._full_load(target)
+        except BaseException:
+            target.close()
+            raise
+        old, self._anchor, self._uri, self._versions = self._anchor, target, uri, versions
+        self.generations += 1
+        if old is not None:
+            # Offene Leser halten die alte Generation bis zum Schließen am Leben
+            old.close()
+
+    def uri(self) -> str:
+        """URI der aktuellen Generation (aktualisiert sie vorher, falls nötig)."""
+        now = time.monotonic()
+        if self._dirty or self._anchor is None or now - self._checked >= self.max_age:
+            with self._lock:
+                if self._dirty or self._anchor is None or now - self._checked >= self.max_age:
+                    # Vor dem Lesen zurücksetzen: ein Commit währenddessen markiert erneut
+                    self._dirty = False
+                    if self._anchor is None or self._disk_versions() != self._versions:
+                        self._refresh()
+                    self._checked = time.monotonic()
+        return self._uri
+
+    def connect(self) -> sqlite3.Connection:
+        """Neue Leseverbindung zur aktuellen Generation (row_factory = sqlite3.Row)."""
+        self.uri()
+        # Unter der Sperre öffnen: _refresh() schließt den alten Anker sonst evtl. zwischen
+        # Lesen der URI und Verbinden, und SQLite legt eine leere Speicherdatenbank an
+        with self._lock:
+            # Gleiche Verbindungsklasse wie get_connection() (Slow-Query-Log gilt auch hier)
+            conn = sqlite3.connect(self._uri, uri=True, factory=CONNECTION_FACTORY)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON;")
+        return conn
+
+    def attach(self, conn: sqlite3.Connection, schema: str):
+        """Hängt die aktuelle Generation als schema an conn an (gleiche Sperre wie connect())."""
+        self.uri()
+        with self._lock:
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (self._uri,))
+
+    def stats(self) -> dict:
+        """Kennzahlen: Anzahl Generationen und nachgeladener Tabellen."""
+        return {"generations": self.generations, "tables_reloaded": self.tables_reloaded,
+                "versions": dict(self._versions or {})}
+
+
+_mirrors = {}
+_mirrors_lock = threading.Lock()
+_unsupported = set()
+
+
+def get_mirror(db_path=DB_PATH):
+    """
+    Label: Spiegel für den aktuellen Prozess holen
+    Kurzbeschreibung:
+        Liefert den Spiegel der Datei (einer je Prozess, wie get_writer) und registriert ihn
+        als Commit-Listener des Writers. Ohne Aktivierung oder bei fehlenden
+        Versionszählern wird None geliefert.
+
+    Parameter:
+        db_path (Path | str): Quelldatei. Standard: DB_PATH.
+
+    Return:
+        ReadMirror | None: Spiegel oder None (Leser verwenden die Datei).
+    """
+    if not ENABLED:
+        return None
+    key = (os.getpid(), str(db_path))
+    mirror = _mirrors.get(key)
+    if mirror is None and key not in _unsupported:
+        with _mirrors_lock:
+            mirror = _mirrors.get(key)
+            if mirror is None and key not in _unsupported:
+                candidate = ReadMirror(db_path)
+                try:
+                    versions = candidate._disk_versions()
+                except sqlite3.OperationalError:
+                    versions = {}
+                missing = [t for t in MIRROR_TABLES if t not in versions]
+                if missing:
+                    print(f"Read-Mirror deaktiviert: keine Versionszähler für {', '.join(missing)}")
+                    _unsupported.add(key)
+                    return None
+                get_writer(db_path).add_commit_listener(candidate.mark_dirty)
+                mirror = _mirrors[key] = candidate
+    return mirror
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """
+    Label: Leseverbindung für Katalogabfragen
+    Kurzbeschreibung:
+        Verbindung zum In-Memory-Spiegel, falls aktiviert, sonst zu grocery.db. Nur für
+        Abfragen auf MIRROR_TABLES (und 'table_versions') verwenden.
+
+    Return:
+        sqlite3.Connection: Nur-Lese-Verbindung mit row_factory = sqlite3.Row.
+    """
+    mirror = get_mirror()
+    return mirror.connect() if mirror is not None else get_connection()
+
+
+def attach_catalog(conn: sqlite3.Connection, schema: str = "catalog"):
+    """Hängt die Katalogtabellen an conn an: den Spiegel, falls aktiviert, sonst grocery.db."""
+    mirror = get_mirror()
+    if mirror is not None:
+        mirror.attach(conn, schema)
+    else:
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(DB_PATH),))
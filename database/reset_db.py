@@ -14,19 +14,25 @@ Kurzbeschreibung des Moduls:
     die Datenbankdatei aktuell geöffnet hat.
 
 """
-from my_helpers import get_connection, DB_PATH
+from my_helpers import get_connection, DB_PATH, SHARD_DIR
 
 destroy_schema = """
 -- Aktiviert Foreign Key Support
 PRAGMA foreign_keys = ON;
 
+DROP TABLE IF EXISTS price_drop_events;
+DROP TABLE IF EXISTS product_watchers;
+DROP TABLE IF EXISTS crawled_product_links;
 DROP TABLE IF EXISTS saved_products;
 DROP TABLE IF EXISTS order_items;
 DROP TABLE IF EXISTS orders;
 DROP TABLE IF EXISTS supermarket_products;
 DROP TABLE IF EXISTS products;
+DROP TABLE IF EXISTS brands;
+DROP TABLE IF EXISTS categories;
 DROP TABLE IF EXISTS supermarkets;
 DROP TABLE IF EXISTS users;
+DROP TABLE IF EXISTS table_versions;
 """
 
 
@@ -52,6 +58,10 @@ def main():
     if DB_PATH.exists():
         DB_PATH.unlink()
         print(f"Bestehende {DB_PATH} gelöscht.")
+    # Shard-Dateien der nutzerbezogenen Tabellen (database/sharding.py) ebenfalls entfernen
+    for shard in SHARD_DIR.glob("*.db*"):
+        shard.unlink()
+        print(f"Shard {shard.name} gelöscht.")
     # 2. Verbindung herstellen (erstellt neue, leere DB) und Schema löschen
     # (Diese Schritte sind redundant nach Dateilöschung, dienen aber der Robustheit, 
     # falls die DB-Datei nicht gelöscht werden konnte)
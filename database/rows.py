@@ -0,0 +1,185 @@
+"""
+Label: Kompakte, typisierte Ergebniszeilen
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Bisher mischten die Routen sqlite3.Row-Objekte aus der Datenbank mit Dictionaries des
+    Crawlers. Dieses Modul definiert gemeinsame Zeilentypen als Dataclasses mit __slots__
+    (kein __dict__ je Objekt). DB-Zeilen werden direkt aus den Tupeln des Cursors erzeugt,
+    Crawler-Treffer über from_item().
+
+    Alle Typen erlauben zusätzlich den Zugriff per Schlüssel (row["name"]) und keys(), damit
+    Templates und bestehender Code unverändert weiterlaufen.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+class _RowAccess:
+    """Mixin: Schlüsselzugriff wie bei sqlite3.Row bzw. dict."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    @classmethod
+    def keys(cls) -> tuple:
+        return cls._field_names
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self._field_names}
+
+
+def _finalize(cls):
+    cls._field_names = tuple(f.name for f in fields(cls))
+    return cls
+
+
+@_finalize
+@dataclass(slots=True)
+class Supermarket(_RowAccess):
+    """Supermarkt aus dem Katalog."""
+
+    id: str
+    name: str
+
+
+@_finalize
+@dataclass(slots=True)
+class Product(_RowAccess):
+    """Produktstammdaten aus dem Katalog."""
+
+    id: str
+    name: str
+    brand: Optional[str]
+    category: Optional[str]
+
+
+@_finalize
+@dataclass(slots=True)
+class Offer(_RowAccess):
+    """Preisangebot eines Produkts in einem Markt (DB-Zeile oder Live-Treffer)."""
+
+    product_id: Optional[str]
+    name: str
+    brand: Optional[str]
+    category: Optional[str]
+    supermarket_name: str
+    supermarket_id: Optional[str]
+    price: float
+    is_live: bool = False
+    product_url: Optional[str] = None
+    timestamp: Optional[str] = None
+
+    @classmethod
+    def from_item(cls, item: dict) -> "Offer":
+        """Erzeugt ein Angebot aus einem Crawler-Treffer (fehlende Felder bleiben leer)."""
+        return cls(
+            item.get("product_id"),
+            item.get("name", ""),
+            item.get("brand"),
+            item.get("category"),
+            item.get("supermarket_name", ""),
+            item.get("supermarket_id"),
+            item["price"],
+            bool(item.get("is_live", True)),
+            item.get("product_url"),
+            item.get("timestamp"),
+        )
+
+
+@_finalize
+@dataclass(slots=True)
+class SavedItem(_RowAccess):
+    """Eintrag der Merkliste inkl. günstigstem bekannten Preis."""
+
+    id: str
+    saved_at: str
+    name: str
+    brand: Optional[str]
+    category: Optional[str]
+    min_price: Optional[float]
+
+
+@_finalize
+@dataclass(slots=True)
+class SavingsLine(_RowAccess):
+    """Bestellposition mit Ist-Preis und Preis im Referenzmarkt."""
+
+    order_id: str
+    order_date: str
+    supermarket_id: str
+    actual_supermarket_name: str
+    product_id: str
+    product_name: str
+    category: Optional[str]
+    quantity: int
+    price_at_purchase: float
+    ref_price: Optional[float]
+
+
+@_finalize
+@dataclass(slots=True)
+class PriceDrop(_RowAccess):
+    """Preissenkung eines gemerkten Produkts (siehe database/price_watch.py)."""
+
+    id: int
+    product_id: str
+    name: str
+    supermarket_name: str
+    old_price: float
+    new_price: float
+    created_at: str
+
+
+def fetch_as(cursor, cls) -> list:
+    """
+    Label: Cursor-Ergebnis als typisierte Zeilen
+    Kurzbeschreibung:
+        Erzeugt für jede Ergebniszeile eine Instanz von cls. Stimmen die Spalten der Abfrage
+        in Name und Reihenfolge mit den Feldern überein, werden die Tupel direkt positionell
+        übergeben; andernfalls werden die Spalten per Name zugeordnet.
+
+        Gleiche Texte (Marke, Kategorie, Marktname, Produktname bei mehreren Angeboten)
+        liefert sqlite3 als jeweils neue str-Objekte; sie werden hier auf ein gemeinsames
+        Objekt zusammengelegt. Bei großen Ergebnislisten macht das den Großteil der
+        Speicherersparnis aus.
+
+    Parameter:
+        cursor (sqlite3.Cursor): Ausgeführte Abfrage (beliebige row_factory).
+        cls (type): Zeilentyp aus diesem Modul.
+
+    Return:
+        list: Instanzen von cls.
+
+    Tests:
+        1. SELECT id, name FROM supermarkets → Liste von Supermarket mit passenden Werten.
+        2. Abweichende Spaltenreihenfolge wird korrekt per Name zugeordnet.
+    """
+    names = tuple(d[0] for d in cursor.description)
+    # Rohe Tupel statt sqlite3.Row: spart je Zeile ein Zwischenobjekt
+    cursor.row_factory = None
+    field_names = cls._field_names
+    strings = {}
+    share = strings.setdefault
+
+    def dedup(row):
+        return [share(v, v) if type(v) is str else v for v in row]
+
+    if names == field_names[:len(names)]:
+        return [cls(*dedup(row)) for row in cursor]
+    index = {name: i for i, name in enumerate(names)}
+    picks = [(name, index[name]) for name in field_names if name in index]
+    return [cls(**{name: share(row[i], row[i]) if type(row[i]) is str else row[i]
+                   for name, i in picks}) for row in cursor]
@@ -28,17 +28,35 @@ CREATE TABLE supermarkets (
     website TEXT
 );
 
+-- Tabelle 3a/3b: brands, categories (Wörterbücher für Marke und Kategorie)
+-- Jeder Name wird genau einmal gespeichert (Groß-/Kleinschreibung egal); Produkte verweisen
+-- über kleine Integer-IDs darauf (Anlegen siehe database/lookups.py)
+CREATE TABLE brands (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+
+CREATE TABLE categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+
 -- Tabelle 3: products (Produktstammdaten)
 CREATE TABLE products (
     id TEXT PRIMARY KEY,
     name TEXT NOT NULL,
-    brand TEXT,
-    category TEXT,
+    brand_id INTEGER,
+    category_id INTEGER,
     created_by_user_id TEXT,
     is_user_created INTEGER NOT NULL DEFAULT 0,
     created_at TEXT NOT NULL,
+    FOREIGN KEY (brand_id) REFERENCES brands(id),
+    FOREIGN KEY (category_id) REFERENCES categories(id),
     FOREIGN KEY (created_by_user_id) REFERENCES users(id)
 );
+-- Filter und KPIs je Kategorie/Marke als Index-Bereichsscan über Integer-IDs
+CREATE INDEX idx_products_category ON products (category_id);
+CREATE INDEX idx_products_brand ON products (brand_id);
 
 -- Tabelle 4: supermarket_products (Preisinformationen)
 CREATE TABLE supermarket_products (
@@ -83,3 +101,178 @@ CREATE TABLE saved_products (
     FOREIGN KEY (user_id) REFERENCES users(id),
     FOREIGN KEY (product_id) REFERENCES products(id)
 );
+
+
+-- Tabelle 8: table_versions (Änderungszähler für In-Memory-Caches)
+-- Wird per Trigger bei jeder Änderung der Katalogtabellen hochgezählt. Prozesse mit einem
+-- In-Memory-Snapshot (database/catalog.py) müssen so nur diese Zähler prüfen, statt die
+-- Tabellen bei jedem Request neu zu lesen.
+CREATE TABLE table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO table_versions (name, version)
+VALUES ('supermarkets', 0), ('products', 0), ('supermarket_products', 0), ('brands', 0), ('categories', 0);
+
+CREATE TRIGGER trg_supermarkets_insert AFTER INSERT ON supermarkets
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'supermarkets';
+END;
+
+CREATE TRIGGER trg_supermarkets_update AFTER UPDATE ON supermarkets
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'supermarkets';
+END;
+
+CREATE TRIGGER trg_supermarkets_delete AFTER DELETE ON supermarkets
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'supermarkets';
+END;
+
+CREATE TRIGGER trg_products_insert AFTER INSERT ON products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER trg_products_update AFTER UPDATE ON products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER trg_products_delete AFTER DELETE ON products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER trg_brands_insert AFTER INSERT ON brands
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'brands';
+END;
+
+CREATE TRIGGER trg_brands_update AFTER UPDATE ON brands
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'brands';
+END;
+
+CREATE TRIGGER trg_brands_delete AFTER DELETE ON brands
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'brands';
+END;
+
+CREATE TRIGGER trg_categories_insert AFTER INSERT ON categories
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'categories';
+END;
+
+CREATE TRIGGER trg_categories_update AFTER UPDATE ON categories
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'categories';
+END;
+
+CREATE TRIGGER trg_categories_delete AFTER DELETE ON categories
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'categories';
+END;
+
+-- Preise: der Read-Mirror (database/read_mirror.py) lädt die Tabelle nur bei Änderungen neu
+CREATE TRIGGER trg_supermarket_products_insert AFTER INSERT ON supermarket_products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'supermarket_products';
+END;
+
+CREATE TRIGGER trg_supermarket_products_update AFTER UPDATE ON supermarket_products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'supermarket_products';
+END;
+
+CREATE TRIGGER trg_supermarket_products_delete AFTER DELETE ON supermarket_products
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'supermarket_products';
+END;
+
+-- Tabelle 9: crawled_product_links (Zuordnung Crawler-Treffer → Produkt)
+-- Speichert, welches Katalogprodukt zu einem gecrawlten Artikel gehört, damit wiederholte
+-- Crawls nicht erneut abgeglichen werden müssen (siehe scrapers/matching.py).
+CREATE TABLE crawled_product_links (
+    source TEXT NOT NULL,
+    external_key TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    score REAL NOT NULL,
+    matched_at TEXT NOT NULL,
+    PRIMARY KEY (source, external_key),
+    FOREIGN KEY (product_id) REFERENCES products(id)
+);
+
+-- Preisbeobachtung (siehe database/price_watch.py)
+-- Günstigster Preis je Produkt als Indexzugriff statt Tabellenscan
+CREATE INDEX idx_supermarket_products_product ON supermarket_products (product_id, price);
+
+-- Tabelle 10: product_watchers (Index Produkt → beobachtende User)
+-- Ein Eintrag je (Produkt, User) mit dem zuletzt bekannten günstigsten Preis. Bei einer
+-- Preisänderung werden nur die Beobachter des geänderten Produkts betrachtet.
+CREATE TABLE product_watchers (
+    product_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    best_price REAL,
+    PRIMARY KEY (product_id, user_id)
+) WITHOUT ROWID;
+
+-- Tabelle 11: price_drop_events (Preissenkungen für gemerkte Produkte)
+CREATE TABLE price_drop_events (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    supermarket_id TEXT NOT NULL,
+    old_price REAL NOT NULL,
+    new_price REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    seen_at TEXT
+);
+CREATE INDEX idx_price_drop_events_user ON price_drop_events (user_id, seen_at);
+
+-- Gemerkte Produkte werden automatisch beobachtet (Ausgangspreis = aktueller Bestpreis)
+CREATE TRIGGER trg_saved_products_watch AFTER INSERT ON saved_products
+BEGIN
+    INSERT OR IGNORE INTO product_watchers (product_id, user_id, best_price)
+    VALUES (
+        NEW.product_id, NEW.user_id,
+        (SELECT MIN(price) FROM supermarket_products WHERE product_id = NEW.product_id)
+    );
+END;
+
+-- Neuer bzw. geänderter Preis: Ereignis für jeden Beobachter, dessen Bestpreis unterboten
+-- wird; danach Bestpreis der Beobachter dieses einen Produkts neu bestimmen
+CREATE TRIGGER trg_price_watch_insert AFTER INSERT ON supermarket_products
+BEGIN
+    INSERT INTO price_drop_events (user_id, product_id, supermarket_id, old_price, new_price, created_at)
+    SELECT user_id, product_id, NEW.supermarket_id, best_price, NEW.price,
+           strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime')
+    FROM product_watchers
+    WHERE product_id = NEW.product_id AND best_price IS NOT NULL AND NEW.price < best_price;
+
+    UPDATE product_watchers
+    SET best_price = (SELECT MIN(price) FROM supermarket_products WHERE product_id = NEW.product_id)
+    WHERE product_id = NEW.product_id;
+END;
+
+CREATE TRIGGER trg_price_watch_update AFTER UPDATE OF price ON supermarket_products
+WHEN NEW.price IS NOT OLD.price
+BEGIN
+    INSERT INTO price_drop_events (user_id, product_id, supermarket_id, old_price, new_price, created_at)
+    SELECT user_id, product_id, NEW.supermarket_id, best_price, NEW.price,
+           strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime')
+    FROM product_watchers
+    WHERE product_id = NEW.product_id AND best_price IS NOT NULL AND NEW.price < best_price;
+
+    UPDATE product_watchers
+    SET best_price = (SELECT MIN(price) FROM supermarket_products WHERE product_id = NEW.product_id)
+    WHERE product_id = NEW.product_id;
+END;
+
+CREATE TRIGGER trg_price_watch_delete AFTER DELETE ON supermarket_products
+BEGIN
+    UPDATE product_watchers
+    SET best_price = (SELECT MIN(price) FROM supermarket_products WHERE product_id = OLD.product_id)
+    WHERE product_id = OLD.product_id;
+END;
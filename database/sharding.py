@@ -0,0 +1,355 @@
+"""
+Label: Sharding der nutzerbezogenen Tabellen
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Alle Schreibzugriffe landen sonst in grocery.db, und SQLite erlaubt pro Datei nur einen
+    Schreiber. Im Sharding-Modus liegen die nutzerbezogenen Tabellen (orders, order_items,
+    saved_products) stattdessen in eigenen SQLite-Dateien unter SHARD_DIR; Katalogtabellen
+    (users, supermarkets, products, supermarket_products, …) bleiben zentral.
+
+    GROCERY_SHARDS steuert die Aufteilung:
+        - "off" (Standard): kein Sharding, alles in grocery.db,
+        - "user": eine Datei je User (shards/user_<id>.db, ID escaped, siehe shard_name()),
+        - Zahl N: N Dateien, User werden per CRC32 verteilt (shards/bucket_0007.db).
+
+    Lesezugriffe öffnen den Shard als Hauptdatenbank und hängen grocery.db per ATTACH an.
+    Da SQLite unqualifizierte Tabellennamen zuerst in der Hauptdatenbank sucht, laufen die
+    bestehenden Abfragen (JOINs von orders auf products usw.) unverändert. Schreibzugriffe
+    gehen über einen eigenen Writer je Shard (database/writer.py), sodass Nutzer in
+    verschiedenen Shards parallel schreiben.
+
+    Bestehende Daten aus grocery.db werden übernommen mit:
+        python -m database.sharding migrate [--delete]
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+
+from database.my_helpers import DB_PATH, SHARD_DIR, get_connection
+from database.read_mirror import attach_catalog
+from database.writer import WriteCoordinator, get_writer
+
+USER_TABLES = ("orders", "order_items", "saved_products")
+
+# Zeichen, die im Modus "user" unverändert in den Dateinamen übernommen werden. Nur
+# Kleinbuchstaben, damit Namen auch auf Dateisystemen ohne Groß-/Kleinschreibung eindeutig sind.
+_SAFE_NAME_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-")
+
+# Wie schema.sql, aber ohne Fremdschlüssel: die referenzierten Tabellen liegen in grocery.db
+SHARD_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    order_date TEXT NOT NULL,
+    supermarket_id TEXT NOT NULL,
+    total_amount REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_user_date ON orders (user_id, order_date);
+
+CREATE TABLE IF NOT EXISTS order_items (
+    id TEXT PRIMARY KEY,
+    order_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price_at_purchase REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_id);
+
+CREATE TABLE IF NOT EXISTS saved_products (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    saved_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_saved_products_user ON saved_products (user_id, saved_at);
+"""
+
+
+def _parse_mode(value: str):
+    value = (value or "off").strip().lower()
+    if value in ("", "off", "0"):
+        return None
+    if value == "user":
+        return "user"
+    if value.isdigit():
+        return int(value)
+    raise ValueError(f"Ungültiger Wert für GROCERY_SHARDS: {value!r} (off, user oder Anzahl)")
+
+
+SHARD_MODE = _parse_mode(os.getenv("GROCERY_SHARDS", "off"))
+
+_ready = set()
+_ready_lock = threading.Lock()
+
+# Sekunden ohne Schreibauftrag, nach denen ein Shard-Writer Thread und Verbindung freigibt
+SHARD_WRITER_IDLE = float(os.getenv("GROCERY_SHARD_WRITER_IDLE", "30"))
+
+
+def is_sharded() -> bool:
+    """True, wenn die nutzerbezogenen Tabellen in Shard-Dateien liegen."""
+    return SHARD_MODE is not None
+
+
+def shard_name(user_id: str) -> str:
+    """
+    Label: Shard eines Users bestimmen
+    Kurzbeschreibung:
+        Liefert den Dateinamen (ohne Endung) des Shards, in dem die Daten des Users liegen.
+
+    Parameter:
+        user_id (str): ID des Users.
+
+    Return:
+        str: z. B. "user_u1", "user_u_5f01_4a…" bzw. "bucket_0003".
+
+    Tests:
+        1. Im Modus "user" liefern verschiedene IDs verschiedene Namen ("a_b", "a b", "A_B").
+        2. Im Bucket-Modus liefert dieselbe ID immer denselben Bucket (CRC32, prozessunabhängig).
+    """
+    if SHARD_MODE == "user":
+        # Umkehrbares Escaping: jedes Byte außerhalb von [a-z0-9-] wird zu "_xx" (Hex).
+        # "_" leitet nur Escapes ein, daher können zwei IDs nie denselben Namen ergeben.
+        return "user_" + "".join(
+            chr(byte) if chr(byte) in _SAFE_NAME_CHARS else f"_{byte:02x}"
+            for byte in user_id.encode("utf-8")
+        )
+    return f"bucket_{zlib.crc32(user_id.encode('utf-8')) % SHARD_MODE:04d}"
+
+
+def shard_path(user_id: str) -> Path:
+    """
+    Label: Datenbankdatei eines Users
+    Kurzbeschreibung:
+        Liefert die Datei mit den nutzerbezogenen Tabellen des Users und legt sie beim ersten
+        Zugriff samt Schema (WAL-Modus) an. Ohne Sharding ist das grocery.db.
+
+    Parameter:
+        user_id (str): ID des Users.
+
+    Return:
+        Path: Pfad zur SQLite-Datei.
+    """
+    if not is_sharded():
+        return DB_PATH
+    path = SHARD_DIR / f"{shard_name(user_id)}.db"
+    if path not in _ready:
+        with _ready_lock:
+            if path not in _ready:
+                SHARD_DIR.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(path)
+                try:
+                    conn.execute("PRAGMA journal_mode = WAL;")
+                    conn.executescript(SHARD_SCHEMA)
+                finally:
+                    conn.close()
+                _ready.add(path)
+    return path
+
+
+def get_user_connection(user_id: str) -> sqlite3.Connection:
+    """
+    Label: Leseverbindung für die Daten eines Users
+    Kurzbeschreibung:
+        Ohne Sharding eine normale Verbindung zu grocery.db. Mit Sharding eine Verbindung zum
+        Shard des Users, an die grocery.db (bzw. deren In-Memory-Spiegel) als Schema 'catalog'
+        angehängt ist; Abfragen über orders/saved_products und Katalogtabellen funktionieren
+        damit unverändert.
+
+    Parameter:
+        user_id (str): ID des Users.
+
+    Return:
+        sqlite3.Connection: Verbindung mit row_factory = sqlite3.Row.
+
+    Tests:
+        1. Mit Sharding liefert "SELECT COUNT(*) FROM orders" nur Bestellungen aus dem Shard.
+        2. Ein JOIN von orders auf products liefert die Produktnamen aus grocery.db.
+    """
+    if not is_sharded():
+        return get_connection()
+    conn = get_connection(shard_path(user_id))
+    # Katalogtabellen aus dem In-Memory-Spiegel, falls aktiviert (database/read_mirror.py)
+    attach_catalog(conn)
+    return conn
+
+
+def get_user_writer(user_id: str) -> WriteCoordinator:
+    """
+    Writer (Single-Writer-Queue) für den Shard des Users bzw. für grocery.db.
+
+    Shard-Writer beenden ihren Thread samt Verbindung nach SHARD_WRITER_IDLE Sekunden ohne
+    Auftrag und starten beim nächsten submit() neu; im Modus "user" belegen so nur die gerade
+    schreibenden User einen Thread und ein Datei-Handle.
+    """
+    if not is_sharded():
+        return get_writer()
+    return get_writer(shard_path(user_id), idle_timeout=SHARD_WRITER_IDLE)
+
+
+# Je Tabelle: Zeilen eines Users in grocery.db (Schema central), die im Shard fehlen oder
+# abweichen. Leer für alle Tabellen = Kopie vollständig, die Zeilen dürfen gelöscht werden.
+_MISSING_IN_SHARD = {
+    "orders": """
+        SELECT id, user_id, order_date, supermarket_id, total_amount
+        FROM central.orders WHERE user_id = :user_id
+        EXCEPT
+        SELECT id, user_id, order_date, supermarket_id, total_amount FROM main.orders
+    """,
+    "order_items": """
+        SELECT oi.id, oi.order_id, oi.product_id, oi.quantity, oi.price_at_purchase
+        FROM central.order_items oi
+        JOIN central.orders o ON o.id = oi.order_id
+        WHERE o.user_id = :user_id
+        EXCEPT
+        SELECT id, order_id, product_id, quantity, price_at_purchase FROM main.order_items
+    """,
+    "saved_products": """
+        SELECT id, user_id, product_id, saved_at
+        FROM central.saved_products WHERE user_id = :user_id
+        EXCEPT
+        SELECT id, user_id, product_id, saved_at FROM main.saved_products
+    """,
+}
+
+
+def _copy_user(conn, user_id: str):
+    """Kopiert die Zeilen eines Users aus central (grocery.db) in den Shard (main)."""
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO orders (id, user_id, order_date, supermarket_id, total_amount)
+        SELECT id, user_id, order_date, supermarket_id, total_amount
+        FROM central.orders WHERE user_id = ?
+        """,
+        (user_id,),
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO order_items (id, order_id, product_id, quantity, price_at_purchase)
+        SELECT oi.id, oi.order_id, oi.product_id, oi.quantity, oi.price_at_purchase
+        FROM central.order_items oi
+        JOIN central.orders o ON o.id = oi.order_id
+        WHERE o.user_id = ?
+        """,
+        (user_id,),
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO saved_products (id, user_id, product_id, saved_at)
+        SELECT id, user_id, product_id, saved_at
+        FROM central.saved_products WHERE user_id = ?
+        """,
+        (user_id,),
+    )
+
+
+def _delete_user(central, user_id: str):
+    """Löscht die Zeilen eines Users aus grocery.db (nur nach geprüfter Kopie aufrufen)."""
+    with central:
+        central.execute(
+            "DELETE FROM order_items WHERE order_id IN (SELECT id FROM orders WHERE user_id = ?)",
+            (user_id,),
+        )
+        central.execute("DELETE FROM orders WHERE user_id = ?", (user_id,))
+        central.execute("DELETE FROM saved_products WHERE user_id = ?", (user_id,))
+
+
+def migrate(delete: bool = False) -> dict:
+    """
+    Label: Bestehende Nutzerdaten in die Shards übernehmen
+    Kurzbeschreibung:
+        Kopiert orders, order_items und saved_products aller User aus grocery.db in ihre
+        Shards (bereits vorhandene IDs werden übersprungen). Mit delete werden die Zeilen eines
+        Users erst gelöscht, nachdem geprüft ist, dass jede seiner zentralen Zeilen unverändert
+        im Shard liegt; andere User und Zeilen ohne geprüfte Kopie bleiben in grocery.db.
+        Sollte bei gestopptem Server laufen, da die zentrale Datenbank direkt geöffnet wird.
+
+    Parameter:
+        delete (bool): Geprüft übernommene Zeilen anschließend aus grocery.db löschen.
+
+    Return:
+        dict: shard-Name → Anzahl kopierter Zeilen.
+
+    Raises:
+        RuntimeError: Bei delete, falls die Kopie einzelner User unvollständig ist (deren
+            Zeilen bleiben erhalten; alle anderen User sind bereits übernommen).
+
+    Tests:
+        1. Nach migrate() sind die Bestellungen eines Users über get_user_connection() sichtbar.
+        2. Ein zweiter Aufruf kopiert keine Zeilen doppelt.
+        3. Weicht eine Shard-Zeile von grocery.db ab, bleibt die zentrale Zeile bei delete erhalten.
+    """
+    if not is_sharded():
+        raise RuntimeError("Sharding ist nicht aktiviert (GROCERY_SHARDS).")
+
+    central = get_connection()
+    user_ids = [row[0] for row in central.execute(
+        "SELECT user_id FROM orders UNION SELECT user_id FROM saved_products"
+    )]
+
+    copied = {}
+    unverified = []
+    try:
+        for user_id in user_ids:
+            conn = sqlite3.connect(shard_path(user_id))
+            try:
+                conn.execute("ATTACH DATABASE ? AS central", (str(DB_PATH),))
+                before = conn.total_changes
+                with conn:
+                    _copy_user(conn, user_id)
+                name = shard_name(user_id)
+                copied[name] = copied.get(name, 0) + conn.total_changes - before
+                if delete:
+                    verified = not any(
+                        conn.execute(sql, {"user_id": user_id}).fetchone()
+                        for sql in _MISSING_IN_SHARD.values()
+                    )
+            finally:
+                conn.close()
+            if delete:
+                if verified:
+                    _delete_user(central, user_id)
+                else:
+                    unverified.append(user_id)
+    finally:
+        central.close()
+
+    if unverified:
+        raise RuntimeError(
+            "Kopie unvollständig, Zeilen bleiben in grocery.db für User: " + ", ".join(unverified)
+        )
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharding der nutzerbezogenen Tabellen")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate_cmd = sub.add_parser("migrate", help="Nutzerdaten aus grocery.db in die Shards kopieren")
+    migrate_cmd.add_argument("--delete", action="store_true",
+                             help="Kopierte Zeilen anschließend aus grocery.db löschen")
+    sub.add_parser("list", help="Vorhandene Shards mit Zeilenzahlen anzeigen")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        copied = migrate(delete=args.delete)
+        for name, rows in sorted(copied.items()):
+            print(f"{name:<20} {rows:>8} Zeilen übernommen")
+        print(f"{len(copied)} Shards in {SHARD_DIR}")
+        return
+
+    for path in sorted(SHARD_DIR.glob("*.db")):
+        conn = sqlite3.connect(path)
+        counts = [conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in USER_TABLES]
+        conn.close()
+        print(f"{path.stem:<20} " + "  ".join(f"{t}={c}" for t, c in zip(USER_TABLES, counts)))
+
+
+if __name__ == "__main__":
+    main()
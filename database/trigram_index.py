@@ -0,0 +1,140 @@
+"""
+Label: Trigramm-Index für fehlertolerante Suche
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Die Suche per LIKE '%q%' findet bei Tippfehlern ("Volmilch", "Nudlen") nichts. Dieses
+    Modul zerlegt Produktnamen und Kategorien in Trigramme (Folgen aus drei Zeichen) und hält
+    einen invertierten Index Trigramm → Einträge im Speicher.
+
+    Für eine Suchanfrage werden nur die Einträge betrachtet, die mindestens ein Trigramm mit
+    der Anfrage teilen (Shortlist über die Posting-Listen). Diese werden nach Ähnlichkeit
+    (Dice-Koeffizient der Trigramm-Mengen) sortiert. Eine Editierdistanz gegen jede Zeile
+    ist damit nicht nötig.
+"""
+
+import threading
+from collections import defaultdict
+
+from database.catalog import get_catalog
+
+# Mindestähnlichkeit (Dice-Koeffizient), ab der ein Produkt als Treffer gilt
+MIN_SIMILARITY = 0.35
+
+
+def trigrams(text: str) -> frozenset:
+    """
+    Label: Trigramme eines Textes
+    Kurzbeschreibung:
+        Zerlegt jeden Wort-Bestandteil (klein geschrieben, mit zwei Leerzeichen davor und
+        einem dahinter) in überlappende Drei-Zeichen-Folgen, analog zu PostgreSQL pg_trgm.
+
+    Parameter:
+        text (str): Eingabetext.
+
+    Return:
+        frozenset[str]: Menge aller Trigramme.
+
+    Tests:
+        1. trigrams("Milch") enthält "  m", " mi", "mil", "ilc", "lch" und "ch ".
+        2. Leerer Text liefert eine leere Menge.
+    """
+    grams = set()
+    for word in text.casefold().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    """
+    Label: Invertierter Trigramm-Index
+    Kurzbeschreibung:
+        Jeder Eintrag ist ein (product_id, Feldtext)-Paar (Name bzw. Kategorie). Die
+        Posting-Listen verweisen von einem Trigramm auf alle Einträge, die es enthalten.
+
+    Tests:
+        1. search("Volmilch") liefert "Vollmilch 3.5%" als besten Treffer.
+        2. search("Nudlen") findet Produkte der Kategorie "Nudeln".
+        3. search("xyz") liefert eine leere Liste.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._docs = []
+        self.version = None
+        self._lock = threading.Lock()
+
+    def rebuild(self, products, version=None):
+        """Baut Einträge und Posting-Listen aus einer Produktliste neu auf."""
+        docs = []
+        postings = defaultdict(list)
+        for product in products:
+            for text in (product["name"], product["category"]):
+                if not text:
+                    continue
+                grams = trigrams(text)
+                doc_id = len(docs)
+                docs.append((product["id"], len(grams)))
+                for gram in grams:
+                    postings[gram].append(doc_id)
+        with self._lock:
+            self._docs = docs
+            self._postings = dict(postings)
+            self.version = version
+
+    def sync(self, catalog):
+        """Baut den Index neu auf, falls sich die Katalogversion geändert hat."""
+        if catalog.version is not None and catalog.version == self.version:
+            return
+        self.rebuild(catalog.products, catalog.version)
+
+    def search(self, query: str, k: int = 20, min_similarity: float = MIN_SIMILARITY) -> list:
+        """
+        Label: Ähnliche Produkte finden
+        Kurzbeschreibung:
+            Zählt für alle Einträge der betroffenen Posting-Listen die gemeinsamen Trigramme
+            und berechnet daraus den Dice-Koeffizient 2·|A∩B| / (|A|+|B|). Pro Produkt zählt
+            der beste Eintrag (Name oder Kategorie).
+
+        Parameter:
+            query (str): Suchbegriff (darf Tippfehler enthalten).
+            k (int): Maximale Anzahl Treffer.
+            min_similarity (float): Untergrenze für die Ähnlichkeit (0–1).
+
+        Return:
+            list[tuple[str, float]]: (product_id, Ähnlichkeit), absteigend sortiert.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        with self._lock:
+            postings = self._postings
+            docs = self._docs
+
+        overlap = defaultdict(int)
+        for gram in query_grams:
+            for doc_id in postings.get(gram, ()):
+                overlap[doc_id] += 1
+
+        best = {}
+        for doc_id, shared in overlap.items():
+            product_id, size = docs[doc_id]
+            score = 2.0 * shared / (len(query_grams) + size)
+            if score >= min_similarity and score > best.get(product_id, 0.0):
+                best[product_id] = score
+
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+_index = TrigramIndex()
+
+
+def get_trigram_index() -> TrigramIndex:
+    """Liefert den prozessweiten Trigramm-Index, abgeglichen mit dem aktuellen Katalog."""
+    _index.sync(get_catalog())
+    return _index
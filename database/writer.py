@@ -0,0 +1,356 @@
+"""
+Label: Single-Writer-Queue mit Group-Commit
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    SQLite erlaubt immer nur einen Schreiber gleichzeitig. Öffnet jede Route ihre eigene
+    Verbindung zum Schreiben, kommt es bei mehreren Threads schnell zu "database is locked".
+    Dieses Modul bündelt deshalb alle Schreibzugriffe eines Prozesses in einem eigenen
+    Writer-Thread mit Warteschlange:
+        - Aufrufer übergeben eine Funktion fn(conn, ...) und erhalten ein Future zurück,
+        - der Writer fasst alle wartenden Aufträge zu einer Transaktion zusammen
+          (Group-Commit), jeder Auftrag läuft in einem eigenen SAVEPOINT,
+        - die Datenbank läuft im WAL-Modus, sodass Leser parallel weiterarbeiten können,
+        - Queue-Tiefe und Commit-Latenzen sind über stats() abrufbar,
+        - Listener (add_commit_listener) werden nach jedem erfolgreichen Commit benachrichtigt,
+          bevor die Aufrufer ihr Ergebnis erhalten (z. B. für den Read-Mirror).
+
+    Der Writer serialisiert nur die Schreibzugriffe eines Prozesses. Mehrere Worker-Prozesse
+    (gunicorn --workers) haben je einen eigenen Writer und konkurrieren weiterhin um die
+    Schreibsperre der Datei; ein belegtes BEGIN IMMEDIATE wird deshalb mit Backoff wiederholt
+    (BEGIN_RETRIES), bevor die Gruppe fehlschlägt.
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from database.my_helpers import DB_PATH, get_connection
+
+logger = logging.getLogger(__name__)
+
+# Wiederholungen für BEGIN IMMEDIATE, wenn ein anderer Prozess die Schreibsperre hält
+# (zusätzlich zum busy timeout der Verbindung); Pause verdoppelt sich ab BEGIN_BACKOFF
+BEGIN_RETRIES = 5
+BEGIN_BACKOFF = 0.05
+
+
+class _WriteJob:
+    """Ein einzelner Schreibauftrag (Funktion + Argumente + Future für das Ergebnis)."""
+
+    __slots__ = ("fn", "args", "kwargs", "future")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+class WriteCoordinator:
+    """
+    Label: Write-Coordinator (ein Writer-Thread pro Prozess und Datenbank)
+    Kurzbeschreibung:
+        Nimmt Schreibaufträge über eine Queue entgegen und führt sie in einem dedizierten
+        Thread aus. Alle zum Zeitpunkt des Commits wartenden Aufträge (maximal max_batch)
+        werden in einer gemeinsamen Transaktion festgeschrieben. Schlägt ein einzelner
+        Auftrag fehl, wird nur sein SAVEPOINT zurückgerollt; die übrigen Aufträge der
+        Gruppe werden trotzdem committet.
+
+    Parameter:
+        db_path (Path | str): Pfad zur SQLite-Datei. Standard: DB_PATH aus my_helpers.
+        max_batch (int): Maximale Anzahl Aufträge pro Transaktion.
+        max_wait_ms (float): Wartezeit, um weitere Aufträge für eine Gruppe zu sammeln.
+        idle_timeout (float | None): Sekunden ohne Auftrag, nach denen der Thread endet und
+            die Verbindung schließt (None = läuft bis stop()). submit() startet ihn neu.
+
+    Tests:
+        1. execute() liefert den Rückgabewert der übergebenen Funktion nach dem Commit.
+        2. Eine Exception in einem Auftrag wird an genau diesen Aufrufer weitergegeben,
+           andere Aufträge derselben Gruppe bleiben erhalten.
+        3. 100 parallel abgesetzte Inserts aus 10 Threads führen zu keinem "database is locked".
+    """
+
+    def __init__(self, db_path=DB_PATH, max_batch: int = 64, max_wait_ms: float = 1.0,
+                 idle_timeout=None):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._jobs = 0
+        self._failed_jobs = 0
+        self._commits = 0
+        self._commit_seconds = 0.0
+        self._last_commit_ms = 0.0
+        self._max_commit_ms = 0.0
+        self._listeners = []
+
+    # ---------- Lebenszyklus ----------
+
+    def start(self):
+        """Startet den Writer-Thread (idempotent)."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="sqlite-writer", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Beendet den Writer-Thread, nachdem alle wartenden Aufträge verarbeitet wurden."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    # ---------- API für Aufrufer ----------
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Label: Schreibauftrag einreihen
+        Kurzbeschreibung:
+            Reiht fn(conn, *args, **kwargs) in die Writer-Queue ein. Die Funktion bekommt
+            die Writer-Verbindung übergeben und darf kein commit()/rollback() aufrufen.
+
+        Parameter:
+            fn (callable): Schreibfunktion mit der Verbindung als erstem Argument.
+            *args, **kwargs: Weitere Argumente für fn.
+
+        Return:
+            concurrent.futures.Future: Wird nach dem Commit mit dem Rückgabewert von fn
+            (oder der aufgetretenen Exception) erfüllt.
+
+        Tests:
+            1. Das Future ist erst nach dem Commit der Gruppe erfüllt.
+            2. Nach stop() eingereichte Aufträge starten den Writer automatisch neu.
+            3. Lässt sich die Datei nicht öffnen, schlagen die wartenden Futures sofort mit dem
+               Fehler fehl; das nächste submit() versucht es erneut.
+        """
+        self.start()
+        job = _WriteJob(fn, args, kwargs)
+        self._queue.put(job)
+        return job.future
+
+    def add_commit_listener(self, callback):
+        """
+        Label: Commit-Listener registrieren
+        Kurzbeschreibung:
+            callback() wird im Writer-Thread nach jedem erfolgreichen Commit aufgerufen, noch
+            bevor die Futures der Gruppe erfüllt werden. Der Listener sollte nur Zustand
+            markieren und nicht blockieren.
+
+        Parameter:
+            callback (callable): Funktion ohne Argumente.
+        """
+        self._listeners.append(callback)
+
+    def execute(self, fn, *args, timeout: float = 30.0, **kwargs):
+        """Wie submit(), wartet aber blockierend auf das Ergebnis."""
+        return self.submit(fn, *args, **kwargs).result(timeout)
+
+    def flush(self, timeout: float = 30.0):
+        """Wartet, bis alle bisher eingereichten Aufträge committet sind (FIFO-Queue)."""
+        self.execute(lambda conn: None, timeout=timeout)
+
+    def stats(self) -> dict:
+        """
+        Label: Kennzahlen des Writers
+        Kurzbeschreibung:
+            Liefert aktuelle Queue-Tiefe sowie Anzahl und Latenz der bisherigen Commits.
+
+        Return:
+            dict: queue_depth, jobs, failed_jobs, commits, avg_batch_size,
+                  last_commit_ms, avg_commit_ms, max_commit_ms.
+        """
+        with self._stats_lock:
+            commits = self._commits
+            return {
+                "queue_depth": self._queue.qsize(),
+                "jobs": self._jobs,
+                "failed_jobs": self._failed_jobs,
+                "commits": commits,
+                "avg_batch_size": round(self._jobs / commits, 2) if commits else 0.0,
+                "last_commit_ms": round(self._last_commit_ms, 3),
+                "avg_commit_ms": round(self._commit_seconds * 1000 / commits, 3) if commits else 0.0,
+                "max_commit_ms": round(self._max_commit_ms, 3),
+            }
+
+    # ---------- Writer-Thread ----------
+
+    def _open_connection(self):
+        conn = get_connection(self.db_path)
+        try:
+            # Transaktionen werden manuell gesteuert (BEGIN/SAVEPOINT/COMMIT)
+            conn.isolation_level = None
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _collect_batch(self, first):
+        """Sammelt weitere wartende Aufträge zu einer Gruppe (inkl. kurzer Wartezeit)."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        stop = False
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                stop = True
+                break
+            batch.append(job)
+        return batch, stop
+
+    def _fail_pending(self, exc):
+        """Gibt exc an alle wartenden Aufträge weiter und gibt den Thread-Platz frei."""
+        with self._start_lock:
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job.future.set_exception(exc)
+            # Unter der Sperre: ein späteres submit() sieht _thread = None und versucht es neu
+            self._thread = None
+
+    def _run(self):
+        try:
+            conn = self._open_connection()
+        except Exception as exc:  # z. B. gesperrte, fehlende oder ungültige Datei
+            logger.error("Writer für %s konnte die Datenbank nicht öffnen: %s", self.db_path, exc)
+            self._fail_pending(exc)
+            return
+        try:
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    # Nur unter _start_lock beenden: ein gleichzeitiges submit() sieht dann
+                    # entweder den Auftrag in der Queue oder _thread = None und startet neu
+                    with self._start_lock:
+                        if self._queue.empty():
+                            self._thread = None
+                            break
+                    continue
+                if first is None:
+                    break
+                batch, stop = self._collect_batch(first)
+                self._commit_batch(conn, batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _begin(self, conn):
+        """BEGIN IMMEDIATE; bei belegter Schreibsperre mit exponentiellem Backoff wiederholen."""
+        for attempt in range(BEGIN_RETRIES + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as exc:
+                busy = "locked" in str(exc) or "busy" in str(exc)
+                if not busy or attempt == BEGIN_RETRIES:
+                    raise
+                logger.warning("Schreibsperre belegt, BEGIN IMMEDIATE wird wiederholt (%d/%d)",
+                               attempt + 1, BEGIN_RETRIES)
+                time.sleep(BEGIN_BACKOFF * 2 ** attempt)
+
+    def _commit_batch(self, conn, batch):
+        results = []
+        started = time.perf_counter()
+        try:
+            self._begin(conn)
+            for job in batch:
+                conn.execute("SAVEPOINT write_job")
+                try:
+                    value = job.fn(conn, *job.args, **job.kwargs)
+                except Exception as exc:  # Fehler nur diesem Auftrag zuordnen
+                    conn.execute("ROLLBACK TO write_job")
+                    conn.execute("RELEASE write_job")
+                    results.append((False, exc))
+                else:
+                    conn.execute("RELEASE write_job")
+                    results.append((True, value))
+            conn.execute("COMMIT")
+            committed = True
+        except Exception as exc:
+            # BEGIN trotz Wiederholungen oder COMMIT fehlgeschlagen → ganze Gruppe
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            results = [(False, exc)] * len(batch)
+            committed = False
+
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self._commits += 1
+            self._jobs += len(batch)
+            self._failed_jobs += sum(1 for ok, _ in results if not ok)
+            self._commit_seconds += elapsed
+            self._last_commit_ms = elapsed * 1000
+            self._max_commit_ms = max(self._max_commit_ms, elapsed * 1000)
+
+        if committed:
+            for callback in self._listeners:
+                try:
+                    callback()
+                except Exception:  # ein defekter Listener darf den Writer nicht stoppen
+                    logger.exception("Commit-Listener %r fehlgeschlagen", callback)
+
+        # Ergebnisse erst nach dem Commit zustellen, damit Aufrufer die Daten sofort lesen können
+        for job, (ok, value) in zip(batch, results):
+            if ok:
+                job.future.set_result(value)
+            else:
+                job.future.set_exception(value)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path=DB_PATH, idle_timeout=None) -> WriteCoordinator:
+    """
+    Label: Writer für den aktuellen Prozess holen
+    Kurzbeschreibung:
+        Liefert den (lazy erzeugten) WriteCoordinator für die angegebene Datenbank. Die
+        Instanz wird pro Prozess gehalten, damit nach einem fork() (z. B. Multi-Worker-Server)
+        jeder Worker seinen eigenen Writer-Thread startet.
+
+    Parameter:
+        db_path (Path | str): Pfad zur SQLite-Datei. Standard: DB_PATH.
+        idle_timeout (float | None): Leerlaufzeit bis zum Beenden des Threads (nur beim
+            ersten Aufruf je Datei wirksam, siehe WriteCoordinator).
+
+    Return:
+        WriteCoordinator: Writer-Instanz (Thread läuft bzw. startet beim nächsten submit()).
+
+    Tests:
+        1. Zwei Aufrufe im selben Prozess liefern dieselbe Instanz.
+        2. In einem geforkten Kindprozess wird eine neue Instanz erzeugt.
+    """
+    key = (os.getpid(), str(db_path))
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(key)
+            if writer is None:
+                writer = WriteCoordinator(db_path, idle_timeout=idle_timeout)
+                writer.start()
+                _writers[key] = writer
+    return writer
@@ -0,0 +1,57 @@
+# gunicorn.conf.py
+"""
+Label: Produktions-Launcher (gunicorn, Pre-Fork-Modell)
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Konfiguration für den Produktivbetrieb der Flask-App mit gunicorn. Der Master-Prozess
+    lädt die App einmalig über die App-Factory (inkl. vorkompilierter Templates) und forkt
+    anschließend mehrere Worker-Prozesse mit je mehreren Threads, sodass alle CPU-Kerne
+    genutzt werden.
+
+    Start:
+        gunicorn -c gunicorn.conf.py "app:create_app(warm=True)"
+        (bzw. scripts/linux/server-prod.sh)
+
+    Konfiguration über Umgebungsvariablen:
+        GROCERY_BIND     Adresse/Port (Standard: 127.0.0.1:8000)
+        GROCERY_WORKERS  Anzahl Worker-Prozesse (Standard: 2 * CPU-Kerne + 1)
+        GROCERY_THREADS  Threads pro Worker (Standard: 4)
+        GROCERY_TIMEOUT  Timeout pro Request in Sekunden (Standard: 30)
+        GROCERY_PRELOAD  "0" deaktiviert das Vorladen im Master (Standard: "1")
+
+    Graceful Reload:
+        kill -HUP <master-pid>   Worker werden nacheinander ersetzt, laufende Requests
+                                 werden zu Ende bearbeitet. Bei aktivem Preload wird dabei
+                                 kein neuer Code geladen – dafür GROCERY_PRELOAD=0 setzen
+                                 oder per USR2 + WINCH einen neuen Master starten.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GROCERY_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("GROCERY_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GROCERY_THREADS", "4"))
+worker_class = "gthread"
+
+# App im Master laden (Templates/Caches einmal wärmen, dann Copy-on-Write in die Worker)
+preload_app = os.getenv("GROCERY_PRELOAD", "1") != "0"
+
+timeout = int(os.getenv("GROCERY_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+# Worker regelmäßig recyceln (verhindert schleichendes Speicherwachstum)
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Protokolliert den Start eines Workers (Writer-Thread & Verbindungen entstehen lazy im Worker)."""
+    server.log.info("Worker gestartet (pid: %s)", worker.pid)
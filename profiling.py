@@ -0,0 +1,257 @@
+# profiling.py
+"""
+Label: Profiler für einzelne Requests (Flamegraph auf Abruf)
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Langsame Requests (z. B. /savings, /search) lassen sich im laufenden Betrieb gezielt
+    profilieren. Die WSGI-Middleware wird von create_app() nur installiert, wenn
+    GROCERY_PROFILE_TOKEN gesetzt ist; ohne Token entsteht keinerlei Mehraufwand.
+
+    Ein Request wird profiliert, wenn er das Token mitschickt:
+        - Header   X-Profile: <token>         (optional X-Profile-Mode: sample | cprofile)
+        - Query    ?_profile=<token>          (optional &_profile_mode=cprofile)
+    Das Token ist die Admin-Berechtigung; ohne passendes Token läuft der Request normal.
+
+    Modi:
+        - sample (Standard): Ein Hilfsthread liest alle GROCERY_PROFILE_INTERVAL_MS (1 ms)
+          den Python-Stack des Request-Threads (Wall-Clock, auch Wartezeit in SQLite/HTTP).
+          Ergebnis: <name>.collapsed (Collapsed-Stack-Format für flamegraph.pl/speedscope)
+          und <name>.txt (Top-N-Funktionen nach Eigen- und Gesamtanteil).
+        - cprofile: deterministisch mit cProfile (misst jeden Aufruf, spürbar langsamer).
+          Ergebnis: <name>.prof (pstats/snakeviz) und <name>.txt.
+
+    Erfasst wird auch das Erzeugen gestreamter Antworten (stream_page); der Body wird dafür
+    bei profilierten Requests vollständig gepuffert. Dateien landen in GROCERY_PROFILE_DIR
+    (Standard logs/profiles), der Dateiname steht im Antwort-Header X-Profile-File.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import parse_qs
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROFILE_TOKEN = os.getenv("GROCERY_PROFILE_TOKEN", "").strip()
+PROFILE_DIR = os.getenv("GROCERY_PROFILE_DIR") or os.path.join(BASE_DIR, "logs", "profiles")
+SAMPLE_INTERVAL = float(os.getenv("GROCERY_PROFILE_INTERVAL_MS", "1")) / 1000.0
+TOP_N = 25
+
+
+def token_matches(supplied, token: str = PROFILE_TOKEN) -> bool:
+    """True, wenn ein Token konfiguriert ist und supplied ihm entspricht (zeitkonstanter Vergleich)."""
+    if not token or not supplied:
+        return False
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def _frame_label(code) -> str:
+    """Funktionsname mit Datei (relativ zum Projekt) und Zeile der Definition."""
+    filename = code.co_filename
+    if filename.startswith(BASE_DIR):
+        filename = os.path.relpath(filename, BASE_DIR)
+    else:
+        # Paketname mit ausgeben (flask/app.py ≠ app.py des Projekts)
+        filename = os.path.join(os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Label: Sampling-Profiler für einen Thread
+    Kurzbeschreibung:
+        Liest in einem Hilfsthread periodisch den Stack des Ziel-Threads über
+        sys._current_frames() und zählt identische Stacks (Wurzel zuerst).
+
+    Parameter:
+        thread_id (int): Ziel-Thread (threading.get_ident() des Request-Threads).
+        interval (float): Abstand der Stichproben in Sekunden.
+
+    Tests:
+        1. Eine 50 ms lange Schleife im Ziel-Thread ergibt Stacks, die deren Funktion enthalten.
+        2. Nach stop() kommen keine Stichproben mehr hinzu.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed-Stack-Format: "a;b;c <Anzahl>" je Zeile."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, top: int = TOP_N) -> str:
+        """Top-N nach Eigenanteil (Funktion oben auf dem Stack) und Gesamtanteil."""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+        samples = self.samples or 1
+        lines = [f"{self.samples} Stichproben à {self.interval * 1000:.1f} ms", "",
+                 f"{'eigen %':>8} {'gesamt %':>9}  Funktion"]
+        for label, count in own.most_common(top):
+            lines.append(f"{count * 100 / samples:8.1f} {total[label] * 100 / samples:9.1f}  {label}")
+        lines += ["", f"{'gesamt %':>9}  Funktion (inklusive Aufgerufener)"]
+        for label, count in total.most_common(top):
+            lines.append(f"{count * 100 / samples:9.1f}  {label}")
+        return "\n".join(lines) + "\n"
+
+
+class ProfilerMiddleware:
+    """
+    Label: WSGI-Middleware für Profiling auf Abruf
+    Kurzbeschreibung:
+        Leitet Requests ohne gültiges Token unverändert weiter. Mit Token läuft der Request
+        (inkl. Erzeugen des Bodys) unter dem gewählten Profiler; die Ergebnisse werden in
+        profile_dir geschrieben.
+
+    Parameter:
+        app (callable): Die WSGI-Anwendung (app.wsgi_app).
+        token (str): Geheimes Token für den Zugriff.
+        profile_dir (str): Ablageverzeichnis der Profile.
+
+    Tests:
+        1. GET /search mit Header X-Profile: <token> liefert X-Profile-File und legt
+           .collapsed und .txt an.
+        2. Ein falsches Token ergibt eine normale Antwort ohne X-Profile-File.
+    """
+
+    def __init__(self, app, token: str = PROFILE_TOKEN, profile_dir: str = PROFILE_DIR):
+        self.app = app
+        self.token = token
+        self.profile_dir = profile_dir
+
+    def _requested_mode(self, environ):
+        header = environ.get("HTTP_X_PROFILE")
+        query = parse_qs(environ.get("QUERY_STRING", "")) if "_profile" in environ.get("QUERY_STRING", "") else {}
+        supplied = header or (query.get("_profile") or [None])[0]
+        if not token_matches(supplied, self.token):
+            return None
+        mode = environ.get("HTTP_X_PROFILE_MODE") or (query.get("_profile_mode") or ["sample"])[0]
+        return "cprofile" if mode == "cprofile" else "sample"
+
+    def __call__(self, environ, start_response):
+        mode = self._requested_mode(environ)
+        if mode is None:
+            return self.app(environ, start_response)
+
+        name = "{}-{}-{}".format(
+            datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3],
+            re.sub(r"[^A-Za-z0-9]+", "_", environ.get("PATH_INFO", "/")).strip("_") or "root",
+            os.getpid(),
+        )
+        captured = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured["status"], captured["headers"], captured["exc_info"] = status, headers, exc_info
+            return lambda data: captured.setdefault("early", []).append(data)
+
+        if mode == "sample":
+            profiler = StackSampler(threading.get_ident())
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        started = time.perf_counter()
+        try:
+            result = self.app(environ, capture_start_response)
+            try:
+                # Gestreamte Antworten entstehen erst beim Iterieren → mitprofilieren
+                chunks = list(result)
+                body = captured.get("early", []) + chunks
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if mode == "sample":
+                profiler.stop()
+            else:
+                profiler.disable()
+
+        path = self._write(name, mode, profiler, environ, elapsed_ms)
+        headers = [(k, v) for k, v in captured["headers"] if k.lower() != "content-length"]
+        headers += [("Content-Length", str(sum(len(chunk) for chunk in body))),
+                    ("X-Profile-File", os.path.basename(path))]
+        start_response(captured["status"], headers, captured["exc_info"])
+        return body
+
+    def _write(self, name, mode, profiler, environ, elapsed_ms) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base = os.path.join(self.profile_dir, name)
+        request_line = f"{environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')}"
+        if environ.get("QUERY_STRING"):
+            # Token nicht in die Datei schreiben
+            request_line += "?" + re.sub(r"_profile=[^&]*", "_profile=***", environ["QUERY_STRING"])
+        header = f"{request_line}\nModus: {mode}, Dauer: {elapsed_ms:.1f} ms\n\n"
+
+        if mode == "sample":
+            with open(base + ".collapsed", "w", encoding="utf-8") as f:
+                f.write(profiler.collapsed())
+            summary = profiler.summary()
+            result = base + ".collapsed"
+        else:
+            profiler.dump_stats(base + ".prof")
+            buffer = io.StringIO()
+            stats = pstats.Stats(profiler, stream=buffer)
+            stats.sort_stats("cumulative").print_stats(TOP_N)
+            stats.sort_stats("tottime").print_stats(TOP_N)
+            summary = buffer.getvalue()
+            result = base + ".prof"
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(header + summary)
+        return result
+
+
+def install(app):
+    """
+    Label: Profiler in eine Flask-App einhängen
+    Kurzbeschreibung:
+        Umhüllt app.wsgi_app mit ProfilerMiddleware, sofern GROCERY_PROFILE_TOKEN gesetzt ist.
+
+    Parameter:
+        app (flask.Flask): Die Anwendung.
+
+    Return:
+        bool: True, wenn der Profiler aktiv ist.
+    """
+    if not PROFILE_TOKEN:
+        return False
+    app.wsgi_app = ProfilerMiddleware(app.wsgi_app)
+    return True
@@ -1,82 +1,15 @@
 # --- aldi_crawler.py ---
 
-import os
-from typing import Optional
+from itertools import islice
+from typing import Iterator, Optional
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 from urllib.parse import urlencode, urljoin
 
-# Versuche truststore zu laden (optional)
-try:
-    import truststore
-    truststore.inject_into_ssl()
-except Exception:
-    pass
-
-
-def make_session(insecure: bool = False, ca_file: Optional[str] = None) -> requests.Session:
-    """
-    Erzeugt und konfiguriert eine `requests.Session` für wiederverwendbare HTTP-Requests.
-
-    Die Session enthält:
-    - Standard-HTTP-Header, die typische Browseranfragen simulieren
-    - Automatisches Wiederholen (Retry) bei bestimmten HTTP-Fehlern
-    - Optionales SSL-Verhalten
-
-    Args:
-        insecure (bool, optional): 
-            Wenn True, wird die SSL-Zertifikatsprüfung deaktiviert. 
-            Standard ist False.
-        ca_file (str, optional): 
-            Pfad zu einem CA-Bundle für HTTPS-Verbindungen. 
-            Fällt auf Umgebungsvariablen `REQUESTS_CA_BUNDLE` oder `ALDI_CA_FILE` zurück, falls None.
-
-    Returns:
-        requests.Session: Eine konfigurierte Session-Instanz, die für HTTP/HTTPS-Requests verwendet werden kann.
-
-    Beispiele:
-        >>> session = make_session()
-        >>> response = session.get("https://example.com")
-        >>> print(response.status_code)
-
-        >>> session = make_session(insecure=True)
-        >>> response = session.get("https://self-signed.example.com")
-    """
-    s = requests.Session()
-    s.headers.update({
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0 Safari/537.36"
-        ),
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "de-DE,de;q=0.9,en;q=0.8",
-        "Connection": "keep-alive",
-    })
-    retries = Retry(
-        total=3, 
-        backoff_factor=0.6, 
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["HEAD", "GET", "OPTIONS"]
-    )
-    s.mount("https://", HTTPAdapter(max_retries=retries))
-    s.mount("http://", HTTPAdapter(max_retries=retries))
-
-    if insecure:
-        import urllib3
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        s.verify = False
-    else:
-        # ENV-Fallbacks erlauben start ohne UI
-        ca_env = ca_file or os.getenv("REQUESTS_CA_BUNDLE") or os.getenv("ALDI_CA_FILE")
-        if ca_env:
-            s.verify = ca_env
-    return s
-
+from scrapers.registry import DEFAULT_MAX_PAGES, Scraper, register
+from scrapers.session import WEB_RETRIES, archive_page, make_session  # noqa: F401 (Re-Export)
 
 def _extract_price_float(text: str):
     """Extrahiert Preis aus Text (unterstützt deutsches Format)"""
@@ -143,6 +76,125 @@ def split_after_last_caps(s: str):
     return in_caps, normal
 
 
+ALDI_SEARCH_URL = "https://www.aldi-sued.de/de/suchergebnis.html"
+
+
+def build_search_url(query: str) -> str:
+    """Baut die URL der Aldi-Süd-Suchergebnisseite für einen Suchbegriff."""
+    return f"{ALDI_SEARCH_URL}?{urlencode({'search': query})}"
+
+
+def _iter_raw_items(soup: BeautifulSoup, url: str):
+    """Liefert je Produkt-Karte die rohen Felder (Titel, Preistext, Link)."""
+    for card in _candidate_cards(soup):
+        title_el = _find_title(card) or _find_title(soup)
+        price_el = _find_price(card) or _find_price(soup)
+        
+        if not (title_el and price_el):
+            continue
+
+        yield {
+            "title": title_el.get_text(" ", strip=True),
+            "price_raw": price_el.get_text(" ", strip=True) if hasattr(price_el, "get_text") else str(price_el),
+            "product_url": _find_link(card, ALDI_SEARCH_URL) or url,
+        }
+
+
+def _find_next_page(soup: BeautifulSoup, url: str) -> Optional[str]:
+    """Findet den Link zur nächsten Ergebnisseite (rel="next" oder Paginierungs-Button)."""
+    el = soup.select_one(
+        "link[rel~='next'][href], a[rel~='next'][href],"
+        "a[data-qa*='pagination-next'][href], a[aria-label*='Nächste'][href]"
+    )
+    return urljoin(url, el["href"]) if el else None
+
+
+@register
+class AldiSuedScraper(Scraper):
+    """Plugin für die Produktsuche von Aldi Süd."""
+
+    name = "aldi_sued"
+    supermarket_name = "Aldi Süd"
+    host = "aldi-sued.de"
+
+    def search_url(self, query: str) -> str:
+        return build_search_url(query)
+
+    def parse(self, content: bytes, url: str):
+        return _iter_raw_items(BeautifulSoup(content, "html.parser"), url)
+
+    def next_page_url(self, content: bytes, url: str) -> Optional[str]:
+        return _find_next_page(BeautifulSoup(content, "html.parser"), url)
+
+    def extract_page(self, content: bytes, url: str):
+        # Treffer und Folgeseite aus demselben geparsten Dokument
+        soup = BeautifulSoup(content, "html.parser")
+        items = [item for item in map(self.normalize, _iter_raw_items(soup, url)) if item is not None]
+        return items, _find_next_page(soup, url)
+
+    def normalize(self, raw: dict) -> Optional[dict]:
+        price = _extract_price_float(raw["price_raw"])
+        if price is None:
+            return None
+        brand, product_name = split_after_last_caps(raw["title"])
+        return {
+            "supermarket_name": self.supermarket_name,
+            "name": product_name,
+            "price": price,
+            "brand": brand,
+            "product_url": raw["product_url"],
+            "is_live": True,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        }
+
+
+_scraper = AldiSuedScraper()
+
+
+def parse_aldi_results(content: bytes, url: str, top_n: Optional[int] = None) -> list[dict]:
+    """
+    Extrahiert Produkte aus dem HTML einer Aldi-Süd-Suchergebnisseite.
+
+    Die Funktion ist bewusst frei von Netzwerkzugriffen und arbeitet auf den rohen Bytes,
+    damit sie auch in einem separaten Prozess (ProcessPoolExecutor) laufen kann.
+
+    Args:
+        content: Roher HTML-Inhalt der Seite.
+        url: URL der Seite (Fallback-Link, Basis für relative Links).
+        top_n: Maximale Anzahl Treffer (None = alle).
+
+    Returns:
+        Liste von Produkt-Dictionaries (wie scrape_aldi_sued_top).
+    """
+    return _scraper.extract(content, url, top_n)
+
+
+def iter_aldi_sued(query: str, max_pages: int = DEFAULT_MAX_PAGES, insecure: bool = False,
+                   ca_file: Optional[str] = None, session=None) -> Iterator[dict]:
+    """
+    Lazy über alle Aldi-Süd-Treffer eines Suchbegriffs iterieren.
+
+    Folgeseiten (rel="next") werden erst geladen, wenn der Aufrufer weiter iteriert; wer
+    nur drei Treffer braucht, bezahlt eine Seite. Bulk-Jobs können so beliebig viele Treffer
+    verarbeiten, ohne sie gesammelt im Speicher zu halten.
+
+    Args:
+        query: Suchbegriff
+        max_pages: Maximale Anzahl abgerufener Seiten
+        insecure: SSL-Verifizierung deaktivieren
+        ca_file: Pfad zu CA-Zertifikat
+        session: Wiederverwendbare Session (überschreibt insecure/ca_file)
+
+    Yields:
+        Produkt-Dictionaries wie scrape_aldi_sued_top, ohne Duplikate.
+
+    Raises:
+        requests.exceptions.RequestException: Abruf einer Seite fehlgeschlagen oder gedrosselt.
+    """
+    session = session or make_session(insecure=insecure, ca_file=ca_file, retries=WEB_RETRIES)
+    yield from _scraper.iter_search(query, session=session, max_pages=max_pages)
+
+
 def scrape_aldi_sued_top(query: str, top_n: int = 3,
                          insecure: bool = False, ca_file: Optional[str] = None) -> list[dict]:
     """
@@ -157,53 +209,9 @@ def scrape_aldi_sued_top(query: str, top_n: int = 3,
     Returns:
         Liste von Produkt-Dictionaries (Supermarketname, Produktname, Preis, URL, is_live Wahrheitswert und Timestamp)
     """
-    base_url = "https://www.aldi-sued.de/de/suchergebnis.html"
-    session = make_session(insecure=insecure, ca_file=ca_file)
-
-    url = f"{base_url}?{urlencode({'search': query})}"
-    
     try:
-        resp = session.get(url, timeout=12)
-        resp.raise_for_status()
+        # Rate-Limit + Circuit-Breaker: bei Überlast sofort leere Liste statt Retry-Schlaf
+        return list(islice(iter_aldi_sued(query, insecure=insecure, ca_file=ca_file), top_n))
     except requests.exceptions.RequestException as e:
         print(f"Fehler beim Abrufen: {e}")
         return []
-
-    soup = BeautifulSoup(resp.content, "html.parser")
-    cards = _candidate_cards(soup)
-
-    results = []
-    for card in cards:
-        title_el = _find_title(card) or _find_title(soup)
-        price_el = _find_price(card) or _find_price(soup)
-        
-        if not (title_el and price_el):
-            continue
-
-        title = title_el.get_text(" ", strip=True)
-        brand, product_name = split_after_last_caps(title)
-        price_raw = price_el.get_text(" ", strip=True) if hasattr(price_el, "get_text") else str(price_el)
-        price = _extract_price_float(price_raw)
-        
-        if price is None:
-            continue
-
-        product_url = _find_link(card, base_url) or url
-        
-
-        results.append(
-            {
-                "supermarket_name": "Aldi Süd",
-                "name": product_name,
-                "price": price,
-                "brand": brand,
-                "product_url": product_url,
-                "is_live": True,
-                "timestamp": datetime.now().isoformat(timespec="seconds"),
-            }
-        )
-        
-        if len(results) >= top_n:
-            break
-
-    return results
\ No newline at end of file
@@ -0,0 +1,206 @@
+# --- bulk_crawl.py ---
+"""
+Label: Bulk-Crawl mit getrennten Fetch- und Parse-Stufen
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Das Parsen mit BeautifulSoup ist CPU-lastig und hält den GIL; mehrere Crawl-Threads
+    skalieren deshalb nicht über einen Kern hinaus. Dieser Modus trennt die Arbeit in zwei
+    Stufen:
+        - Fetch: I/O-gebundene Threads laden die rohen Seiten (ThreadPoolExecutor),
+        - Parse: ein ProcessPoolExecutor führt parse_aldi_results() auf den Bytes aus.
+    Zwischen beiden Stufen begrenzt max_pending die Anzahl gleichzeitig geladener, aber noch
+    nicht geparster Seiten (Backpressure). Für jede Stufe werden Durchsatz und Auslastung
+    gemessen.
+
+    Aufruf:
+        python -m scrapers.bulk_crawl Milch Butter Kaffee --fetch-workers 8 --parse-workers 4
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+
+from scrapers.aldi_crawler import AldiSuedScraper, build_search_url, parse_aldi_results
+from scrapers.session import archive_page, make_session
+from scrapers.throttle import guarded_get
+
+
+@dataclass
+class StageStats:
+    """Kennzahlen einer Pipeline-Stufe."""
+
+    name: str
+    workers: int
+    items: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+
+    def as_dict(self, wall_seconds: float) -> dict:
+        """Liefert die Kennzahlen inkl. Durchsatz (Seiten/s) und Auslastung der Worker."""
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "items": self.items,
+            "errors": self.errors,
+            "busy_s": round(self.busy_seconds, 3),
+            "throughput_per_s": round(self.items / wall_seconds, 2) if wall_seconds else 0.0,
+            "avg_ms": round(self.busy_seconds * 1000 / self.items, 2) if self.items else 0.0,
+            "utilization": (
+                round(self.busy_seconds / (wall_seconds * self.workers), 3) if wall_seconds else 0.0
+            ),
+        }
+
+
+_local = threading.local()
+
+
+def _fetch(query: str, timeout: float, insecure: bool, ca_file: Optional[str],
+           archive: Optional[str] = None):
+    """Lädt die Suchergebnisseite (eine Session pro Fetch-Thread, Keep-Alive bleibt erhalten)."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = make_session(insecure=insecure, ca_file=ca_file)
+    url = build_search_url(query)
+    started = time.perf_counter()
+    # Bulk-Crawls teilen sich das Rate-Limit mit der Web-App und warten auf freie Tokens
+    resp = guarded_get(session, url, timeout=timeout)
+    resp.raise_for_status()
+    archive_page(AldiSuedScraper.name, query, url, resp, archive)
+    return url, resp.content, time.perf_counter() - started
+
+
+def _parse(url: str, content: bytes, top_n: Optional[int]):
+    """Läuft im Parse-Prozess: HTML → Produkt-Dictionaries, inkl. gemessener CPU-Zeit."""
+    started = time.perf_counter()
+    items = parse_aldi_results(content, url, top_n)
+    return items, time.perf_counter() - started
+
+
+def crawl_many(queries, fetch_workers: int = 8, parse_workers: Optional[int] = None,
+               max_pending: Optional[int] = None, top_n: Optional[int] = None,
+               timeout: float = 12, insecure: bool = False, ca_file: Optional[str] = None,
+               archive: Optional[str] = None):
+    """
+    Crawlt viele Suchbegriffe mit getrennten Fetch-/Parse-Stufen.
+
+    Args:
+        queries: Iterable von Suchbegriffen.
+        fetch_workers: Anzahl I/O-Threads.
+        parse_workers: Anzahl Parse-Prozesse (Standard: Anzahl CPU-Kerne).
+        max_pending: Maximal gleichzeitig geladene, noch nicht geparste Seiten
+            (Standard: 2 * parse_workers). Weitere Fetches starten erst, wenn Platz frei wird.
+        top_n: Maximale Treffer pro Seite (None = alle).
+        timeout: HTTP-Timeout pro Request in Sekunden.
+        insecure: SSL-Verifizierung deaktivieren.
+        ca_file: Pfad zu CA-Zertifikat.
+        archive: Verzeichnis des Snapshot-Archivs (Standard: ALDI_SNAPSHOT_DIR, sonst keins).
+
+    Returns:
+        Tupel (results, stats): results ist ein Dict Suchbegriff → Produktliste,
+        stats enthält Wall-Time und Kennzahlen je Stufe.
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * parse_workers
+    fetch_stats = StageStats("fetch", fetch_workers)
+    parse_stats = StageStats("parse", parse_workers)
+
+    results = {}
+    pending = {}
+    queue_iter = iter(queries)
+    exhausted = False
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(fetch_workers, thread_name_prefix="fetch") as fetch_pool, \
+            ProcessPoolExecutor(parse_workers) as parse_pool:
+        while True:
+            # Backpressure: nur neue Fetches starten, solange weniger als max_pending Seiten
+            # unterwegs sind (geladen oder im Parser)
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    query = next(queue_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = fetch_pool.submit(_fetch, query, timeout, insecure, ca_file, archive)
+                pending[future] = ("fetch", query)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, query = pending.pop(future)
+                if stage == "fetch":
+                    try:
+                        url, content, seconds = future.result()
+                    except requests.exceptions.RequestException as exc:
+                        print(f"Fehler beim Abrufen ({query}): {exc}")
+                        fetch_stats.errors += 1
+                        results[query] = []
+                        continue
+                    fetch_stats.items += 1
+                    fetch_stats.busy_seconds += seconds
+                    pending[parse_pool.submit(_parse, url, content, top_n)] = ("parse", query)
+                else:
+                    try:
+                        items, seconds = future.result()
+                    except Exception as exc:
+                        print(f"Fehler beim Parsen ({query}): {exc}")
+                        parse_stats.errors += 1
+                        results[query] = []
+                        continue
+                    parse_stats.items += 1
+                    parse_stats.busy_seconds += seconds
+                    results[query] = items
+
+    wall = time.perf_counter() - started
+    stats = {
+        "wall_s": round(wall, 3),
+        "stages": [fetch_stats.as_dict(wall), parse_stats.as_dict(wall)],
+    }
+    return results, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-Crawl (Fetch-Threads + Parse-Prozesse)")
+    parser.add_argument("queries", nargs="+", help="Suchbegriffe")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument("--top-n", type=int, default=None)
+    parser.add_argument("--insecure", action="store_true")
+    parser.add_argument("--archive", default=None, help="Seiten im Snapshot-Archiv ablegen")
+    args = parser.parse_args()
+
+    results, stats = crawl_many(
+        args.queries,
+        fetch_workers=args.fetch_workers,
+        parse_workers=args.parse_workers,
+        max_pending=args.max_pending,
+        top_n=args.top_n,
+        insecure=args.insecure,
+        archive=args.archive,
+    )
+    for query, items in results.items():
+        print(f"{query}: {len(items)} Treffer")
+    print(f"\nGesamtdauer: {stats['wall_s']} s")
+    for stage in stats["stages"]:
+        print(
+            f"{stage['stage']:<6} workers={stage['workers']:<3} items={stage['items']:<5} "
+            f"errors={stage['errors']:<3} {stage['throughput_per_s']:>8} /s  "
+            f"avg={stage['avg_ms']} ms  util={stage['utilization']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
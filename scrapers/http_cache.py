@@ -0,0 +1,196 @@
+# --- http_cache.py ---
+"""
+Label: HTTP-Cache mit bedingten Requests für den Crawler
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Stellt einen Transport-Adapter für requests bereit, der GET-Antworten komprimiert
+    (gzip) auf der Festplatte ablegt. Bei einem erneuten Abruf gilt:
+        - noch frisch laut Cache-Control/Expires → Antwort direkt aus dem Cache (kein Request),
+        - sonst bedingter Request mit If-None-Match / If-Modified-Since; bei 304 wird der
+          gespeicherte Inhalt geliefert und nur die Metadaten aktualisiert,
+        - "no-store" wird nie gespeichert, "no-cache" wird immer revalidiert.
+    Wiederholte Crawls unveränderter Seiten kosten damit nur noch ein 304.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Diese Header beschreiben die Übertragung, nicht den (bereits dekodierten) Inhalt
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def _parse_cache_control(value: str) -> dict:
+    """Zerlegt einen Cache-Control-Header in ein Dict (Direktive → Wert oder True)."""
+    directives = {}
+    for part in (value or "").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        key, _, val = part.partition("=")
+        directives[key.strip()] = val.strip().strip('"') if val else True
+    return directives
+
+
+def _expires_at(headers, stored_at: float):
+    """Berechnet den Ablaufzeitpunkt (Unix-Zeit) aus Cache-Control bzw. Expires."""
+    cc = _parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-cache" in cc:
+        return stored_at
+    if "max-age" in cc:
+        try:
+            return stored_at + int(cc["max-age"])
+        except (TypeError, ValueError):
+            return stored_at
+    if headers.get("Expires"):
+        try:
+            return parsedate_to_datetime(headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return stored_at
+    # ohne Angaben: immer revalidieren (bedingter Request)
+    return stored_at
+
+
+class HTTPCache:
+    """
+    Dateibasierter Cache: pro URL eine Metadatei (JSON) und ein gzip-komprimierter Body.
+
+    Args:
+        directory: Zielverzeichnis (wird bei Bedarf angelegt).
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.gz"
+
+    def load(self, url: str):
+        """Liefert (meta, body) oder None, falls nichts (Lesbares) gespeichert ist."""
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = gzip.decompress(body_path.read_bytes())
+        except (OSError, ValueError, EOFError):
+            return None
+        return meta, body
+
+    def is_fresh(self, url: str) -> bool:
+        """True, wenn für url eine noch frische Antwort gespeichert ist (liest nur die Metadatei)."""
+        meta_path, _ = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        return time.time() < meta.get("expires_at", 0)
+
+    def _write_meta(self, meta_path: Path, meta: dict):
+        tmp = meta_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, meta_path)
+
+    def store(self, url: str, status: int, headers, body: bytes):
+        """Speichert eine Antwort, sofern sie laut Cache-Control gespeichert werden darf."""
+        if "no-store" in _parse_cache_control(headers.get("Cache-Control", "")):
+            return
+        meta_path, body_path = self._paths(url)
+        now = time.time()
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+            "stored_at": now,
+            "expires_at": _expires_at(headers, now),
+        }
+        tmp = body_path.with_suffix(".gz.tmp")
+        tmp.write_bytes(gzip.compress(body, compresslevel=6))
+        os.replace(tmp, body_path)
+        self._write_meta(meta_path, meta)
+
+    def refresh(self, url: str, meta: dict, headers):
+        """Aktualisiert Metadaten nach einem 304 (neue Frische, ggf. neues ETag)."""
+        meta_path, _ = self._paths(url)
+        merged = CaseInsensitiveDict(meta["headers"])
+        for name in ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date"):
+            if name in headers:
+                merged[name] = headers[name]
+        now = time.time()
+        meta["headers"] = dict(merged)
+        meta["stored_at"] = now
+        meta["expires_at"] = _expires_at(merged, now)
+        self._write_meta(meta_path, meta)
+        return meta
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter mit vorgeschaltetem HTTPCache für GET-Requests.
+
+    Aus dem Cache gelieferte Antworten tragen das Attribut from_cache = True
+    (revalidated = True, falls zuvor ein 304 empfangen wurde).
+
+    Args:
+        cache: HTTPCache-Instanz.
+        **kwargs: Weitere Argumente für HTTPAdapter (z. B. max_retries).
+    """
+
+    def __init__(self, cache: HTTPCache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def _cached_response(self, request, meta, body, revalidated: bool):
+        resp = Response()
+        resp.status_code = meta.get("status", 200)
+        resp.reason = "OK"
+        resp.headers = CaseInsensitiveDict(meta["headers"])
+        resp._content = body
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        resp.from_cache = True
+        resp.revalidated = revalidated
+        return resp
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        entry = self.cache.load(request.url)
+        if entry is not None:
+            meta, body = entry
+            if time.time() < meta.get("expires_at", 0):
+                return self._cached_response(request, meta, body, revalidated=False)
+            headers = CaseInsensitiveDict(meta["headers"])
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+
+        resp = super().send(request, **kwargs)
+
+        if resp.status_code == 304 and entry is not None:
+            meta = self.cache.refresh(request.url, entry[0], resp.headers)
+            resp.close()
+            return self._cached_response(request, meta, entry[1], revalidated=True)
+
+        if resp.status_code == 200:
+            self.cache.store(request.url, resp.status_code, resp.headers, resp.content)
+        resp.from_cache = False
+        resp.revalidated = False
+        return resp
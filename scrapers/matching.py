@@ -0,0 +1,227 @@
+# --- matching.py ---
+"""
+Label: Entity-Resolution für Crawler-Treffer
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Ordnet live gecrawlte Artikel (z. B. von Aldi Süd) bestehenden Einträgen der Tabelle
+    'products' zu. Damit erscheinen Produkte in der Suche nicht doppelt und Live-Treffer
+    können auf die Merkliste gesetzt werden.
+
+    Statt jeden Artikel mit jedem Produkt zu vergleichen, nutzt der Abgleich einen
+    Blocking-Index (Token/Marke → Produkt-IDs): Verglichen werden nur Produkte, die mindestens
+    ein seltenes Token mit dem Artikel teilen. Gefundene Zuordnungen werden in der Tabelle
+    'crawled_product_links' gespeichert und bei späteren Crawls direkt wiederverwendet.
+"""
+
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from database.catalog import get_catalog
+from database.my_helpers import get_connection
+from database.trigram_index import trigrams
+from database.writer import get_writer
+
+# Mindestscore für eine Zuordnung (0–1)
+MIN_MATCH_SCORE = 0.5
+
+# Tokens, die in mehr Produkten vorkommen, gelten als zu unspezifisch für das Blocking
+MAX_BLOCK_SIZE = 200
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def tokenize(text: str) -> set:
+    """
+    Zerlegt Text in normalisierte Tokens (klein geschrieben, ohne Satzzeichen).
+
+    Tokens mit weniger als drei Zeichen sowie reine Zahlen werden ignoriert, weil sie
+    (Mengenangaben wie "3", "500") kaum zur Unterscheidung beitragen.
+
+    Args:
+        text: Produktname oder Marke.
+
+    Returns:
+        Menge der Tokens.
+    """
+    return {
+        t for t in _TOKEN_RE.findall((text or "").casefold())
+        if len(t) >= 3 and not t.isdigit()
+    }
+
+
+class BlockingIndex:
+    """
+    Blocking-Index über die Katalogprodukte.
+
+    Hält je Produkt die Tokens und Trigramme des Namens sowie die Marken-Tokens und verweist
+    von jedem Token auf die Produkte, die es enthalten.
+    """
+
+    def __init__(self):
+        self._blocks = {}
+        self._features = {}
+        self.version = None
+        self._lock = threading.Lock()
+
+    def sync(self, catalog):
+        """Baut den Index neu auf, falls sich die Katalogversion geändert hat."""
+        if catalog.version is not None and catalog.version == self.version:
+            return
+        blocks = defaultdict(set)
+        features = {}
+        for product in catalog.products:
+            name_tokens = tokenize(product["name"])
+            brand_tokens = tokenize(product["brand"])
+            features[product["id"]] = (name_tokens, brand_tokens, trigrams(product["name"] or ""))
+            for token in name_tokens | brand_tokens:
+                blocks[token].add(product["id"])
+        with self._lock:
+            self._blocks = dict(blocks)
+            self._features = features
+            self.version = catalog.version
+
+    def candidates(self, tokens: set) -> set:
+        """Liefert alle Produkte, die mindestens ein ausreichend seltenes Token teilen."""
+        with self._lock:
+            blocks = self._blocks
+        result = set()
+        for token in tokens:
+            block = blocks.get(token)
+            if block and len(block) <= MAX_BLOCK_SIZE:
+                result |= block
+        return result
+
+    def best_match(self, name: str, brand: str):
+        """
+        Sucht das ähnlichste Produkt für einen gecrawlten Artikel.
+
+        Der Score kombiniert Token-Jaccard und Trigramm-Dice des Namens (je zur Hälfte)
+        und gibt einen Bonus, wenn die Marke übereinstimmt.
+
+        Args:
+            name: Produktname des Artikels.
+            brand: Marke des Artikels (darf leer sein).
+
+        Returns:
+            Tupel (product_id, score) oder None, falls kein Produkt MIN_MATCH_SCORE erreicht.
+        """
+        name_tokens = tokenize(name)
+        brand_tokens = tokenize(brand)
+        name_grams = trigrams(name or "")
+        if not name_tokens and not name_grams:
+            return None
+
+        with self._lock:
+            features = self._features
+
+        best = None
+        for product_id in self.candidates(name_tokens | brand_tokens):
+            p_tokens, p_brand, p_grams = features[product_id]
+            union = name_tokens | p_tokens
+            jaccard = len(name_tokens & p_tokens) / len(union) if union else 0.0
+            dice = (
+                2.0 * len(name_grams & p_grams) / (len(name_grams) + len(p_grams))
+                if name_grams and p_grams else 0.0
+            )
+            score = 0.5 * jaccard + 0.5 * dice
+            if brand_tokens and p_brand and brand_tokens & p_brand:
+                score += 0.15
+            score = min(score, 1.0)
+            if score >= MIN_MATCH_SCORE and (best is None or score > best[1]):
+                best = (product_id, score)
+        return best
+
+
+_index = BlockingIndex()
+
+
+def external_key(item: dict) -> str:
+    """Stabiler Schlüssel eines gecrawlten Artikels (Produkt-URL, sonst Marke + Name)."""
+    if item.get("product_url"):
+        return item["product_url"]
+    return " ".join(sorted(tokenize(f"{item.get('brand', '')} {item.get('name', '')}")))
+
+
+def _save_links(conn, rows):
+    conn.executemany(
+        """
+        INSERT INTO crawled_product_links (source, external_key, product_id, score, matched_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(source, external_key) DO UPDATE SET
+            product_id = excluded.product_id,
+            score = excluded.score,
+            matched_at = excluded.matched_at
+        """,
+        rows,
+    )
+
+
+def resolve_items(items: list[dict], persist: bool = True) -> list[dict]:
+    """
+    Verknüpft gecrawlte Artikel mit Katalogprodukten.
+
+    Bereits bekannte Zuordnungen werden in einer einzigen Abfrage aus
+    'crawled_product_links' gelesen. Nur für unbekannte Artikel wird der Blocking-Index
+    befragt; neue Zuordnungen werden über die Single-Writer-Queue gespeichert (asynchron:
+    wer vor dem Beenden sicher sein muss, dass sie committet sind, ruft get_writer().flush()).
+
+    Bei einer Zuordnung erhält der Artikel die Felder product_id und (falls leer) category
+    des Katalogprodukts.
+
+    Args:
+        items: Artikel-Dictionaries des Crawlers (supermarket_name, name, brand, product_url, ...).
+        persist: Neue Zuordnungen speichern; False ordnet nur zu (z. B. Replay mit --dry-run).
+
+    Returns:
+        Dieselbe Liste (Artikel werden in-place ergänzt).
+    """
+    if not items:
+        return items
+
+    catalog = get_catalog()
+    keys = [(item.get("supermarket_name", ""), external_key(item)) for item in items]
+
+    conn = get_connection()
+    try:
+        known = {}
+        for source in {source for source, _ in keys}:
+            source_keys = [key for s, key in keys if s == source]
+            placeholders = ",".join("?" * len(source_keys))
+            for row in conn.execute(
+                f"""
+                SELECT external_key, product_id
+                FROM crawled_product_links
+                WHERE source = ? AND external_key IN ({placeholders})
+                """,
+                (source, *source_keys),
+            ):
+                known[(source, row["external_key"])] = row["product_id"]
+    finally:
+        conn.close()
+
+    _index.sync(catalog)
+    new_links = []
+    now = datetime.now().isoformat()
+    for item, key in zip(items, keys):
+        product_id = known.get(key)
+        if product_id is None or product_id not in catalog.products_by_id:
+            match = _index.best_match(item.get("name", ""), item.get("brand", ""))
+            if match is None:
+                continue
+            product_id, score = match
+            new_links.append((key[0], key[1], product_id, score, now))
+
+        product = catalog.products_by_id[product_id]
+        item["product_id"] = product_id
+        if not item.get("category"):
+            item["category"] = product["category"]
+
+    if new_links and persist:
+        get_writer().submit(_save_links, new_links)
+    return items
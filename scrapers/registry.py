@@ -0,0 +1,332 @@
+# --- registry.py ---
+"""
+Label: Scraper-Schnittstelle, Registry und paralleler Fan-out
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Jeder Supermarkt ist ein Plugin: eine Unterklasse von Scraper, die mit @register
+    angemeldet wird und drei Schritte implementiert:
+        - search_url(): URL der Suchergebnisseite,
+        - parse(): rohe Treffer aus dem HTML,
+        - normalize(): roher Treffer → einheitliches Produkt-Dictionary
+          (supermarket_name, name, brand, price, product_url, is_live, timestamp).
+    Abruf (fetch) mit Rate-Limit, Circuit-Breaker und Archivierung ist gemeinsam.
+    Unterstützt ein Markt Paginierung, liefert next_page_url() die Folgeseite; iter_search()
+    lädt Seiten erst, wenn der Aufrufer weitere Treffer anfordert.
+
+    fan_out() befragt alle registrierten Scraper gleichzeitig (ThreadPoolExecutor) und
+    liefert nach spätestens `deadline` Sekunden alles, was bis dahin angekommen ist.
+    fan_out_async() macht dasselbe für asyncio: der Aufrufer wartet, ohne einen Thread zu
+    belegen (siehe asgi.py).
+
+    Plugin-Module werden beim ersten Bedarf importiert: SCRAPER_MODULES sowie zusätzliche
+    Module aus GROCERY_SCRAPERS (kommagetrennt).
+"""
+
+import asyncio
+import hashlib
+import importlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+import requests
+
+from scrapers.session import WEB_MAX_WAIT, WEB_RETRIES, archive_page, make_session
+from scrapers.throttle import guarded_get
+
+# Eingebaute Plugins
+SCRAPER_MODULES = ("scrapers.aldi_crawler",)
+
+# Gesamtbudget (s) für den Fan-out einer Suche
+DEFAULT_DEADLINE = float(os.getenv("GROCERY_SCRAPE_DEADLINE", "4.0"))
+
+# Obergrenze für die Anzahl abgerufener Ergebnisseiten je Suche
+DEFAULT_MAX_PAGES = 10
+
+
+class Scraper:
+    """
+    Basisklasse eines Supermarkt-Scrapers.
+
+    Attribute:
+        name: Eindeutiger Schlüssel in der Registry.
+        supermarket_name: Name des Markts wie in der Tabelle 'supermarkets'.
+        host: Schlüssel für Rate-Limit und Circuit-Breaker.
+        timeout: HTTP-Timeout in Sekunden.
+    """
+
+    name = ""
+    supermarket_name = ""
+    host = ""
+    timeout = 12.0
+
+    def search_url(self, query: str) -> str:
+        """URL der Suchergebnisseite für einen Suchbegriff."""
+        raise NotImplementedError
+
+    def parse(self, content: bytes, url: str) -> Iterable[dict]:
+        """Rohe Treffer aus dem HTML (beliebige Felder, werden von normalize() übersetzt)."""
+        raise NotImplementedError
+
+    def normalize(self, raw: dict) -> Optional[dict]:
+        """Übersetzt einen rohen Treffer ins gemeinsame Format; None verwirft ihn."""
+        raise NotImplementedError
+
+    def fetch(self, session, url: str, max_wait: Optional[float] = WEB_MAX_WAIT):
+        """Lädt eine Seite unter Rate-Limit und Circuit-Breaker des Hosts."""
+        resp = guarded_get(session, url, timeout=self.timeout, max_wait=max_wait,
+                           host=self.host or self.name)
+        resp.raise_for_status()
+        return resp
+
+    def next_page_url(self, content: bytes, url: str) -> Optional[str]:
+        """URL der nächsten Ergebnisseite (None = letzte Seite). Standard: keine Paginierung."""
+        return None
+
+    def extract(self, content: bytes, url: str, top_n: Optional[int] = None) -> list[dict]:
+        """parse() + normalize() über eine Seite, abgebrochen nach top_n Treffern."""
+        results = []
+        for raw in self.parse(content, url):
+            item = self.normalize(raw)
+            if item is None:
+                continue
+            results.append(item)
+            if top_n is not None and len(results) >= top_n:
+                break
+        return results
+
+    def extract_page(self, content: bytes, url: str) -> tuple[list[dict], Optional[str]]:
+        """Alle normalisierten Treffer einer Seite und die URL der Folgeseite."""
+        return self.extract(content, url), self.next_page_url(content, url)
+
+    def iter_search(self, query: str, session=None, max_pages: int = DEFAULT_MAX_PAGES,
+                    max_wait: Optional[float] = WEB_MAX_WAIT) -> Iterator[dict]:
+        """
+        Generator über alle Treffer einer Suche, Seite für Seite.
+
+        Die nächste Seite wird erst geladen, wenn der Aufrufer über die Treffer der aktuellen
+        Seite hinaus iteriert; bricht er ab, entstehen keine weiteren Requests. Treffer, die
+        auf mehreren Seiten auftauchen, werden nur einmal geliefert.
+
+        Args:
+            query: Suchbegriff.
+            session: Wiederverwendbare Session (Standard: neue Session mit WEB_RETRIES).
+            max_pages: Maximale Anzahl abgerufener Seiten.
+            max_wait: Maximale Wartezeit je Seite auf ein Token des Rate-Limits.
+
+        Yields:
+            Normalisierte Produkt-Dictionaries.
+
+        Raises:
+            requests.exceptions.RequestException: Abruf einer Seite fehlgeschlagen oder gedrosselt.
+        """
+        session = session or make_session(retries=WEB_RETRIES)
+        url = self.search_url(query)
+        seen_pages = set()
+        seen_items = set()
+        while url and url not in seen_pages and len(seen_pages) < max_pages:
+            seen_pages.add(url)
+            resp = self.fetch(session, url, max_wait)
+            archive_page(self.name, query, url, resp)
+            items, next_url = _extract_page_cached(self, resp, url)
+            for item in items:
+                key = (item.get("product_url"), item.get("brand"), item.get("name"))
+                if key in seen_items:
+                    continue
+                seen_items.add(key)
+                yield item
+            url = next_url
+
+    def search(self, query: str, top_n: Optional[int] = 3, session=None,
+               max_wait: Optional[float] = WEB_MAX_WAIT) -> list[dict]:
+        """
+        Sucht beim Markt und liefert normalisierte Treffer.
+
+        Args:
+            query: Suchbegriff.
+            top_n: Maximale Anzahl Treffer; weitere Seiten werden nur bei Bedarf geladen
+                (None = alle Treffer der ersten Seite).
+            session: Wiederverwendbare Session (Standard: neue Session mit WEB_RETRIES).
+            max_wait: Maximale Wartezeit auf ein Token des Rate-Limits.
+
+        Returns:
+            Liste von Produkt-Dictionaries.
+
+        Raises:
+            requests.exceptions.RequestException: Abruf fehlgeschlagen oder gedrosselt.
+        """
+        pages = 1 if top_n is None else DEFAULT_MAX_PAGES
+        return list(islice(self.iter_search(query, session, pages, max_wait), top_n))
+
+
+# Geparste Seiten je (Scraper, URL, Inhalt): ein 304 bzw. Cache-Treffer spart so auch das Parsen
+_PARSED_MAX = 128
+_parsed = OrderedDict()
+_parsed_lock = threading.Lock()
+
+
+def _extract_page_cached(scraper: Scraper, resp, url: str) -> tuple[list[dict], Optional[str]]:
+    """Parst die Seite oder liefert das Ergebnis eines früheren Parse-Laufs für denselben Inhalt."""
+    key = (scraper.name, url, hashlib.blake2b(resp.content, digest_size=16).digest())
+    with _parsed_lock:
+        page = _parsed.get(key)
+        if page is not None:
+            _parsed.move_to_end(key)
+    if page is None:
+        page = scraper.extract_page(resp.content, url)
+        with _parsed_lock:
+            _parsed[key] = page
+            while len(_parsed) > _PARSED_MAX:
+                _parsed.popitem(last=False)
+
+    items, next_url = page
+    now = datetime.now().isoformat(timespec="seconds")
+    return [{**item, "timestamp": now} for item in items], next_url
+
+
+_registry = {}
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def register(cls):
+    """Klassen-Decorator: meldet einen Scraper unter cls.name an."""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} hat keinen Namen (Attribut 'name').")
+    _registry[cls.name] = cls()
+    return cls
+
+
+def get_scrapers() -> dict:
+    """Lädt die Plugin-Module (einmalig) und liefert alle Scraper (Name → Instanz)."""
+    global _loaded
+    if not _loaded:
+        with _load_lock:
+            if not _loaded:
+                extra = [m.strip() for m in os.getenv("GROCERY_SCRAPERS", "").split(",") if m.strip()]
+                for module in (*SCRAPER_MODULES, *extra):
+                    importlib.import_module(module)
+                _loaded = True
+    return dict(_registry)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    int(os.getenv("GROCERY_SCRAPER_THREADS", "8")), thread_name_prefix="scrape"
+                )
+    return _pool
+
+
+def _reset_pool():
+    """Nach fork() gehören die Threads des Pools dem Elternprozess: neu anlegen lassen."""
+    global _pool
+    _pool = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool)
+
+
+def fan_out(query: str, top_n: Optional[int] = 3, deadline: Optional[float] = None,
+            scrapers: Optional[Iterable[str]] = None) -> list[dict]:
+    """
+    Befragt alle (bzw. die angegebenen) Scraper parallel.
+
+    Scraper, die bis zur Deadline nicht fertig sind, werden ignoriert (ihr Thread läuft im
+    Hintergrund zu Ende, das Ergebnis wird verworfen). Fehler einzelner Scraper führen nur
+    dazu, dass deren Treffer fehlen.
+
+    Args:
+        query: Suchbegriff.
+        top_n: Maximale Treffer je Markt.
+        deadline: Gesamtbudget in Sekunden (Standard: GROCERY_SCRAPE_DEADLINE bzw. 4 s).
+        scrapers: Namen der zu befragenden Scraper (None = alle).
+
+    Returns:
+        Zusammengeführte Trefferliste in Registrierungsreihenfolge der Scraper.
+    """
+    budget = DEFAULT_DEADLINE if deadline is None else deadline
+    futures = _submit(query, top_n, budget, scrapers)
+    if not futures:
+        return []
+    done, _ = wait(futures, timeout=budget)
+    return _collect(futures, done, budget)
+
+
+async def fan_out_async(query: str, top_n: Optional[int] = 3, deadline: Optional[float] = None,
+                        scrapers: Optional[Iterable[str]] = None) -> list[dict]:
+    """
+    Wie fan_out(), aber als Coroutine.
+
+    Die Abrufe laufen weiterhin im Scraper-Pool (requests ist synchron); gewartet wird über
+    asyncio, sodass eine Event-Loop viele Suchen gleichzeitig offen halten kann. Jeder Abruf
+    belegt aber weiter einen Pool-Thread: Wie viele Märkte gleichzeitig abgefragt werden,
+    begrenzt GROCERY_SCRAPER_THREADS. Ist der Pool ausgelastet, läuft die Deadline bereits in
+    der Warteschlange ab und die Suche liefert keine Live-Treffer.
+
+    Args:
+        query: Suchbegriff.
+        top_n: Maximale Treffer je Markt.
+        deadline: Gesamtbudget in Sekunden (Standard: GROCERY_SCRAPE_DEADLINE bzw. 4 s).
+        scrapers: Namen der zu befragenden Scraper (None = alle).
+
+    Returns:
+        Zusammengeführte Trefferliste in Registrierungsreihenfolge der Scraper.
+    """
+    budget = DEFAULT_DEADLINE if deadline is None else deadline
+    futures = _submit(query, top_n, budget, scrapers)
+    if not futures:
+        return []
+    wrapped = {asyncio.wrap_future(future): future for future in futures}
+    done, _ = await asyncio.wait(wrapped, timeout=budget)
+    return _collect(futures, {wrapped[future] for future in done}, budget)
+
+
+def _submit(query: str, top_n: Optional[int], budget: float,
+            scrapers: Optional[Iterable[str]]) -> dict:
+    """Reiht die Suche je Scraper im Pool ein (Future → Scraper)."""
+    registry = get_scrapers()
+    selected = [registry[name] for name in (scrapers or registry) if name in registry]
+    pool = _get_pool()
+    # Auf ein Token wird höchstens so lange gewartet, wie das Budget erlaubt
+    return {
+        pool.submit(scraper.search, query, top_n, None, min(WEB_MAX_WAIT, budget)): scraper
+        for scraper in selected
+    }
+
+
+def _collect(futures: dict, done: set, budget: float) -> list[dict]:
+    """Sammelt die Treffer der fertigen Futures; verspätete werden abgebrochen bzw. verworfen."""
+    for future in futures:
+        if future in done:
+            continue
+        future.cancel()
+        print(f"{futures[future].supermarket_name}: keine Antwort innerhalb von {budget} s")
+
+    results = []
+    for future, scraper in futures.items():
+        if future not in done:
+            continue
+        try:
+            results.extend(future.result())
+        except requests.exceptions.RequestException as exc:
+            print(f"Fehler beim Abrufen ({scraper.supermarket_name}): {exc}")
+        except Exception as exc:
+            print(f"Fehler im Scraper {scraper.name}: {exc}")
+    return results
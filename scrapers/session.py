@@ -0,0 +1,147 @@
+# --- session.py ---
+"""
+Label: HTTP-Session und Seitenablage für alle Scraper
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Gemeinsame HTTP-Grundlage der Supermarkt-Scraper: konfigurierte requests.Session
+    (Browser-Header, Retry, HTTP-Cache, TLS-Optionen), die Retry-Strategie für Crawls aus
+    Web-Requests sowie die Ablage geladener Seiten im Snapshot-Archiv.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scrapers.http_cache import CachingHTTPAdapter, HTTPCache
+from scrapers.snapshot_store import get_snapshot_store
+
+_truststore_injected = False
+
+# Standardverzeichnis des HTTP-Caches; per ALDI_HTTP_CACHE_DIR änderbar ("off" = deaktiviert)
+DEFAULT_HTTP_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "http"
+
+
+def _inject_truststore():
+    """
+    Versucht einmalig, truststore (System-Zertifikatsspeicher) in das ssl-Modul einzuhängen.
+
+    Wird erst beim Erzeugen der ersten Session aufgerufen statt beim Import des Moduls,
+    damit App-Start und CLI-Skripte die TLS-Initialisierung nicht bezahlen müssen.
+    """
+    global _truststore_injected
+    if _truststore_injected:
+        return
+    _truststore_injected = True
+    # Versuche truststore zu laden (optional)
+    try:
+        import truststore
+        truststore.inject_into_ssl()
+    except Exception:
+        pass
+
+
+# Retry-Strategie für Crawls aus einem Web-Request: höchstens ein neuer Verbindungsversuch,
+# keine Backoff-Pausen und keine Wiederholung bei 429/5xx (das übernimmt der Circuit-Breaker)
+WEB_RETRIES = Retry(total=1, connect=1, read=0, backoff_factor=0,
+                    respect_retry_after_header=False, raise_on_status=False,
+                    allowed_methods=["HEAD", "GET", "OPTIONS"])
+
+# Maximale Wartezeit (s) auf ein Token des Rate-Limits im Web-Request
+WEB_MAX_WAIT = float(os.getenv("ALDI_WEB_MAX_WAIT", "1.0"))
+
+
+def make_session(insecure: bool = False, ca_file: Optional[str] = None,
+                 cache_dir: Optional[str] = None,
+                 retries: Optional[Retry] = None) -> requests.Session:
+    """
+    Erzeugt und konfiguriert eine `requests.Session` für wiederverwendbare HTTP-Requests.
+
+    Die Session enthält:
+    - Standard-HTTP-Header, die typische Browseranfragen simulieren
+    - Automatisches Wiederholen (Retry) bei bestimmten HTTP-Fehlern
+    - Optionales SSL-Verhalten
+    - Einen HTTP-Cache auf der Festplatte (ETag/Last-Modified, Cache-Control)
+
+    Args:
+        insecure (bool, optional): 
+            Wenn True, wird die SSL-Zertifikatsprüfung deaktiviert. 
+            Standard ist False.
+        ca_file (str, optional): 
+            Pfad zu einem CA-Bundle für HTTPS-Verbindungen. 
+            Fällt auf Umgebungsvariablen `REQUESTS_CA_BUNDLE` oder `ALDI_CA_FILE` zurück, falls None.
+        cache_dir (str, optional):
+            Verzeichnis des HTTP-Caches. Fällt auf `ALDI_HTTP_CACHE_DIR` bzw.
+            `.cache/http` zurück; "off" deaktiviert den Cache.
+        retries (Retry, optional):
+            Abweichende Retry-Strategie (z. B. WEB_RETRIES). Standard: 3 Versuche mit Backoff.
+
+    Returns:
+        requests.Session: Eine konfigurierte Session-Instanz, die für HTTP/HTTPS-Requests verwendet werden kann.
+
+    Beispiele:
+        >>> session = make_session()
+        >>> response = session.get("https://example.com")
+        >>> print(response.status_code)
+
+        >>> session = make_session(insecure=True)
+        >>> response = session.get("https://self-signed.example.com")
+    """
+    _inject_truststore()
+    s = requests.Session()
+    s.headers.update({
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/120.0 Safari/537.36"
+        ),
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "de-DE,de;q=0.9,en;q=0.8",
+        "Connection": "keep-alive",
+    })
+    retries = retries or Retry(
+        total=3, 
+        backoff_factor=0.6, 
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["HEAD", "GET", "OPTIONS"]
+    )
+    cache_dir = cache_dir or os.getenv("ALDI_HTTP_CACHE_DIR") or str(DEFAULT_HTTP_CACHE_DIR)
+    if cache_dir.lower() == "off":
+        adapter = HTTPAdapter(max_retries=retries)
+    else:
+        adapter = CachingHTTPAdapter(HTTPCache(cache_dir), max_retries=retries)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+
+    if insecure:
+        import urllib3
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        s.verify = False
+    else:
+        # ENV-Fallbacks erlauben start ohne UI
+        ca_env = ca_file or os.getenv("REQUESTS_CA_BUNDLE") or os.getenv("ALDI_CA_FILE")
+        if ca_env:
+            s.verify = ca_env
+    return s
+
+
+def archive_page(scraper: str, query: str, url: str, resp, root: Optional[str] = None):
+    """
+    Legt eine frisch geladene Seite im Snapshot-Archiv ab (falls konfiguriert).
+
+    Antworten aus dem HTTP-Cache werden übersprungen: ihr Inhalt wurde bereits beim
+    ursprünglichen Abruf archiviert. scraper ist der Registry-Name des Plugins, mit dessen
+    Parser der Replay die Seite später verarbeitet.
+    """
+    if getattr(resp, "from_cache", False):
+        return
+    store = get_snapshot_store(root)
+    if store is not None:
+        store.put(scraper, query, url, resp.content)
@@ -0,0 +1,339 @@
+# --- snapshot_store.py ---
+"""
+Label: Inhaltsadressiertes Archiv gecrawlter Seiten mit Replay
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Speichert jede geladene Ergebnisseite komprimiert unter ihrem SHA-256-Hash
+    (objects/ab/cdef….zst bzw. .gz). Identische Seiten belegen nur einmal Platz. Ein
+    SQLite-Index (index.db) hält fest, welche Seite von welchem Scraper (Registry-Name) zu
+    welchem Suchbegriff, welcher URL und welchem Zeitpunkt gehört.
+
+    Ändert sich die Parse-Logik, können die Preise ohne Netzwerk neu extrahiert werden:
+        python -m scrapers.snapshot_store replay [--query Milch] [--workers 4]
+    Der Replay parst die archivierten Seiten parallel (ProcessPoolExecutor) mit parse() und
+    normalize() des Scrapers, der sie geladen hat (scrapers/registry.py), ordnet die
+    Treffer Katalogprodukten zu (scrapers/matching.py) und aktualisiert die Preise in
+    'supermarket_products' (Upsert).
+
+    Aktiviert wird das Archiv über ALDI_SNAPSHOT_DIR bzw. die Option --archive von
+    scrapers.bulk_crawl. Ist das Paket zstandard installiert, wird zstd statt gzip genutzt.
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent.parent / ".cache" / "snapshots"
+
+# Ältere Archive enthalten nur Aldi-Seiten und haben noch keine Spalte 'scraper'
+LEGACY_SCRAPER = "aldi_sued"
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    scraper TEXT NOT NULL,
+    query TEXT NOT NULL,
+    url TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_query ON snapshots (query, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_fetched ON snapshots (fetched_at);
+"""
+
+
+def _compress(content: bytes):
+    if zstandard is not None:
+        return "zst", zstandard.ZstdCompressor(level=10).compress(content)
+    return "gz", gzip.compress(content, compresslevel=6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("Snapshot ist zstd-komprimiert, aber zstandard ist nicht installiert.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotStore:
+    """
+    Archiv aus Blob-Verzeichnis und SQLite-Index.
+
+    Args:
+        root: Wurzelverzeichnis des Archivs (wird bei Bedarf angelegt).
+    """
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_DIR):
+        self.root = Path(root)
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.db"
+        conn = self._connect()
+        try:
+            conn.executescript(_INDEX_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(snapshots)")}
+            if "scraper" not in columns:
+                conn.execute(
+                    f"ALTER TABLE snapshots ADD COLUMN scraper TEXT NOT NULL DEFAULT '{LEGACY_SCRAPER}'"
+                )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL;")
+        return conn
+
+    def blob_path(self, sha256: str, codec: str) -> Path:
+        """Pfad des Blobs zu einem Hash (zweistufig, damit Verzeichnisse klein bleiben)."""
+        return self.root / "objects" / sha256[:2] / f"{sha256[2:]}.{codec}"
+
+    def put(self, scraper: str, query: str, url: str, content: bytes,
+            fetched_at: Optional[str] = None) -> str:
+        """
+        Archiviert eine Seite und trägt sie in den Index ein.
+
+        Args:
+            scraper: Registry-Name des Scrapers, der die Seite geladen hat (parst sie im Replay).
+            query: Suchbegriff, zu dem die Seite geladen wurde.
+            url: URL der Seite.
+            content: Roher Inhalt.
+            fetched_at: Zeitpunkt des Abrufs (ISO-Format, Standard: jetzt).
+
+        Returns:
+            SHA-256-Hash des Inhalts.
+        """
+        sha256 = hashlib.sha256(content).hexdigest()
+        codec = "zst" if zstandard is not None else "gz"
+        path = self.blob_path(sha256, codec)
+        if not path.exists():
+            codec, data = _compress(content)
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO snapshots (sha256, codec, scraper, query, url, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (sha256, codec, scraper, query, url,
+                     fetched_at or datetime.now().isoformat(timespec="seconds")),
+                )
+        finally:
+            conn.close()
+        return sha256
+
+    def read(self, sha256: str, codec: str) -> bytes:
+        """Liefert den dekomprimierten Inhalt eines Blobs."""
+        return _decompress(codec, self.blob_path(sha256, codec).read_bytes())
+
+    def entries(self, query: Optional[str] = None, since: Optional[str] = None,
+                latest_only: bool = True) -> list:
+        """
+        Liest Index-Einträge (sha256, codec, scraper, query, url, fetched_at).
+
+        Args:
+            query: Nur dieser Suchbegriff (None = alle).
+            since: Nur Abrufe ab diesem Zeitpunkt (ISO-Format).
+            latest_only: Pro (Scraper, Suchbegriff, URL) nur den jüngsten Abruf liefern.
+
+        Returns:
+            Liste von sqlite3.Row, aufsteigend nach fetched_at.
+        """
+        where, params = [], []
+        if query is not None:
+            where.append("query = ?")
+            params.append(query)
+        if since is not None:
+            where.append("fetched_at >= ?")
+            params.append(since)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        if latest_only:
+            sql = f"""
+                SELECT sha256, codec, scraper, query, url, MAX(fetched_at) AS fetched_at
+                FROM snapshots {clause}
+                GROUP BY scraper, query, url
+                ORDER BY fetched_at
+            """
+        else:
+            sql = (f"SELECT sha256, codec, scraper, query, url, fetched_at FROM snapshots {clause} "
+                   "ORDER BY fetched_at")
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+
+_stores = {}
+
+
+def get_snapshot_store(root: Optional[str] = None) -> Optional[SnapshotStore]:
+    """
+    Liefert das Archiv für root bzw. ALDI_SNAPSHOT_DIR (eine Instanz je Pfad).
+
+    Returns:
+        SnapshotStore oder None, falls kein Archiv konfiguriert ist ("off" deaktiviert).
+    """
+    root = root or os.getenv("ALDI_SNAPSHOT_DIR")
+    if not root or root.lower() == "off":
+        return None
+    if root not in _stores:
+        _stores[root] = SnapshotStore(root)
+    return _stores[root]
+
+
+def _replay_one(root: str, scraper_name: str, sha256: str, codec: str, url: str):
+    """Läuft im Parse-Prozess: liest den Blob selbst (kein Pickling der Seite) und parst ihn."""
+    from scrapers.registry import get_scrapers
+
+    scraper = get_scrapers().get(scraper_name)
+    if scraper is None:
+        raise LookupError(f"Scraper '{scraper_name}' ist nicht registriert")
+    path = Path(root) / "objects" / sha256[:2] / f"{sha256[2:]}.{codec}"
+    # parse() + normalize() des Plugins, das die Seite geladen hat
+    return scraper.extract(_decompress(codec, path.read_bytes()), url)
+
+
+def _upsert_prices(conn, rows) -> int:
+    """Schreibt die Preise; liefert die Anzahl tatsächlich geänderter bzw. neuer Zeilen."""
+    # Bestehende Preiszeile aktualisieren, sofern der Snapshot neuer ist …
+    updated = conn.executemany(
+        """
+        UPDATE supermarket_products
+        SET price = ?, available = 1, last_updated = ?
+        WHERE supermarket_id = ? AND product_id = ? AND last_updated < ?
+        """,
+        [(price, ts, s_id, p_id, ts) for s_id, p_id, price, ts in rows],
+    ).rowcount
+    # … sonst neu anlegen (ID-Schema wie in /add_product)
+    inserted = conn.executemany(
+        """
+        INSERT INTO supermarket_products (id, supermarket_id, product_id, price, available, last_updated)
+        SELECT ?, ?, ?, ?, 1, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM supermarket_products WHERE supermarket_id = ? AND product_id = ?
+        )
+        """,
+        [(f"spu_{s_id}_{p_id}", s_id, p_id, price, ts, s_id, p_id) for s_id, p_id, price, ts in rows],
+    ).rowcount
+    # rowcount entspricht changes(): vom Guard "last_updated < ?" übersprungene Zeilen und
+    # Änderungen durch Trigger zählen nicht mit
+    return updated + inserted
+
+
+def replay(store: SnapshotStore, query: Optional[str] = None, since: Optional[str] = None,
+           workers: Optional[int] = None, dry_run: bool = False) -> dict:
+    """
+    Parst archivierte Seiten neu und übernimmt die Preise in die Datenbank.
+
+    Args:
+        store: Snapshot-Archiv.
+        query: Nur Seiten dieses Suchbegriffs.
+        since: Nur Seiten ab diesem Zeitpunkt (ISO-Format).
+        workers: Anzahl Parse-Prozesse (Standard: Anzahl CPU-Kerne).
+        dry_run: Nur parsen und zuordnen, nichts schreiben (auch keine neuen Zuordnungen).
+
+    Returns:
+        Kennzahlen (pages, items, matched, upserted, seconds).
+    """
+    from database.catalog import get_catalog
+    from database.writer import get_writer
+    from scrapers.matching import resolve_items
+
+    started = time.perf_counter()
+    entries = store.entries(query=query, since=since)
+    catalog = get_catalog()
+    market_ids = {s["name"]: s["id"] for s in catalog.supermarkets}
+
+    stats = {"pages": len(entries), "items": 0, "matched": 0, "upserted": 0}
+    latest = {}
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as pool:
+        futures = [
+            (entry, pool.submit(_replay_one, str(store.root), entry["scraper"], entry["sha256"],
+                                entry["codec"], entry["url"]))
+            for entry in entries
+        ]
+        for entry, future in futures:
+            try:
+                items = future.result()
+            except Exception as exc:
+                print(f"Fehler beim Parsen von {entry['sha256'][:12]} ({entry['query']}): {exc}")
+                continue
+            stats["items"] += len(items)
+            for item in resolve_items(items, persist=not dry_run):
+                s_id = market_ids.get(item["supermarket_name"])
+                if "product_id" not in item or s_id is None:
+                    continue
+                stats["matched"] += 1
+                key = (s_id, item["product_id"])
+                # Einträge sind nach fetched_at sortiert: der letzte Snapshot gewinnt
+                latest[key] = (s_id, item["product_id"], item["price"], entry["fetched_at"])
+
+    rows = list(latest.values())
+    if dry_run:
+        stats["upserted"] = len(rows)
+    else:
+        writer = get_writer()
+        if rows:
+            stats["upserted"] = writer.execute(_upsert_prices, rows)
+        # resolve_items() speichert Zuordnungen asynchron; vor dem Beenden der CLI abwarten
+        writer.flush()
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archiv gecrawlter Seiten")
+    parser.add_argument("--root", default=os.getenv("ALDI_SNAPSHOT_DIR") or str(DEFAULT_SNAPSHOT_DIR))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_cmd = sub.add_parser("list", help="Archivierte Seiten anzeigen")
+    list_cmd.add_argument("--query", default=None)
+    list_cmd.add_argument("--all", action="store_true", help="Auch ältere Abrufe je URL zeigen")
+
+    replay_cmd = sub.add_parser("replay", help="Archiv neu parsen und Preise übernehmen")
+    replay_cmd.add_argument("--query", default=None)
+    replay_cmd.add_argument("--since", default=None, help="ISO-Zeitpunkt, z. B. 2026-10-01")
+    replay_cmd.add_argument("--workers", type=int, default=None)
+    replay_cmd.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.root)
+    if args.command == "list":
+        for entry in store.entries(query=args.query, latest_only=not args.all):
+            print(f"{entry['fetched_at']}  {entry['sha256'][:12]}  {entry['scraper']:<12} "
+                  f"{entry['query']:<20} {entry['url']}")
+        return
+
+    stats = replay(store, query=args.query, since=args.since, workers=args.workers, dry_run=args.dry_run)
+    print(
+        f"{stats['pages']} Seiten, {stats['items']} Treffer, {stats['matched']} zugeordnet, "
+        f"{stats['upserted']} Preise {'(dry run)' if args.dry_run else 'aktualisiert'} "
+        f"in {stats['seconds']} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# --- throttle.py ---
+"""
+Label: Prozessübergreifendes Rate-Limit und Circuit-Breaker für den Crawler
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Viele gleichzeitige /search-Requests lösen jeweils einen Crawl aus. Antwortet
+    aldi-sued.de mit 429/5xx, vervielfacht die Retry-Strategie den Verkehr, und die
+    Worker-Threads schlafen in Backoff-Pausen.
+
+    Dieses Modul hält den Zustand in einer kleinen SQLite-Datei (.cache/crawler_state.db),
+    die sich alle Threads und Worker-Prozesse teilen (BEGIN IMMEDIATE serialisiert die
+    Zugriffe):
+        - TokenBucket: begrenzt die Abrufrate (rate Requests/s, Burst bis capacity),
+        - CircuitBreaker: nach threshold Fehlschlägen in Folge werden Crawls für cooldown
+          Sekunden sofort abgelehnt, statt die Seite weiter zu belasten; danach prüft ein
+          einzelner Probe-Request, ob die Seite wieder antwortet (halb offen).
+
+    Konfiguration: ALDI_STATE_DB, ALDI_RATE, ALDI_BURST, ALDI_BREAKER_THRESHOLD,
+    ALDI_BREAKER_COOLDOWN.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from scrapers.http_cache import CachingHTTPAdapter
+
+DEFAULT_STATE_DB = Path(__file__).resolve().parent.parent / ".cache" / "crawler_state.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS circuits (
+    name TEXT PRIMARY KEY,
+    failures INTEGER NOT NULL DEFAULT 0,
+    opened_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+_local = threading.local()
+
+
+def _connect(db_path) -> sqlite3.Connection:
+    """Eine Verbindung je Thread und Prozess (nach fork wird neu verbunden)."""
+    key = (os.getpid(), str(db_path))
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(key)
+    if conn is None:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.executescript(_SCHEMA)
+        conns[key] = conn
+    return conn
+
+
+class _StateFile:
+    """Gemeinsame Basis: Zugriff auf die Zustandsdatei, Transaktionen mit BEGIN IMMEDIATE."""
+
+    def __init__(self, name: str, db_path=None):
+        self.name = name
+        self.db_path = db_path or os.getenv("ALDI_STATE_DB") or DEFAULT_STATE_DB
+
+    def _transaction(self, fn):
+        conn = _connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+
+class TokenBucket(_StateFile):
+    """
+    Token-Bucket, dessen Füllstand alle Prozesse teilen.
+
+    Args:
+        name: Name des Buckets (z. B. "aldi-sued.de").
+        rate: Nachfüllrate in Tokens pro Sekunde.
+        capacity: Maximaler Füllstand (erlaubter Burst).
+        db_path: Pfad der Zustandsdatei.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, db_path=None):
+        super().__init__(name, db_path)
+        self.rate = rate
+        self.capacity = capacity
+
+    def _take(self, conn):
+        now = time.time()
+        row = conn.execute(
+            "SELECT tokens, updated FROM rate_buckets WHERE name = ?", (self.name,)
+        ).fetchone()
+        tokens = self.capacity if row is None else min(
+            self.capacity, row[0] + (now - row[1]) * self.rate
+        )
+        wait = 0.0
+        if tokens >= 1.0:
+            tokens -= 1.0
+        else:
+            wait = (1.0 - tokens) / self.rate
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+            (self.name, tokens, now),
+        )
+        return wait
+
+    def acquire(self, max_wait: Optional[float] = None) -> bool:
+        """
+        Entnimmt ein Token und wartet höchstens max_wait Sekunden darauf.
+
+        Args:
+            max_wait: Maximale Wartezeit (None = unbegrenzt, 0 = gar nicht warten).
+
+        Returns:
+            True, wenn ein Token entnommen wurde, sonst False.
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            wait = self._transaction(self._take)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker(_StateFile):
+    """
+    Circuit-Breaker mit gemeinsamem Zustand.
+
+    Nach threshold Fehlschlägen in Folge ist der Breaker für cooldown Sekunden offen
+    (allow() liefert False). Danach ist er halb offen: genau ein Aufrufer (prozessübergreifend)
+    erhält einen Probe-Request, alle anderen werden weiter abgelehnt. Gelingt die Probe, schließt
+    record_success() den Breaker; scheitert sie, öffnet record_failure() ihn sofort erneut.
+
+    Args:
+        name: Name des Breakers.
+        threshold: Anzahl Fehlschläge bis zum Öffnen.
+        cooldown: Sperrdauer in Sekunden.
+        db_path: Pfad der Zustandsdatei.
+    """
+
+    def __init__(self, name: str, threshold: int = 5, cooldown: float = 60.0, db_path=None):
+        super().__init__(name, db_path)
+        self.threshold = threshold
+        self.cooldown = cooldown
+
+    def is_open(self) -> bool:
+        """True, solange die Sperre läuft (liest nur, beansprucht keinen Probe-Request)."""
+        row = _connect(self.db_path).execute(
+            "SELECT opened_until FROM circuits WHERE name = ?", (self.name,)
+        ).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def allow(self) -> bool:
+        """
+        True, wenn ein Crawl erlaubt ist.
+
+        Geschlossen (opened_until = 0) → immer True. Ist die Sperre abgelaufen, beansprucht der
+        Aufrufer den Probe-Request atomar: das UPDATE verlängert die Sperre um cooldown und trifft
+        nur für den ersten Aufrufer eine Zeile; alle anderen erhalten False.
+        """
+        conn = _connect(self.db_path)
+        row = conn.execute(
+            "SELECT opened_until FROM circuits WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is None or row[0] == 0:
+            return True
+        now = time.time()
+        if row[0] > now:
+            return False
+        claimed = conn.execute(
+            "UPDATE circuits SET opened_until = ? "
+            "WHERE name = ? AND opened_until > 0 AND opened_until <= ?",
+            (now + self.cooldown, self.name, now),
+        )
+        return claimed.rowcount == 1
+
+    def record_success(self):
+        """Setzt den Fehlerzähler zurück (schreibt nur, wenn es etwas zurückzusetzen gibt)."""
+        row = _connect(self.db_path).execute(
+            "SELECT failures FROM circuits WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is None or row[0] == 0:
+            return
+
+        def reset(conn):
+            conn.execute(
+                "UPDATE circuits SET failures = 0, opened_until = 0 WHERE name = ? AND failures > 0",
+                (self.name,),
+            )
+        self._transaction(reset)
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        """
+        Zählt einen Fehlschlag und öffnet den Breaker ab threshold.
+
+        Args:
+            retry_after: Vom Server verlangte Pause (Retry-After) in Sekunden; verlängert
+                die Sperre, falls sie länger als cooldown ist.
+        """
+        def fail(conn):
+            conn.execute(
+                """
+                INSERT INTO circuits (name, failures, opened_until) VALUES (?, 1, 0)
+                ON CONFLICT(name) DO UPDATE SET failures = failures + 1
+                """,
+                (self.name,),
+            )
+            failures = conn.execute(
+                "SELECT failures FROM circuits WHERE name = ?", (self.name,)
+            ).fetchone()[0]
+            if failures >= self.threshold:
+                pause = max(self.cooldown, retry_after or 0.0)
+                conn.execute(
+                    "UPDATE circuits SET opened_until = ? WHERE name = ?",
+                    (time.time() + pause, self.name),
+                )
+        self._transaction(fail)
+
+
+class CrawlThrottled(requests.exceptions.RequestException):
+    """Crawl abgelehnt: Circuit-Breaker offen oder kein Token innerhalb der Wartezeit."""
+
+
+def retry_after_seconds(resp) -> Optional[float]:
+    """Liest Retry-After (nur Sekundenangabe) aus einer Antwort."""
+    value = resp.headers.get("Retry-After") if resp is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def is_overload(resp) -> bool:
+    """True für Antworten, die auf Überlast des Servers hindeuten (429 bzw. 5xx)."""
+    return resp is not None and (resp.status_code == 429 or resp.status_code >= 500)
+
+
+# Ein Bucket bzw. Breaker je Zielhost; die Grenzwerte gelten für jeden Host einzeln
+_buckets = {}
+_breakers = {}
+
+
+def get_bucket(name: str = "aldi-sued.de") -> TokenBucket:
+    """Prozessweiter Token-Bucket je Host (Konfiguration über Umgebungsvariablen)."""
+    if name not in _buckets:
+        _buckets[name] = TokenBucket(
+            name,
+            rate=float(os.getenv("ALDI_RATE", "2")),
+            capacity=float(os.getenv("ALDI_BURST", "5")),
+        )
+    return _buckets[name]
+
+
+def get_breaker(name: str = "aldi-sued.de") -> CircuitBreaker:
+    """Prozessweiter Circuit-Breaker je Host."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(
+            name,
+            threshold=int(os.getenv("ALDI_BREAKER_THRESHOLD", "5")),
+            cooldown=float(os.getenv("ALDI_BREAKER_COOLDOWN", "60")),
+        )
+    return _breakers[name]
+
+
+def _cached_fresh(session, url: str) -> bool:
+    """True, wenn der Adapter der Session eine frische Cache-Antwort für url liefern würde."""
+    adapter = session.get_adapter(url)
+    if not isinstance(adapter, CachingHTTPAdapter):
+        return False
+    prepared = session.prepare_request(requests.Request("GET", url))
+    return adapter.cache.is_fresh(prepared.url)
+
+
+def guarded_get(session, url: str, timeout: float, max_wait: Optional[float] = None,
+                host: str = "aldi-sued.de"):
+    """
+    GET-Request unter Rate-Limit und Circuit-Breaker.
+
+    Ist die URL im HTTP-Cache der Session noch frisch, wird sie ohne Token und ohne Breaker
+    direkt aus dem Cache geliefert (es geht kein Request an den Server). Sonst gilt:
+    Verbindungsfehler, Timeouts sowie 429/5xx zählen als Fehlschlag, jede andere Antwort
+    schließt den Breaker wieder. Das Token wird erst nach der Breaker-Prüfung entnommen, der
+    Probe-Request eines halb offenen Breakers erst nach dem Token beansprucht.
+
+    Args:
+        session: requests.Session.
+        url: Ziel-URL.
+        timeout: HTTP-Timeout in Sekunden.
+        max_wait: Maximale Wartezeit auf ein Token (None = unbegrenzt).
+        host: Schlüssel für Rate-Limit und Breaker (Zielhost).
+
+    Returns:
+        requests.Response.
+
+    Raises:
+        CrawlThrottled: Breaker offen oder kein Token innerhalb von max_wait.
+    """
+    if _cached_fresh(session, url):
+        return session.get(url, timeout=timeout)
+    breaker = get_breaker(host)
+    if breaker.is_open():
+        raise CrawlThrottled("Circuit-Breaker offen, Crawl übersprungen")
+    if not get_bucket(host).acquire(max_wait):
+        raise CrawlThrottled("Rate-Limit erreicht, Crawl übersprungen")
+    if not breaker.allow():
+        raise CrawlThrottled("Circuit-Breaker halb offen, Probe-Request läuft bereits")
+    try:
+        resp = session.get(url, timeout=timeout)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+            requests.exceptions.RetryError):
+        breaker.record_failure()
+        raise
+    if is_overload(resp):
+        breaker.record_failure(retry_after_seconds(resp))
+    else:
+        breaker.record_success()
+    return resp
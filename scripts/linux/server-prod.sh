@@ -0,0 +1,16 @@
+# Label: Produktions-Startskript (gunicorn)
+# Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+# Datum: 2026-10-19
+# Version: 1.0.0
+# Lizenz: Proprietär (für Studienzwecke)
+#
+# Kurzbeschreibung des Moduls:
+#   Startet die Flask-Anwendung mit gunicorn im Pre-Fork-Modell (mehrere Worker-Prozesse
+#   mit je mehreren Threads). Worker- und Thread-Anzahl werden über die Umgebungsvariablen
+#   GROCERY_WORKERS und GROCERY_THREADS gesteuert (siehe gunicorn.conf.py).
+
+# --- Start des gunicorn-Masters ---
+# Wechselt ins Projektverzeichnis, damit 'app' und 'gunicorn.conf.py' gefunden werden.
+#!/bin/bash
+cd "$(dirname "$0")/../.."
+exec gunicorn -c gunicorn.conf.py "app:create_app(warm=True)"
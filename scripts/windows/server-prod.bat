@@ -0,0 +1,22 @@
+:: Label: Produktions-Startskript (Windows, waitress)
+:: Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+:: Datum: 2026-10-19
+:: Version: 1.0.0
+:: Lizenz: Proprietär (für Studienzwecke)
+::
+:: Kurzbeschreibung des Moduls:
+::   gunicorn (Pre-Fork) steht unter Windows nicht zur Verfügung. Dieses Skript startet die
+::   App-Factory deshalb mit waitress (ein Prozess, mehrere Threads). Die Thread-Anzahl wird
+::   über GROCERY_THREADS gesteuert (Standard: 8).
+
+REM --- 1. Pfad-Definition ---
+:: Deaktiviert die Anzeige der Befehle im Fenster
+@ECHO OFF
+:: Speichert das Verzeichnis, in dem dieses Skript liegt, in der Variable SCRIPT_DIR
+SET SCRIPT_DIR=%~dp0
+IF "%GROCERY_THREADS%"=="" SET GROCERY_THREADS=8
+
+REM --- 2. Anwendungsstart ---
+:: Startet waitress im Projektverzeichnis und ruft die App-Factory create_app() auf.
+cd /d "%SCRIPT_DIR%..\.."
+waitress-serve --listen=127.0.0.1:8000 --threads=%GROCERY_THREADS% --call app:create_app
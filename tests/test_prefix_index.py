@@ -0,0 +1,91 @@
+# tests/test_prefix_index.py
+"""
+Label: Regressionstests für den Präfix-Index (/api/suggest)
+Ersteller: Philip Welter, Jakub Nossowski, Marie Wütz
+Datum: 2026-10-19
+Version: 1.0.0
+Lizenz: Proprietär (für Studienzwecke)
+
+Kurzbeschreibung des Moduls:
+    Prüft den Ablauf Vorschlag → Schreiben → Vorschlag auf einer frisch angelegten
+    Datenbank: Nach einer Katalogänderung muss PrefixIndex.sync() die Product-Zeilen des
+    neuen Snapshots vergleichen können, statt mit einem Fehler abzubrechen.
+
+    Aufruf (aus dem Projektverzeichnis):
+        python -m pytest -q tests
+"""
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from database import catalog
+from database.ids import new_id
+from database.lookups import encode_product
+from database.prefix_index import PrefixIndex
+
+SCHEMA_FILE = Path(__file__).parent.parent / "database" / "schema.sql"
+
+
+def _insert_product(conn, name, brand, category) -> str:
+    row = encode_product(conn, {"id": new_id("p"), "name": name, "brand": brand,
+                                "category": category, "created_at": "2026-10-19T00:00:00"})
+    conn.execute(
+        "INSERT INTO products (id, name, brand_id, category_id, created_at) "
+        "VALUES (:id, :name, :brand_id, :category_id, :created_at)",
+        row,
+    )
+    conn.commit()
+    return row["id"]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "grocery.db")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA_FILE.read_text(encoding="utf-8"))
+    _insert_product(conn, "Vollmilch 3.5%", "Weihenstephan", "Milch")
+    catalog.invalidate()
+    yield conn
+    conn.close()
+    catalog.invalidate()
+
+
+def _suggest(index, conn, prefix):
+    index.sync(catalog.get_catalog(conn))
+    return [s["name"] for s in index.suggest(prefix)]
+
+
+def test_suggest_after_new_product(conn):
+    """Neues Produkt nach dem ersten Vorschlag wird inkrementell gefunden."""
+    index = PrefixIndex()
+    assert _suggest(index, conn, "voll") == ["Vollmilch 3.5%"]
+
+    _insert_product(conn, "Vollkornbrot", "Harry", "Brot")
+
+    assert _suggest(index, conn, "voll") == ["Vollkornbrot", "Vollmilch 3.5%"]
+
+
+def test_suggest_after_changed_product(conn):
+    """Geänderte Marke führt zum Neuaufbau; der alte Markenname verschwindet."""
+    index = PrefixIndex()
+    assert _suggest(index, conn, "weihen") == ["Vollmilch 3.5%"]
+
+    brand_id = encode_product(conn, {"brand": "Bärenmarke"})["brand_id"]
+    conn.execute("UPDATE products SET brand_id = ?", (brand_id,))
+    conn.commit()
+
+    assert _suggest(index, conn, "weihen") == []
+    assert _suggest(index, conn, "bären") == ["Vollmilch 3.5%"]
+
+
+def test_name_hit_not_crowded_out_by_brands():
+    """Viele Marken mit dem Präfix verdrängen den Namenstreffer nicht aus dem Scan-Fenster."""
+    index = PrefixIndex()
+    index.MAX_SCAN = 5
+    products = [{"id": f"b{i}", "name": f"Käse {i}", "brand": f"Ma{i:02d}", "category": None}
+                for i in range(20)]
+    products.append({"id": "n1", "name": "Mz Milch", "brand": None, "category": None})
+    index.rebuild(products)
+
+    assert index.suggest("m", k=3)[0]["name"] == "Mz Milch"